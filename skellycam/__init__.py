@@ -9,27 +9,33 @@ __package_name__ = "skellycam"
 __repo_url__ = f"https://github.com/freemocap/{__package_name__}/"
 __repo_issues_url__ = f"{__repo_url__}issues"
 
-import sys
-from pathlib import Path
+# everything is imported when first used (e.g. `from skellycam import Camera`), so a headless script doesn't pay for
+# the GUI (PySide6, pyqtgraph) - and importing the package has no side effects like configuring logging
+# (`skellycam.system.log_config.logsetup.configure_logging` does that - the GUI and headless entry points call it on
+# startup, and the processes skellycam starts call `configure_process_logging`)
+_LAZY_IMPORTS = {
+    "Camera": "skellycam.opencv.camera.camera",
+    "CameraConfig": "skellycam.opencv.camera.models.camera_config",
+    "SynchronizedRecorder": "skellycam.headless.synchronized_recorder",
+    "SkellyCamParameterTreeWidget": "skellycam.gui.qt.widgets.skelly_cam_config_parameter_tree_widget",
+    "SkellyCamControllerWidget": "skellycam.gui.qt.widgets.skelly_cam_controller_widget",
+    "SkellyCamWidget": "skellycam.gui.qt.skelly_cam_widget",
+    "SkellyCamDirectoryViewWidget": "skellycam.gui.qt.widgets.skelly_cam_directory_view_widget",
+}
 
-base_package_path = Path(__file__).parent
-print(f"adding base_package_path: {base_package_path} : to sys.path")
-sys.path.insert(0, str(base_package_path))  # add parent directory to sys.path
+__all__ = list(_LAZY_IMPORTS)
 
-from skellycam.system.environment.default_paths import get_log_file_path
-from skellycam.system.log_config.logsetup import configure_logging
 
-configure_logging(log_file_path=get_log_file_path())
+def __getattr__(name: str):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-import logging
+    import importlib
 
-logger = logging.getLogger(__name__)
-logger.info(f"Initializing {__package_name__} package, version: {__version__}, from file: {__file__}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value  # (so `__getattr__` isn't called again for it)
+    return value
 
-from skellycam.opencv.camera.camera import Camera
-from skellycam.opencv.camera.models.camera_config import CameraConfig
 
-from skellycam.gui.qt.widgets.skelly_cam_config_parameter_tree_widget import SkellyCamParameterTreeWidget
-from skellycam.gui.qt.widgets.skelly_cam_controller_widget import SkellyCamControllerWidget
-from skellycam.gui.qt.skelly_cam_widget import SkellyCamWidget
-from skellycam.gui.qt.widgets.skelly_cam_directory_view_widget import SkellyCamDirectoryViewWidget
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,18 +1,51 @@
 # __main__.py
+import logging
 import platform
 import sys
 from pathlib import Path
 import argparse
 
+logger = logging.getLogger(__name__)
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description="SkellyCam")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without the GUI, taking commands over a local socket (see `HeadlessDaemon`)")
+    parser.add_argument("--cameras", nargs="+", default=None,
+                        help="Camera ids to use in headless mode (default: all the cameras that are found)")
+    parser.add_argument("--port", type=int, default=None, help="Port the headless daemon listens on")
     return parser.parse_args()
 
+
+def run_headless(args):
+    from skellycam.detection.detect_cameras import detect_cameras
+    from skellycam.headless.headless_camera_group_worker import HeadlessCameraGroupWorker
+    from skellycam.headless.headless_daemon import DEFAULT_PORT, HeadlessDaemon
+    from skellycam.system.environment.default_paths import get_log_file_path
+    from skellycam.system.log_config.logsetup import configure_logging
+
+    configure_logging(log_file_path=get_log_file_path())
+
+    camera_ids = args.cameras if args.cameras else detect_cameras().cameras_found_list
+    if len(camera_ids) == 0:
+        logger.error("No cameras found - not starting the headless daemon")
+        sys.exit(1)
+
+    headless_daemon = HeadlessDaemon(headless_camera_group_worker=HeadlessCameraGroupWorker(camera_ids=camera_ids),
+                                     port=args.port if args.port is not None else DEFAULT_PORT)
+    try:
+        headless_daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
 def run():
-    parse_args()
-    
+    args = parse_args()
+    if args.headless:
+        run_headless(args)
+        return
+
     try:
         from skellycam.gui.qt.main import qt_gui_main
     except Exception as e:
@@ -20,8 +53,11 @@ def run():
         print(f"adding base_package_path: {base_package_path} : to sys.path")
         sys.path.insert(0, str(base_package_path))  # add parent directory to sys.path
         from skellycam.gui.qt.main import qt_gui_main
-    
-    
+
+    from skellycam.system.environment.default_paths import get_log_file_path
+    from skellycam.system.log_config.logsetup import configure_logging
+
+    configure_logging(log_file_path=get_log_file_path())
     qt_gui_main()
 
 
@@ -0,0 +1,167 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Union
+
+import cv2
+import numpy as np
+
+from skellycam.detection.charuco.charuco_definition import CHARUCO_BOARDS, CharucoBoardDefinition
+from skellycam.detection.charuco.charuco_detection import CharucoDetection
+from skellycam.detection.charuco.charuco_tracker import CharucoTracker
+from skellycam.system.log_config.logsetup import configure_process_logging
+
+logger = logging.getLogger(__name__)
+
+CHARUCO_DETECTIONS_FILE_SUFFIX = "_charuco_detections.npz"
+DEFAULT_CHARUCO_BOARD_NAME = "Full Charuco (7x5)"
+
+
+def get_charuco_detections_path(video_path: Union[str, Path]) -> Path:
+    """The sidecar for `folder/Camera_000_synchronized.mp4` is `folder/Camera_000_synchronized_charuco_detections.npz`"""
+    video_path = Path(video_path)
+    return video_path.parent / f"{video_path.stem}{CHARUCO_DETECTIONS_FILE_SUFFIX}"
+
+
+def detect_charuco_in_recording(synchronized_videos_folder: Union[str, Path],
+                                charuco_board_name: str = DEFAULT_CHARUCO_BOARD_NAME,
+                                video_file_extension: str = ".mp4",
+                                max_workers: int = None) -> Dict[str, Path]:
+    """
+    Detect the charuco board in every frame of every video in a recording folder - one video per process - and save
+    each video's detections to a sidecar next to it (see `load_charuco_detections`).
+
+    The board is passed by its name in `CHARUCO_BOARDS` (the OpenCV objects can't be sent to other processes).
+    Returns the path of each video's sidecar, by video file name
+    """
+    if charuco_board_name not in CHARUCO_BOARDS:
+        raise ValueError(f"Charuco board {charuco_board_name} not found in CHARUCO_BOARDS: {list(CHARUCO_BOARDS)}")
+
+    video_paths = sorted(Path(synchronized_videos_folder).glob(f"*{video_file_extension}"))
+    if len(video_paths) == 0:
+        raise FileNotFoundError(f"No {video_file_extension} videos found in {synchronized_videos_folder}")
+
+    if max_workers is None:
+        max_workers = min(len(video_paths), os.cpu_count() or 1)
+    logger.info(f"Detecting charuco board {charuco_board_name} in {len(video_paths)} videos "
+                f"from {synchronized_videos_folder} with {max_workers} processes")
+
+    detection_start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=configure_process_logging) as executor:
+        futures = {
+            video_path.name: executor.submit(save_charuco_detections_for_video, video_path, charuco_board_name)
+            for video_path in video_paths
+        }
+        charuco_detections_paths = {video_name: future.result() for video_name, future in futures.items()}
+
+    logger.info(f"Detected charuco boards in {len(video_paths)} videos "
+                f"in {time.perf_counter() - detection_start_time:.2f} seconds")
+    return charuco_detections_paths
+
+
+def save_charuco_detections_for_video(video_path: Union[str, Path], charuco_board_name: str) -> Path:
+    # (one process per video already - more OpenCV threads per process would just compete with each other)
+    cv2.setNumThreads(1)
+    charuco_board = CHARUCO_BOARDS[charuco_board_name]()
+    charuco_tracker = CharucoTracker(charuco_board=charuco_board)
+
+    video_capture = cv2.VideoCapture(str(video_path))
+    if not video_capture.isOpened():
+        raise FileNotFoundError(f"Could not open video {video_path}")
+
+    detections = []
+    try:
+        while True:
+            success, image = video_capture.read()
+            if not success:
+                break
+            detections.append(charuco_tracker.detect(image))
+    finally:
+        video_capture.release()
+
+    charuco_detections_path = get_charuco_detections_path(video_path)
+    save_charuco_detections(charuco_detections_path=charuco_detections_path,
+                            detections=detections,
+                            charuco_board=charuco_board,
+                            charuco_board_name=charuco_board_name,
+                            video_file_name=Path(video_path).name)
+    return charuco_detections_path
+
+
+def save_charuco_detections(charuco_detections_path: Union[str, Path],
+                            detections: List[Union[CharucoDetection, None]],
+                            charuco_board: CharucoBoardDefinition,
+                            charuco_board_name: str,
+                            video_file_name: str = ""):
+    """
+    Save one detection per video frame (`None` if the frame wasn't searched) - all corners of all frames go into one
+    array, with the frame number of each corner (a couple of MB for a long video). `charuco_board_name` is the
+    board's `CHARUCO_BOARDS` key, so the board can be made again from the file
+    """
+    frame_numbers: List[np.ndarray] = []
+    corner_ids: List[np.ndarray] = []
+    corner_coordinates: List[np.ndarray] = []
+    image_width = image_height = 0
+    for frame_number, detection in enumerate(detections):
+        if detection is None:
+            continue
+        image_width, image_height = detection.image_width, detection.image_height
+        if detection.number_of_charuco_corners > 0:
+            frame_numbers.append(np.full(detection.number_of_charuco_corners, frame_number, dtype=np.int32))
+            corner_ids.append(detection.charuco_ids.reshape(-1).astype(np.int16))
+            corner_coordinates.append(detection.charuco_corners.reshape(-1, 2).astype(np.float32))
+
+    Path(charuco_detections_path).parent.mkdir(parents=True, exist_ok=True)
+    np.savez(
+        charuco_detections_path,
+        frame_number=np.concatenate(frame_numbers) if frame_numbers else np.empty(0, dtype=np.int32),
+        corner_id=np.concatenate(corner_ids) if corner_ids else np.empty(0, dtype=np.int16),
+        corner_xy=np.concatenate(corner_coordinates) if corner_coordinates else np.empty((0, 2), dtype=np.float32),
+        number_of_frames=np.int64(len(detections)),
+        number_of_charuco_corners=np.int64(charuco_board.number_of_charuco_corners),
+        image_size=np.array([image_width, image_height], dtype=np.int64),
+        charuco_board_name=np.array(charuco_board_name),
+        video_file_name=np.array(video_file_name),
+    )
+    logger.info(f"Saved charuco detections for {len(detections)} frames of {video_file_name} "
+                f"({len(frame_numbers)} with a board) to {charuco_detections_path}")
+
+
+def load_charuco_detections(charuco_detections_path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    """
+    Loads a sidecar written by `detect_charuco_in_recording`, with the corners as one array per frame:
+    `corners` is (number_of_frames, number_of_charuco_corners, 2), NaN where a corner wasn't detected.
+    The compact `frame_number`/`corner_id`/`corner_xy` arrays (one row per detected corner) are included as-is
+    """
+    with np.load(charuco_detections_path) as charuco_detections_file:
+        charuco_detections = {key: charuco_detections_file[key] for key in charuco_detections_file.files}
+
+    corners = np.full((int(charuco_detections["number_of_frames"]),
+                       int(charuco_detections["number_of_charuco_corners"]),
+                       2),
+                      np.nan,
+                      dtype=np.float32)
+    corners[charuco_detections["frame_number"], charuco_detections["corner_id"]] = charuco_detections["corner_xy"]
+    charuco_detections["corners"] = corners
+    return charuco_detections
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Detect charuco boards in the synchronized videos of a recording")
+    parser.add_argument("synchronized_videos_folder")
+    parser.add_argument("--board", default=DEFAULT_CHARUCO_BOARD_NAME, choices=list(CHARUCO_BOARDS))
+    parser.add_argument("--extension", default=".mp4")
+    parser.add_argument("--workers", type=int, default=None)
+    arguments = parser.parse_args()
+
+    detect_charuco_in_recording(synchronized_videos_folder=arguments.synchronized_videos_folder,
+                                charuco_board_name=arguments.board,
+                                video_file_extension=arguments.extension,
+                                max_workers=arguments.workers)
@@ -0,0 +1,143 @@
+import logging
+import math
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from skellycam.detection.charuco.charuco_definition import CharucoBoardDefinition
+from skellycam.detection.charuco.charuco_detection import CharucoDetection
+from skellycam.opencv.video_recorder.models.calibration_frame_selection_config import \
+    CalibrationFrameSelectionConfig
+
+logger = logging.getLogger(__name__)
+
+# the board's apparent size (its width as a fraction of the image width) is binned at these edges
+BOARD_SIZE_BIN_EDGES = [0.15, 0.3, 0.5]
+# ...and its tilt, as log2 of how much longer its horizontal axis looks than its vertical one (or vice versa)
+BOARD_TILT_BIN_EDGES = [-0.5, -0.15, 0.15, 0.5]
+
+PoseBin = Tuple[int, int, int]
+
+
+class CalibrationFrameSelector:
+    """
+    Decides which synchronized frame sets are worth keeping for calibration: those where at least
+    `min_number_of_cameras` see the board, and at least one of them sees it either in a part of its image (a cell of a
+    coverage grid) or in a pose (rotation/size/tilt bin) that doesn't have enough views yet.
+    """
+
+    def __init__(self,
+                 camera_ids: List[str],
+                 charuco_board: CharucoBoardDefinition,
+                 config: CalibrationFrameSelectionConfig = None):
+        if config is None:
+            config = CalibrationFrameSelectionConfig()
+        self._camera_ids = camera_ids
+        self._charuco_board = charuco_board
+        self._config = config
+
+        self._grid_cell_view_counts = {
+            camera_id: np.zeros((config.coverage_grid_height, config.coverage_grid_width), dtype=np.int64)
+            for camera_id in camera_ids
+        }
+        self._pose_bin_view_counts: Dict[str, Dict[PoseBin, int]] = {camera_id: {} for camera_id in camera_ids}
+        self._last_selected_timestamp_ns = None
+        self._number_of_frame_sets_considered = 0
+        self._number_of_frame_sets_selected = 0
+
+    @property
+    def number_of_frame_sets_considered(self) -> int:
+        return self._number_of_frame_sets_considered
+
+    @property
+    def number_of_frame_sets_selected(self) -> int:
+        return self._number_of_frame_sets_selected
+
+    @property
+    def is_full(self) -> bool:
+        return self._number_of_frame_sets_selected >= self._config.max_number_of_frame_sets
+
+    def coverage(self) -> Dict[str, float]:
+        """Fraction of each camera's coverage grid cells that have been seen"""
+        return {camera_id: float(np.mean(counts > 0)) for camera_id, counts in self._grid_cell_view_counts.items()}
+
+    def consider(self, timestamp_ns: int, detections: Dict[str, CharucoDetection]) -> bool:
+        """Should this frame set (one detection per camera, taken at `timestamp_ns`) be kept?"""
+        self._number_of_frame_sets_considered += 1
+        if self.is_full:
+            return False
+        if (self._last_selected_timestamp_ns is not None
+                and timestamp_ns - self._last_selected_timestamp_ns < self._config.min_seconds_between_frame_sets * 1e9):
+            return False
+
+        visible_detections = {
+            camera_id: detection for camera_id, detection in detections.items()
+            if detection is not None and detection.number_of_charuco_corners >= self._config.min_number_of_corners
+        }
+        if len(visible_detections) < self._config.min_number_of_cameras:
+            return False
+
+        grid_cells = {camera_id: self._get_grid_cells(detection) for camera_id, detection in visible_detections.items()}
+        pose_bins = {camera_id: self._get_pose_bin(detection) for camera_id, detection in visible_detections.items()}
+        adds_coverage = any(
+            np.any(self._grid_cell_view_counts[camera_id][rows, columns]
+                   < self._config.max_number_of_views_per_grid_cell)
+            for camera_id, (rows, columns) in grid_cells.items()
+        )
+        adds_pose = any(
+            pose_bin is not None
+            and self._pose_bin_view_counts[camera_id].get(pose_bin, 0) < self._config.max_number_of_views_per_pose_bin
+            for camera_id, pose_bin in pose_bins.items()
+        )
+        if not (adds_coverage or adds_pose):
+            return False
+
+        for camera_id, (rows, columns) in grid_cells.items():
+            self._grid_cell_view_counts[camera_id][rows, columns] += 1
+        for camera_id, pose_bin in pose_bins.items():
+            if pose_bin is not None:
+                self._pose_bin_view_counts[camera_id][pose_bin] = (
+                        self._pose_bin_view_counts[camera_id].get(pose_bin, 0) + 1)
+        self._last_selected_timestamp_ns = timestamp_ns
+        self._number_of_frame_sets_selected += 1
+        logger.debug(f"Selected calibration frame set #{self._number_of_frame_sets_selected} "
+                     f"(seen by cameras {list(visible_detections.keys())})")
+        return True
+
+    def _get_grid_cells(self, detection: CharucoDetection) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, columns) of the distinct grid cells the detected corners fall in"""
+        corners = detection.charuco_corners.reshape(-1, 2)
+        columns = np.clip((corners[:, 0] / detection.image_width * self._config.coverage_grid_width).astype(int),
+                          0, self._config.coverage_grid_width - 1)
+        rows = np.clip((corners[:, 1] / detection.image_height * self._config.coverage_grid_height).astype(int),
+                       0, self._config.coverage_grid_height - 1)
+        cells = np.unique(rows * self._config.coverage_grid_width + columns)
+        return cells // self._config.coverage_grid_width, cells % self._config.coverage_grid_width
+
+    def _get_pose_bin(self, detection: CharucoDetection) -> Union[PoseBin, None]:
+        """
+        The board's pose, roughly - from the affine map between the corners' board coordinates and where they are in
+        the image: the direction of the board's horizontal axis, its apparent width and how foreshortened it is
+        """
+        corner_ids = detection.charuco_ids.reshape(-1)
+        number_of_corner_columns = self._charuco_board.number_of_squares_width - 1
+        board_coordinates = np.stack([corner_ids % number_of_corner_columns,
+                                      corner_ids // number_of_corner_columns,
+                                      np.ones(len(corner_ids))], axis=1).astype(np.float64)
+        if np.linalg.matrix_rank(board_coordinates) < 3:
+            return None  # (all corners in a line)
+
+        affine, *_ = np.linalg.lstsq(board_coordinates, detection.charuco_corners.reshape(-1, 2), rcond=None)
+        horizontal_axis, vertical_axis = affine[0], affine[1]
+        horizontal_axis_length = np.linalg.norm(horizontal_axis)
+        vertical_axis_length = np.linalg.norm(vertical_axis)
+        if horizontal_axis_length == 0 or vertical_axis_length == 0:
+            return None
+
+        rotation = math.atan2(horizontal_axis[1], horizontal_axis[0]) % (2 * math.pi)
+        rotation_bin = int(rotation / (2 * math.pi) * self._config.number_of_rotation_bins) % (
+            self._config.number_of_rotation_bins)
+        board_width = horizontal_axis_length * number_of_corner_columns / detection.image_width
+        size_bin = int(np.searchsorted(BOARD_SIZE_BIN_EDGES, board_width))
+        tilt_bin = int(np.searchsorted(BOARD_TILT_BIN_EDGES, math.log2(horizontal_axis_length / vertical_axis_length)))
+        return rotation_bin, size_bin, tilt_bin
@@ -0,0 +1,131 @@
+import logging
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Union
+
+import numpy as np
+
+from skellycam.detection.charuco.charuco_definition import CharucoBoardDefinition
+from skellycam.detection.charuco.charuco_detection import CharucoDetection
+from skellycam.detection.charuco.charuco_tracker import CharucoTracker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DETECTION_FRAMES_PER_SECOND = 10
+# frames are downscaled to (at most) this width before looking for the board
+DEFAULT_DETECTION_IMAGE_WIDTH = 960
+# don't keep drawing a detection that is this old (e.g. the board was moved out of view and detection is behind)
+MAX_DETECTION_AGE_SECONDS = 0.5
+SMOOTHING_FACTOR = 0.1
+
+
+class CharucoAnnotator:
+    """
+    Detects the charuco board in the camera previews on a thread pool (OpenCV releases the GIL while it works, so
+    cameras are detected in parallel) and draws each camera's most recent detection on its previews.
+
+    Each camera's board is tracked (see `CharucoTracker`), so mostly only a small region of its frames is searched.
+    Each camera has at most one detection in flight and starts a new one at most `detection_frames_per_second` times
+    per second, so detection never holds up the previews - they just show the latest result that is ready.
+    """
+
+    def __init__(self,
+                 charuco_board: CharucoBoardDefinition,
+                 detection_frames_per_second: float = DEFAULT_DETECTION_FRAMES_PER_SECOND,
+                 detection_image_width: int = DEFAULT_DETECTION_IMAGE_WIDTH,
+                 max_workers: int = None):
+        self._charuco_board = charuco_board
+        self._detection_frames_per_second = detection_frames_per_second
+        self._detection_image_width = detection_image_width
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1),
+                                            thread_name_prefix="charuco_detection")
+
+        # (only one detection per camera runs at a time, so each camera's tracker is only ever used by one thread)
+        self._charuco_trackers: Dict[str, CharucoTracker] = {}
+        self._detection_futures: Dict[str, Future] = {}
+        self._last_submit_time_ns: Dict[str, int] = {}
+        self._latest_detections: Dict[str, CharucoDetection] = {}
+        self._detection_latency_ns: Dict[str, float] = {}
+
+    @property
+    def charuco_board(self) -> CharucoBoardDefinition:
+        return self._charuco_board
+
+    @charuco_board.setter
+    def charuco_board(self, charuco_board: CharucoBoardDefinition):
+        self._charuco_board = charuco_board
+        self._latest_detections = {}
+
+    @property
+    def detection_frames_per_second(self) -> float:
+        return self._detection_frames_per_second
+
+    @detection_frames_per_second.setter
+    def detection_frames_per_second(self, detection_frames_per_second: float):
+        self._detection_frames_per_second = detection_frames_per_second
+
+    def submit(self, camera_id: str, image: np.ndarray, timestamp_ns: int = None):
+        """
+        Start detecting the board in this frame, unless the camera's previous detection is still running or one was
+        started too recently. `image` is only read, never modified
+        """
+        now_ns = time.perf_counter_ns()
+        future = self._detection_futures.get(camera_id)
+        if future is not None and not future.done():
+            return
+        if now_ns - self._last_submit_time_ns.get(camera_id, 0) < 1e9 / self._detection_frames_per_second:
+            return
+
+        self._last_submit_time_ns[camera_id] = now_ns
+        self._detection_futures[camera_id] = self._executor.submit(
+            self._detect, camera_id, image, timestamp_ns if timestamp_ns is not None else now_ns
+        )
+
+    def latest_detection(self, camera_id: str) -> Union[CharucoDetection, None]:
+        detection = self._latest_detections.get(camera_id)
+        if detection is None or time.perf_counter_ns() - detection.timestamp_ns > MAX_DETECTION_AGE_SECONDS * 1e9:
+            return None
+        return detection
+
+    def draw_latest_detection(self, camera_id: str, image: np.ndarray):
+        """Draw the camera's most recent detection on `image` (e.g. its preview, whatever size it is)"""
+        detection = self.latest_detection(camera_id)
+        if detection is not None:
+            detection.draw_on_image(image)
+
+    def detection_latency_ms(self, camera_id: str) -> Union[float, None]:
+        """Smoothed time from a frame being captured to the board detected in it being ready to draw"""
+        if camera_id not in self._detection_latency_ns:
+            return None
+        return self._detection_latency_ns[camera_id] / 1e6
+
+    def charuco_tracker(self, camera_id: str) -> Union[CharucoTracker, None]:
+        """The camera's tracker - e.g. for how long its detections take with and without a region of interest"""
+        return self._charuco_trackers.get(camera_id)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _detect(self, camera_id: str, image: np.ndarray, timestamp_ns: int):
+        try:
+            charuco_board = self._charuco_board
+            charuco_tracker = self._charuco_trackers.get(camera_id)
+            if charuco_tracker is None or charuco_tracker.charuco_board is not charuco_board:
+                charuco_tracker = CharucoTracker(charuco_board=charuco_board,
+                                                 detection_image_width=self._detection_image_width)
+                self._charuco_trackers[camera_id] = charuco_tracker
+
+            detection = charuco_tracker.detect(image=image, timestamp_ns=timestamp_ns)
+            if charuco_board is not self._charuco_board:
+                return  # the board changed while detecting
+
+            self._latest_detections[camera_id] = detection
+
+            latency_ns = time.perf_counter_ns() - timestamp_ns
+            previous_latency_ns = self._detection_latency_ns.get(camera_id, latency_ns)
+            self._detection_latency_ns[camera_id] = previous_latency_ns + SMOOTHING_FACTOR * (
+                    latency_ns - previous_latency_ns)
+        except Exception as e:
+            logger.error(f"Problem detecting charuco board for camera {camera_id}: {e}")
+            logger.exception(e)
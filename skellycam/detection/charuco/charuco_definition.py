@@ -1,7 +1,8 @@
-import cv2
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict
 
+import cv2
+
 @dataclass
 class CharucoBoardDefinition:
     name: str
@@ -9,7 +10,10 @@ class CharucoBoardDefinition:
     number_of_squares_height: int
     black_square_side_length: int
     aruco_marker_length_proportional: float
-    aruco_marker_dict: Dict = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_250)
+    # (made when a board is made, not when this module is imported)
+    aruco_marker_dict: Dict = field(
+        default_factory=lambda: cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_250)
+    )
 
     def __post_init__(self):
         self.charuco_board = cv2.aruco.CharucoBoard(
@@ -47,3 +51,11 @@ CHARUCO_BOARDS = {
     "Full Charuco (7x5)": charuco_7x5,
     "Mini Charuco (5x3)": charuco_5x3,
 }
+
+
+def get_charuco_board_name(charuco_board: CharucoBoardDefinition) -> str:
+    """The `CHARUCO_BOARDS` key of a board (the name that is saved with detections, and that `--board` takes)"""
+    for charuco_board_name, create_charuco_board in CHARUCO_BOARDS.items():
+        if create_charuco_board().name == charuco_board.name:
+            return charuco_board_name
+    return charuco_board.name
@@ -1,13 +1,81 @@
+import dataclasses
+import time
+from typing import Sequence, Tuple
+
 import cv2
 import numpy as np
 
 from skellycam.detection.charuco.charuco_definition import CharucoBoardDefinition
 
-def draw_charuco_on_image(image: np.ndarray, charuco_board: CharucoBoardDefinition) -> None:
+
+@dataclasses.dataclass()
+class CharucoDetection:
+    """Charuco board detected in a frame - all corners are in the coordinates of the full resolution frame"""
+    charuco_corners: np.ndarray = None
+    charuco_ids: np.ndarray = None
+    marker_corners: Sequence[np.ndarray] = ()
+    marker_ids: np.ndarray = None
+    image_width: int = None
+    image_height: int = None
+    timestamp_ns: int = None  # of the frame the board was detected in
+    detection_duration_ns: int = None
+    region_of_interest: Tuple[int, int, int, int] = None  # (x, y, width, height) searched - `None` for the whole frame
+
+    @property
+    def number_of_charuco_corners(self) -> int:
+        return 0 if self.charuco_ids is None else len(self.charuco_ids)
+
+    def draw_on_image(self, image: np.ndarray) -> None:
+        """Draw the detection on `image`, which can be the frame it was detected in or a resized copy of it"""
+        scale = image.shape[1] / self.image_width
+        if self.marker_ids is not None and len(self.marker_ids) > 0:
+            cv2.aruco.drawDetectedMarkers(image, [_rescale_points(corners, scale) for corners in self.marker_corners])
+        if self.charuco_ids is not None and len(self.charuco_ids) >= 4:
+            cv2.aruco.drawDetectedCornersCharuco(image, _rescale_points(self.charuco_corners, scale), self.charuco_ids)
+
+
+def detect_charuco(image: np.ndarray,
+                   charuco_board: CharucoBoardDefinition,
+                   detection_scale: float = 1.0,
+                   charuco_detector: cv2.aruco.CharucoDetector = None,
+                   timestamp_ns: int = None) -> CharucoDetection:
+    """
+    Detect the charuco board in a (BGR) frame. With `detection_scale` < 1 the board is searched for in a downscaled
+    copy of the frame (much faster on high resolution frames) and the corners are scaled back to the full frame.
+    """
+    detection_start_time_ns = time.perf_counter_ns()
+    if charuco_detector is None:
+        charuco_detector = charuco_board.charuco_detector
+
+    image_height, image_width = image.shape[:2]
+    if detection_scale < 1.0:
+        image = cv2.resize(image,
+                           (max(int(image_width * detection_scale), 1), max(int(image_height * detection_scale), 1)),
+                           interpolation=cv2.INTER_AREA)
+        # (the exact scale after rounding the size)
+        detection_scale = image.shape[1] / image_width
     image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
-    charuco_corners, charuco_ids, marker_corners, marker_ids = charuco_board.charuco_detector.detectBoard(image_gray)
-    if not (marker_ids is None) and len(marker_ids) > 0:
-        cv2.aruco.drawDetectedMarkers(image, marker_corners)
-    if not (charuco_ids is None) and len(charuco_ids) >= 4:
-        cv2.aruco.drawDetectedCornersCharuco(image, charuco_corners, charuco_ids)
\ No newline at end of file
+
+    charuco_corners, charuco_ids, marker_corners, marker_ids = charuco_detector.detectBoard(image_gray)
+    if detection_scale != 1.0:
+        if charuco_corners is not None:
+            charuco_corners = _rescale_points(charuco_corners, 1 / detection_scale)
+        marker_corners = [_rescale_points(corners, 1 / detection_scale) for corners in marker_corners]
+
+    return CharucoDetection(charuco_corners=charuco_corners,
+                            charuco_ids=charuco_ids,
+                            marker_corners=marker_corners,
+                            marker_ids=marker_ids,
+                            image_width=image_width,
+                            image_height=image_height,
+                            timestamp_ns=timestamp_ns,
+                            detection_duration_ns=time.perf_counter_ns() - detection_start_time_ns)
+
+
+def draw_charuco_on_image(image: np.ndarray, charuco_board: CharucoBoardDefinition) -> None:
+    detect_charuco(image=image, charuco_board=charuco_board).draw_on_image(image)
+
+
+def _rescale_points(points: np.ndarray, scale: float) -> np.ndarray:
+    # (pixel centers, so e.g. pixel 0 of a half size image covers pixels 0 and 1 of the full size one)
+    return ((points + 0.5) * scale - 0.5).astype(np.float32)
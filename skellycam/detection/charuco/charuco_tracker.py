@@ -0,0 +1,153 @@
+import logging
+from typing import Tuple, Union
+
+import cv2
+import numpy as np
+
+from skellycam.detection.charuco.charuco_definition import CharucoBoardDefinition
+from skellycam.detection.charuco.charuco_detection import CharucoDetection, detect_charuco
+
+logger = logging.getLogger(__name__)
+
+# the search region is the box around the previous frame's corners, grown by this fraction of its size on every side
+# (plus a minimum margin), so the board can move a bit between frames and markers at the edges aren't cut off
+REGION_OF_INTEREST_MARGIN = 0.25
+MIN_REGION_OF_INTEREST_MARGIN_PIXELS = 32
+# if searching the region finds less than this fraction of the corners found last time, search the whole frame
+MIN_FRACTION_OF_CORNERS_TO_KEEP_TRACKING = 0.75
+# a region this big (as a fraction of the frame) is hardly faster to search than the whole frame
+MAX_REGION_OF_INTEREST_AREA_FRACTION = 0.8
+SMOOTHING_FACTOR = 0.1
+
+
+class CharucoTracker:
+    """
+    Detects a charuco board frame after frame, only searching a region around where it was in the previous frame -
+    the board moves little between frames, and a small region is much faster to search than the whole frame.
+    When the board is lost (or was never found) the whole frame is searched.
+
+    Frames (or regions) wider than `detection_image_width` are downscaled before searching, so tracking a board that
+    fills a small part of the frame also gets more precise corners than a full frame search.
+    """
+
+    def __init__(self, charuco_board: CharucoBoardDefinition, detection_image_width: int = None):
+        self._charuco_board = charuco_board
+        self._detection_image_width = detection_image_width
+        self._charuco_detector = cv2.aruco.CharucoDetector(charuco_board.charuco_board)
+
+        self._previous_detection: Union[CharucoDetection, None] = None
+        self._number_of_region_of_interest_detections = 0
+        self._number_of_full_frame_detections = 0
+        self._region_of_interest_detection_duration_ns = None
+        self._full_frame_detection_duration_ns = None
+
+    @property
+    def charuco_board(self) -> CharucoBoardDefinition:
+        return self._charuco_board
+
+    @property
+    def number_of_region_of_interest_detections(self) -> int:
+        return self._number_of_region_of_interest_detections
+
+    @property
+    def number_of_full_frame_detections(self) -> int:
+        return self._number_of_full_frame_detections
+
+    @property
+    def region_of_interest_detection_ms(self) -> Union[float, None]:
+        """Smoothed time it takes to search the region around the board"""
+        return _ns_to_ms(self._region_of_interest_detection_duration_ns)
+
+    @property
+    def full_frame_detection_ms(self) -> Union[float, None]:
+        """Smoothed time it takes to search the whole frame"""
+        return _ns_to_ms(self._full_frame_detection_duration_ns)
+
+    def reset(self):
+        self._previous_detection = None
+
+    def detect(self, image: np.ndarray, timestamp_ns: int = None) -> CharucoDetection:
+        detection = None
+        region_of_interest = self._get_region_of_interest(image)
+        if region_of_interest is not None:
+            detection = self._detect_in_region(image, region_of_interest, timestamp_ns)
+            self._number_of_region_of_interest_detections += 1
+            self._region_of_interest_detection_duration_ns = _smooth(self._region_of_interest_detection_duration_ns,
+                                                                     detection.detection_duration_ns)
+            if detection.number_of_charuco_corners < (self._previous_detection.number_of_charuco_corners
+                                                      * MIN_FRACTION_OF_CORNERS_TO_KEEP_TRACKING):
+                logger.debug(f"Lost the charuco board in {region_of_interest} - searching the whole frame")
+                detection = None
+
+        if detection is None:
+            full_frame_detection = self._detect_in_region(image, None, timestamp_ns)
+            self._number_of_full_frame_detections += 1
+            self._full_frame_detection_duration_ns = _smooth(self._full_frame_detection_duration_ns,
+                                                             full_frame_detection.detection_duration_ns)
+            detection = full_frame_detection
+
+        self._previous_detection = detection if detection.number_of_charuco_corners > 0 else None
+        return detection
+
+    def _get_region_of_interest(self, image: np.ndarray) -> Union[Tuple[int, int, int, int], None]:
+        """(x, y, width, height) of the region to search, or `None` to search the whole frame"""
+        if self._previous_detection is None:
+            return None
+
+        previous_points = [self._previous_detection.charuco_corners.reshape(-1, 2)]
+        previous_points.extend(corners.reshape(-1, 2) for corners in self._previous_detection.marker_corners)
+        previous_points = np.concatenate(previous_points)
+        x_min, y_min = previous_points.min(axis=0)
+        x_max, y_max = previous_points.max(axis=0)
+
+        margin_x = max((x_max - x_min) * REGION_OF_INTEREST_MARGIN, MIN_REGION_OF_INTEREST_MARGIN_PIXELS)
+        margin_y = max((y_max - y_min) * REGION_OF_INTEREST_MARGIN, MIN_REGION_OF_INTEREST_MARGIN_PIXELS)
+        image_height, image_width = image.shape[:2]
+        x_start = int(max(x_min - margin_x, 0))
+        y_start = int(max(y_min - margin_y, 0))
+        x_end = int(min(np.ceil(x_max + margin_x) + 1, image_width))
+        y_end = int(min(np.ceil(y_max + margin_y) + 1, image_height))
+
+        if (x_end - x_start) * (y_end - y_start) >= image_width * image_height * MAX_REGION_OF_INTEREST_AREA_FRACTION:
+            return None
+        return x_start, y_start, x_end - x_start, y_end - y_start
+
+    def _detect_in_region(self,
+                          image: np.ndarray,
+                          region_of_interest: Union[Tuple[int, int, int, int], None],
+                          timestamp_ns: int) -> CharucoDetection:
+        image_height, image_width = image.shape[:2]
+        x_start, y_start = 0, 0
+        if region_of_interest is not None:
+            x_start, y_start, width, height = region_of_interest
+            image = image[y_start:y_start + height, x_start:x_start + width]  # (a view, no copy)
+
+        detection_scale = 1.0
+        if self._detection_image_width is not None:
+            detection_scale = min(1.0, self._detection_image_width / image.shape[1])
+
+        detection = detect_charuco(image=image,
+                                   charuco_board=self._charuco_board,
+                                   detection_scale=detection_scale,
+                                   charuco_detector=self._charuco_detector,
+                                   timestamp_ns=timestamp_ns)
+
+        # back to the coordinates of the whole frame
+        offset = np.array([x_start, y_start], dtype=np.float32)
+        if detection.charuco_corners is not None:
+            detection.charuco_corners = detection.charuco_corners + offset
+        detection.marker_corners = [corners + offset for corners in detection.marker_corners]
+        detection.image_width = image_width
+        detection.image_height = image_height
+        detection.region_of_interest = region_of_interest
+        return detection
+
+
+def _smooth(previous_value: Union[float, None], value: float) -> float:
+    if previous_value is None:
+        return float(value)
+    return previous_value + SMOOTHING_FACTOR * (value - previous_value)
+
+
+def _ns_to_ms(value_ns: Union[float, None]) -> Union[float, None]:
+    return None if value_ns is None else value_ns / 1e6
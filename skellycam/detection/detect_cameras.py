@@ -1,3 +1,5 @@
+from typing import List
+
 from skellycam.detection.private.detect_possible_cameras import DetectPossibleCameras
 from skellycam.detection.private.found_camera_cache import FoundCameraCache
 
@@ -6,11 +8,11 @@ _available_cameras: FoundCameraCache = None
 
 
 # If you want cams, you call this function
-def detect_cameras(use_cache=True):
+def detect_cameras(use_cache=True, camera_ids_already_open: List[str] = None):
     global _available_cameras
     if _available_cameras is None or not use_cache:
         d = DetectPossibleCameras()
-        _available_cameras = d.find_available_cameras()
+        _available_cameras = d.find_available_cameras(camera_ids_already_open=camera_ids_already_open)
 
     return _available_cameras
 
@@ -0,0 +1,17 @@
+import dataclasses
+from typing import Union
+
+
+@dataclasses.dataclass()
+class CameraPropertyUpdate:
+    """One property set on a capture device, and what the device says it is afterwards (see `apply_configuration`)"""
+    name: str  # the `CameraConfig` field
+    requested_value: Union[int, float, str]
+    read_back_value: Union[int, float, str] = None
+    latency_ms: float = None  # setting the property and reading it back
+
+    @property
+    def was_applied(self) -> bool:
+        if isinstance(self.requested_value, str):
+            return self.read_back_value == self.requested_value
+        return self.read_back_value is not None and abs(self.read_back_value - self.requested_value) < 0.5
@@ -0,0 +1,10 @@
+import dataclasses
+
+
+@dataclasses.dataclass()
+class CameraRecordingProgress:
+    """How a camera's recording is going (see `SynchronizedRecorder.progress`)"""
+    frames_recorded: int = 0
+    frames_per_second: float = None
+    number_of_frames_dropped: int = 0
+    queue_size: int = 0  # frames waiting to be recorded
@@ -0,0 +1,18 @@
+import dataclasses
+
+
+@dataclasses.dataclass()
+class CameraStartupTimings:
+    """How long each phase of starting a camera took, in milliseconds (see `CameraGroup.startup_timings`)"""
+    spawn_ms: float = None  # from `CameraGroup.start` to the camera's process running
+    open_ms: float = None  # opening the capture device
+    configure_ms: float = None  # checking it delivers frames, and applying the camera config
+    first_frame_ms: float = None  # from configured to the first frame captured with the config
+    total_ms: float = None  # from `CameraGroup.start` to the first frame
+
+    def __str__(self):
+        phase_strings = []
+        for field in dataclasses.fields(self):
+            duration_ms = getattr(self, field.name)
+            phase_strings.append(f"{field.name}: {duration_ms:.0f}" if duration_ms is not None else f"{field.name}: -")
+        return ", ".join(phase_strings)
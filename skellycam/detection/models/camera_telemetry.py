@@ -0,0 +1,13 @@
+import dataclasses
+
+
+@dataclasses.dataclass()
+class CameraTelemetry:
+    """Snapshot of what a camera process last published about one of its cameras (see `SharedCameraTelemetry`)"""
+    queue_size: int = 0  # frames put in the camera's queue that haven't been taken out yet
+    number_of_frames_put: int = 0
+    frames_per_second: float = None
+    frame_interval_jitter_ms: float = None
+    number_of_frames_dropped: int = 0
+    capture_to_queue_latency_ms: float = None  # from frame capture to the frame being in the queue
+    seconds_since_published: float = None  # how stale the fps/drops/latency are
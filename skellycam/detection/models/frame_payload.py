@@ -2,14 +2,18 @@ import dataclasses
 
 import numpy as np
 
+from skellycam.detection.models.frame_rate_statistics import FrameRateStatistics
+
 
 @dataclasses.dataclass()
 class FramePayload:
     success: bool = False
     image: np.ndarray = None
-    timestamp_ns: float = None
+    timestamp_ns: int = None  # `time.perf_counter_ns()` - keep it an int, floats lose precision above 2**53
     number_of_frames_received: int = None  # how many frames have been grabbed from this camera?
     number_of_frames_recorded: int = None  # how many frames have been recorded (to be dumped to video)?
     camera_id: str = None
     mean_frames_per_second: float = None
     queue_size: int = None
+    frame_rate_statistics: FrameRateStatistics = None
+    number_of_frames_missed: int = None  # frames the camera produced right before this one that we never received
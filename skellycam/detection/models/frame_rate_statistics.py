@@ -0,0 +1,11 @@
+import dataclasses
+
+
+@dataclasses.dataclass()
+class FrameRateStatistics:
+    """Snapshot of a camera's rolling frame rate statistics (see `RollingFrameRateStatistics`)"""
+    frames_per_second: float = None  # exponentially weighted moving average
+    frame_interval_jitter_ms: float = None  # exponentially weighted standard deviation of the frame interval
+    min_frame_interval_ms: float = None  # over the last `window_size` frames
+    max_frame_interval_ms: float = None  # over the last `window_size` frames
+    number_of_frames_dropped: int = 0  # frames the camera produced that we never received
@@ -1,5 +1,6 @@
 import logging
 import time
+from typing import List
 
 import cv2
 import numpy as np
@@ -13,12 +14,20 @@ logger = logging.getLogger(__name__)
 
 
 class DetectPossibleCameras:
-    def find_available_cameras(self) -> FoundCameraCache:
+    def find_available_cameras(self, camera_ids_already_open: List[str] = None) -> FoundCameraCache:
+        """
+        `camera_ids_already_open` are cameras this process is capturing from - they are counted as found without
+        being opened again (which would fail, or disturb them)
+        """
         cv2_backend = determine_backend()
+        camera_ids_already_open = [str(camera_id) for camera_id in camera_ids_already_open or []]
 
         cams_to_use_list = []
         caps_list = []
         for cam_id in range(CAM_CHECK_NUM):
+            if str(cam_id) in camera_ids_already_open:
+                cams_to_use_list.append(str(cam_id))
+                continue
             cap = cv2.VideoCapture(cam_id, cv2_backend)
             success, image1 = cap.read()
             time0 = time.perf_counter()
@@ -1,25 +1,20 @@
 from pathlib import Path
+from typing import Dict
 
 import cv2
+import numpy as np
 
 from skellycam.utils.start_file import open_file
 
 
 def plot_first_middle_and_last_frames(
-        synchronized_frame_list_dictionary,
+        first_middle_and_last_frames_dictionary: Dict[str, Dict[int, np.ndarray]],
         path_to_save_plots_png,
-        first_frame_number: int = 0,
-        end_frame_number: int = -1,
         open_image_after_saving: bool = False,
 ):
     import matplotlib.pyplot as plt
 
-    if end_frame_number == -1:
-        end_frame_number = len(list(synchronized_frame_list_dictionary.values())[0])
-
-    middle_frame_number = (end_frame_number - first_frame_number) // 2
-
-    number_of_cameras = len(synchronized_frame_list_dictionary)
+    number_of_cameras = len(first_middle_and_last_frames_dictionary)
 
     fig = plt.Figure(figsize=(10, 10))
 
@@ -27,12 +22,16 @@ def plot_first_middle_and_last_frames(
     recording_name = Path(path_to_save_plots_png).parent.parent.stem
     fig.suptitle(f"Timestamps of synchronized frames\nsession: {session_name}, recording: {recording_name}")
 
-    for camera_number, item in enumerate(synchronized_frame_list_dictionary.items()):
-        camera_id, frame_payload_list = item
+    for camera_number, item in enumerate(first_middle_and_last_frames_dictionary.items()):
+        camera_id, image_dictionary = item
+        frame_numbers = sorted(image_dictionary.keys())
+        first_frame_number = frame_numbers[0]
+        middle_frame_number = frame_numbers[len(frame_numbers) // 2]
+        last_frame_number = frame_numbers[-1]
 
-        first_frame = cv2.cvtColor(frame_payload_list[first_frame_number].image, cv2.COLOR_BGR2RGB)
-        mid_frame = cv2.cvtColor(frame_payload_list[middle_frame_number].image, cv2.COLOR_BGR2RGB)
-        last_frame = cv2.cvtColor(frame_payload_list[end_frame_number - 1].image, cv2.COLOR_BGR2RGB)
+        first_frame = cv2.cvtColor(image_dictionary[first_frame_number], cv2.COLOR_BGR2RGB)
+        mid_frame = cv2.cvtColor(image_dictionary[middle_frame_number], cv2.COLOR_BGR2RGB)
+        last_frame = cv2.cvtColor(image_dictionary[last_frame_number], cv2.COLOR_BGR2RGB)
 
         number_of_columns = 3
         first_frame_ax = fig.add_subplot(number_of_cameras, number_of_columns, (camera_number * number_of_columns) + 1)
@@ -55,7 +54,7 @@ def plot_first_middle_and_last_frames(
         last_frame_ax.set_xticks([])
         last_frame_ax.set_yticks([])
         if camera_number == 0:
-            last_frame_ax.set_title(f"Last frame (frame number: {end_frame_number - 1})")
+            last_frame_ax.set_title(f"Last frame (frame number: {last_frame_number})")
     fig.tight_layout()
     fig.savefig(path_to_save_plots_png)
 
@@ -1,20 +1,18 @@
 import logging
 import time
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, Tuple, Union
 
 import numpy as np
 from pydantic import BaseModel
 from rich import print
-from scipy.stats import median_abs_deviation
 
-from skellycam.detection.detect_cameras import detect_cameras
-from skellycam.detection.models.frame_payload import FramePayload
-from skellycam.opencv.group.camera_group import CameraGroup
 from skellycam.utils.start_file import open_file
 
 logger = logging.getLogger(__name__)
 
+MAX_NUMBER_OF_POINTS_PER_LINE = 2000
+
 
 class TimestampDiagnosticsDataClass(BaseModel):
     mean_framerates_per_camera: dict
@@ -27,41 +25,52 @@ class TimestampDiagnosticsDataClass(BaseModel):
     mean_median_absolute_deviation_per_camera: float
 
 
-def gather_timestamps(list_of_frames: List[FramePayload]) -> np.ndarray:
-    timestamps_npy = np.empty(0)
+def downsample_for_plotting(values: np.ndarray,
+                            max_number_of_points: int = MAX_NUMBER_OF_POINTS_PER_LINE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Frame numbers and values of at most `max_number_of_points` points to plot instead of `values` - the min and max of
+    each block of frames are kept, so spikes (e.g. dropped frames in a duration trace) still show up
+    """
+    values = np.asarray(values)
+    if len(values) <= max_number_of_points:
+        return np.arange(len(values)), values
+
+    block_size = int(np.ceil(len(values) / (max_number_of_points // 2)))
+    number_of_blocks = len(values) // block_size
+    blocks = values[:number_of_blocks * block_size].reshape(number_of_blocks, block_size)
+    block_starts = np.arange(number_of_blocks) * block_size
+    argmins = block_starts + np.argmin(blocks, axis=1)
+    argmaxes = block_starts + np.argmax(blocks, axis=1)
 
-    for frame in list_of_frames:
-        timestamps_npy = np.append(timestamps_npy, frame.timestamp_ns)
-    return timestamps_npy
+    leftover_frame_numbers = np.arange(number_of_blocks * block_size, len(values))
+    frame_numbers = np.unique(np.concatenate([argmins, argmaxes, leftover_frame_numbers]))
+    return frame_numbers, values[frame_numbers]
 
 
 def create_timestamp_diagnostic_plots(
-        raw_frame_list_dictionary: Dict[str, List[FramePayload]],
-        synchronized_frame_list_dictionary: Dict[str, List[FramePayload]],
+        raw_timestamps_dictionary: Dict[str, np.ndarray],
+        synchronized_timestamps_dictionary: Dict[str, np.ndarray],
         path_to_save_plots_png: Union[str, Path],
         open_image_after_saving: bool = False,
 ):
-    """plot some diagnostics to assess quality of camera sync"""
+    """
+    plot some diagnostics to assess quality of camera sync (timestamps are in nanoseconds) - long recordings are
+    downsampled (see `downsample_for_plotting`), histograms are binned with numpy before plotting
+    """
 
     # opportunistic load of matplotlib to avoid startup time costs
     from matplotlib import pyplot as plt
 
     plt.set_loglevel("warning")
 
-    synchronized_timestamps_dictionary = {}
-    for (
-            camera_id,
-            camera_synchronized_frame_list,
-    ) in synchronized_frame_list_dictionary.items():
-        synchronized_timestamps_dictionary[camera_id] = (
-                gather_timestamps(camera_synchronized_frame_list) / 1e9
-        )
-
-    raw_timestamps_dictionary = {}
-    for camera_id, camera_raw_frame_list in raw_frame_list_dictionary.items():
-        raw_timestamps_dictionary[camera_id] = (
-                gather_timestamps(camera_raw_frame_list) / 1e9
-        )
+    synchronized_timestamps_dictionary = {
+        camera_id: np.asarray(timestamps) / 1e9
+        for camera_id, timestamps in synchronized_timestamps_dictionary.items()
+    }
+    raw_timestamps_dictionary = {
+        camera_id: np.asarray(timestamps) / 1e9
+        for camera_id, timestamps in raw_timestamps_dictionary.items()
+    }
 
     max_frame_duration = 0.1
     fig = plt.figure(figsize=(18, 12))
@@ -110,25 +119,18 @@ def create_timestamp_diagnostic_plots(
         ylabel="Probability",
     )
 
-    for camera_id, timestamps in raw_timestamps_dictionary.items():
-        ax1.plot(timestamps, label=f"Camera# {str(camera_id)}")
-        ax1.legend()
-        ax2.plot(np.diff(timestamps), ".")
-        ax3.hist(
-            np.diff(timestamps),
-            bins=np.arange(0, max_frame_duration, 0.0025),
-            alpha=0.5,
-        )
-
-    for camera_id, timestamps in synchronized_timestamps_dictionary.items():
-        ax4.plot(timestamps, label=f"Camera# {str(camera_id)}")
-        ax4.legend()
-        ax5.plot(np.diff(timestamps), ".")
-        ax6.hist(
-            np.diff(timestamps),
-            bins=np.arange(0, max_frame_duration, 0.0025),
-            alpha=0.5,
-        )
+    histogram_bins = np.arange(0, max_frame_duration, 0.0025)
+    for timestamps_dictionary, timestamp_ax, duration_ax, histogram_ax in [
+        (raw_timestamps_dictionary, ax1, ax2, ax3),
+        (synchronized_timestamps_dictionary, ax4, ax5, ax6),
+    ]:
+        for camera_id, timestamps in timestamps_dictionary.items():
+            timestamp_ax.plot(*downsample_for_plotting(timestamps), label=f"Camera# {str(camera_id)}")
+            timestamp_ax.legend()
+            frame_durations = np.diff(timestamps)
+            duration_ax.plot(*downsample_for_plotting(frame_durations), ".")
+            histogram_counts, _ = np.histogram(frame_durations, bins=histogram_bins)
+            histogram_ax.stairs(histogram_counts, histogram_bins, fill=True, alpha=0.5)
 
     plt.tight_layout()
 
@@ -143,6 +145,9 @@ def create_timestamp_diagnostic_plots(
 def calculate_camera_diagnostic_results(
         timestamps_dictionary,
 ) -> TimestampDiagnosticsDataClass:
+    # opportunistic load of scipy to avoid startup time costs
+    from scipy.stats import median_abs_deviation
+
     mean_framerates_per_camera = {}
     standard_deviation_framerates_per_camera = {}
     median_framerates_per_camera = {}
@@ -185,6 +190,9 @@ def calculate_camera_diagnostic_results(
 
 
 if __name__ == "__main__":
+    from skellycam.detection.detect_cameras import detect_cameras
+    from skellycam.opencv.group.camera_group import CameraGroup
+
     found_camera_response = detect_cameras()
     cam_ids = found_camera_response.cameras_found_list
     g = CameraGroup(cam_ids)
@@ -0,0 +1,191 @@
+import json
+import logging
+import multiprocessing
+import platform
+from pathlib import Path
+from typing import Dict, List, Union
+
+import numpy as np
+
+from skellycam.diagnostics.plot_framerate_diagnostics import calculate_camera_diagnostic_results
+from skellycam.opencv.video_recorder.camera_timestamp_log import load_camera_timestamp_log
+from skellycam.system.environment.default_paths import RAW_TIMESTAMPS_FOLDER_NAME, TIMESTAMPS_FOLDER_NAME
+from skellycam.system.log_config.logsetup import configure_process_logging
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_DIAGNOSTICS_REPORT_FILE_NAME = "timestamp_diagnostics.json"
+
+
+def launch_recording_diagnostics_process(
+        synchronized_videos_folder_path: Union[str, Path, List[Union[str, Path]]],
+        video_file_extension: str = ".mp4",
+        open_plots_after_saving: bool = False,
+) -> multiprocessing.Process:
+    """
+    Create the diagnostics of a saved recording in a separate, low priority process, so saving doesn't wait on them.
+    Give it a list of folders (e.g. the segments of a segmented recording) to do them one after another
+    """
+    if isinstance(synchronized_videos_folder_path, (str, Path)):
+        synchronized_videos_folder_path = [synchronized_videos_folder_path]
+    synchronized_videos_folder_paths = [str(folder_path) for folder_path in synchronized_videos_folder_path]
+
+    # `spawn` - forking a process with camera/Qt threads running is asking for trouble
+    diagnostics_process = multiprocessing.get_context("spawn").Process(
+        target=_run_recording_diagnostics_at_low_priority,
+        args=(synchronized_videos_folder_paths, video_file_extension, open_plots_after_saving),
+        name="recording_diagnostics",
+    )
+    diagnostics_process.start()
+    logger.info(f"Launched recording diagnostics process (PID: {diagnostics_process.pid}) for: "
+                f"{synchronized_videos_folder_paths}")
+    return diagnostics_process
+
+
+def create_recording_diagnostics(
+        synchronized_videos_folder_path: Union[str, Path],
+        video_file_extension: str = ".mp4",
+        open_plots_after_saving: bool = False,
+):
+    """
+    Everything is read back from disk (the raw timestamp logs, the synchronized timestamps, and the videos).
+    The numeric report is written first, then the (slower) plots
+    """
+    synchronized_videos_folder_path = Path(synchronized_videos_folder_path)
+    timestamps_folder_path = synchronized_videos_folder_path / TIMESTAMPS_FOLDER_NAME
+
+    raw_timestamps_dictionary = load_raw_timestamps(timestamps_folder_path / RAW_TIMESTAMPS_FOLDER_NAME)
+    synchronized_timestamps_dictionary = load_synchronized_timestamps(timestamps_folder_path)
+
+    save_timestamp_diagnostics_report(
+        raw_timestamps_dictionary=raw_timestamps_dictionary,
+        synchronized_timestamps_dictionary=synchronized_timestamps_dictionary,
+        path_to_save_json=synchronized_videos_folder_path / TIMESTAMP_DIAGNOSTICS_REPORT_FILE_NAME,
+    )
+
+    # opportunistic imports - matplotlib (and the video reader) are only needed from here on
+    from skellycam.diagnostics.plot_first_middle_and_last_frames import plot_first_middle_and_last_frames
+    from skellycam.diagnostics.plot_framerate_diagnostics import create_timestamp_diagnostic_plots
+
+    create_timestamp_diagnostic_plots(
+        raw_timestamps_dictionary=raw_timestamps_dictionary,
+        synchronized_timestamps_dictionary=synchronized_timestamps_dictionary,
+        path_to_save_plots_png=synchronized_videos_folder_path / "timestamp_diagnostic_plots.png",
+        open_image_after_saving=open_plots_after_saving,
+    )
+
+    plot_first_middle_and_last_frames(
+        first_middle_and_last_frames_dictionary=read_first_middle_and_last_frames(synchronized_videos_folder_path,
+                                                                                  video_file_extension),
+        path_to_save_plots_png=synchronized_videos_folder_path / "first_and_last_frames.png",
+        open_image_after_saving=open_plots_after_saving,
+    )
+    logger.info(f"Finished creating recording diagnostics for: {synchronized_videos_folder_path}")
+
+
+def save_timestamp_diagnostics_report(
+        raw_timestamps_dictionary: Dict[str, np.ndarray],
+        synchronized_timestamps_dictionary: Dict[str, np.ndarray],
+        path_to_save_json: Union[str, Path],
+):
+    timestamp_diagnostics_report = {
+        "raw": _get_timestamp_summary(raw_timestamps_dictionary),
+        "synchronized": _get_timestamp_summary(synchronized_timestamps_dictionary),
+    }
+
+    if len(synchronized_timestamps_dictionary) > 1:
+        # how far apart the cameras' frames are within each synchronized frame
+        number_of_frames = min(len(timestamps) for timestamps in synchronized_timestamps_dictionary.values())
+        synchronized_timestamps = np.stack(
+            [timestamps[:number_of_frames] for timestamps in synchronized_timestamps_dictionary.values()]
+        )
+        spread_ms = (synchronized_timestamps.max(axis=0) - synchronized_timestamps.min(axis=0)) / 1e6
+        timestamp_diagnostics_report["synchronized_frame_spread_ms"] = {
+            "mean": float(np.mean(spread_ms)),
+            "median": float(np.median(spread_ms)),
+            "max": float(np.max(spread_ms)),
+        }
+
+    with open(path_to_save_json, "w") as file:
+        json.dump(timestamp_diagnostics_report, file, indent=4)
+    logger.info(f"Saved timestamp diagnostics report to path: {str(path_to_save_json)}")
+
+
+def load_raw_timestamps(raw_timestamps_folder_path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    return {
+        raw_timestamp_log_path.stem.replace("_raw_timestamp_log", ""):
+            load_camera_timestamp_log(raw_timestamp_log_path)["timestamp_ns"]
+        for raw_timestamp_log_path in sorted(Path(raw_timestamps_folder_path).glob("*_raw_timestamp_log.bin"))
+    }
+
+
+def load_synchronized_timestamps(timestamps_folder_path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    return {
+        timestamps_path.stem.replace("_synchronized_binary", ""): np.load(str(timestamps_path))
+        for timestamps_path in sorted(Path(timestamps_folder_path).glob("*_synchronized_binary.npy"))
+    }
+
+
+def read_first_middle_and_last_frames(synchronized_videos_folder_path: Union[str, Path],
+                                      video_file_extension: str = ".mp4") -> Dict[str, Dict[int, np.ndarray]]:
+    from skellycam.opencv.video_reader.indexed_video_reader import IndexedVideoReader
+
+    first_middle_and_last_frames_dictionary = {}
+    for video_path in sorted(Path(synchronized_videos_folder_path).glob(f"*{video_file_extension}")):
+        with IndexedVideoReader(video_path) as video_reader:
+            end_frame_number = video_reader.number_of_frames
+            first_middle_and_last_frames_dictionary[video_path.stem.replace("_synchronized", "")] = {
+                frame_number: video_reader.read_frame(frame_number)
+                for frame_number in [0, end_frame_number // 2, end_frame_number - 1]
+            }
+    return first_middle_and_last_frames_dictionary
+
+
+def _get_timestamp_summary(timestamps_dictionary: Dict[str, np.ndarray]) -> dict:
+    timestamps_dictionary = {
+        camera_name: timestamps for camera_name, timestamps in timestamps_dictionary.items() if len(timestamps) > 1
+    }
+    if len(timestamps_dictionary) == 0:
+        return {}
+
+    timestamp_summary = calculate_camera_diagnostic_results(timestamps_dictionary).dict()
+    timestamp_summary["number_of_frames_per_camera"] = {
+        camera_name: len(timestamps) for camera_name, timestamps in timestamps_dictionary.items()
+    }
+    timestamp_summary["duration_seconds_per_camera"] = {
+        camera_name: float(timestamps[-1] - timestamps[0]) / 1e9
+        for camera_name, timestamps in timestamps_dictionary.items()
+    }
+    timestamp_summary["max_frame_duration_ms_per_camera"] = {
+        camera_name: float(np.max(np.diff(timestamps))) / 1e6
+        for camera_name, timestamps in timestamps_dictionary.items()
+    }
+    return timestamp_summary
+
+
+def _run_recording_diagnostics_at_low_priority(synchronized_videos_folder_paths: List[str],
+                                               video_file_extension: str,
+                                               open_plots_after_saving: bool):
+    configure_process_logging()
+    import psutil
+
+    try:
+        if platform.system() == "Windows":
+            psutil.Process().nice(psutil.BELOW_NORMAL_PRIORITY_CLASS)
+        else:
+            psutil.Process().nice(10)
+    except psutil.Error as e:
+        logger.warning(f"Could not lower the priority of the recording diagnostics process: {e}")
+
+    # no windows get opened by matplotlib itself, the saved images are opened with the system viewer
+    import matplotlib
+    matplotlib.use("Agg")
+
+    for synchronized_videos_folder_path in synchronized_videos_folder_paths:
+        try:
+            create_recording_diagnostics(synchronized_videos_folder_path=synchronized_videos_folder_path,
+                                         video_file_extension=video_file_extension,
+                                         open_plots_after_saving=open_plots_after_saving)
+        except Exception as e:
+            logger.error(f"Failed to create recording diagnostics for {synchronized_videos_folder_path}: {e}")
+            logger.exception(e)
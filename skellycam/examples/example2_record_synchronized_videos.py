@@ -1,13 +1,14 @@
-from skellycam.experiments import MultiCameraVideoRecorder
+from skellycam import SynchronizedRecorder
 
 if __name__ == "__main__":
     """
     Connects to every available (opencv compatible) USB camera and applies a default configuration (if not specified by a dictionary of the form {camera_id: CameraConfig}.
-    Displays camera views in opencv `cv2.imshow` windows.
-    Records synchronized videos (as `.mp4` files) to a session folder in the default video save path (`[users_home_directory]/skelly-cam-recordings`).
+    Records a few short synchronized videos (as `.mp4` files) to the session folder in the default video save path (`[users_home_directory]/skelly-cam-recordings`), keeping the cameras open in between.
 
-    Also creates diagnostic plots to ensure synchronization and a `session_information.json` file
+    Each recording's result points to its videos, timestamps and synchronization map.
 
     """
-    synchronized_video_recorder = MultiCameraVideoRecorder()
-    synchronized_video_recorder.run()
+    with SynchronizedRecorder() as synchronized_recorder:
+        for trial_number in range(3):
+            recording_result = synchronized_recorder.record(duration_seconds=5)
+            print(f"Trial {trial_number}: {recording_result.video_paths}")
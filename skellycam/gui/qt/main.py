@@ -25,4 +25,8 @@ def qt_gui_main():
 
 
 if __name__ == "__main__":
+    from skellycam.system.environment.default_paths import get_log_file_path
+    from skellycam.system.log_config.logsetup import configure_logging
+
+    configure_logging(log_file_path=get_log_file_path())
     qt_gui_main()
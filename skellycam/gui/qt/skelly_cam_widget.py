@@ -17,6 +17,9 @@ from skellycam.gui.qt.utilities.qt_label_strings import no_cameras_found_message
 from skellycam.gui.qt.widgets.single_camera_view_widget import SingleCameraViewWidget
 from skellycam.gui.qt.workers.camera_group_thread_worker import CamGroupThreadWorker
 from skellycam.gui.qt.workers.detect_cameras_worker import DetectCamerasWorker
+from skellycam.opencv.video_recorder.models.calibration_frame_selection_config import \
+    CalibrationFrameSelectionConfig
+from skellycam.opencv.video_recorder.models.segment_config import SegmentConfig
 from skellycam.system.environment.default_paths import MAGNIFYING_GLASS_EMOJI_STRING, CAMERA_WITH_FLASH_EMOJI_STRING
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,7 @@ class SkellyCamWidget(QWidget):
     cameras_connected_signal = Signal()
     camera_group_created_signal = Signal(dict)
     incoming_camera_configs_signal = Signal(dict)
+    # (for a segmented recording, the folder holds `segment_###` folders of videos - see `RecordingSession`)
     videos_saved_to_this_folder_signal = Signal(str)
 
     def __init__(
@@ -142,6 +146,7 @@ class SkellyCamWidget(QWidget):
             single_camera_view = SingleCameraViewWidget(camera_id=camera_id,
                                                         camera_config=camera_config,
                                                         parent=self)
+            single_camera_view.preview_size_changed_signal.connect(self._cam_group_frame_worker.set_preview_size)
 
             if self._get_landscape_or_portrait(camera_config) == "landscape":
                 landscape_camera_number += 1
@@ -164,10 +169,15 @@ class SkellyCamWidget(QWidget):
         return dictionary_of_single_camera_view_widgets
 
     def detect_available_cameras(self):
-        try:
-            self.disconnect_from_cameras()
-        except Exception as e:
-            logger.error(f"Problem disconnecting from cameras: {e}")
+        # cameras that are running stay open (and are counted as found) - see `CamGroupThreadWorker.camera_ids`
+        camera_ids_already_open = None
+        if self._cameras_stay_open_through_detection():
+            camera_ids_already_open = self._cam_group_frame_worker.camera_ids
+        else:
+            try:
+                self.disconnect_from_cameras()
+            except Exception as e:
+                logger.error(f"Problem disconnecting from cameras: {e}")
 
         logger.info("Connecting to cameras")
 
@@ -175,16 +185,31 @@ class SkellyCamWidget(QWidget):
         self._detect_available_cameras_push_button.setEnabled(False)
         self._cameras_disconnected_label.hide()
 
-        self._detect_cameras_worker = DetectCamerasWorker()
+        self._detect_cameras_worker = DetectCamerasWorker(camera_ids_already_open=camera_ids_already_open)
         self._detect_cameras_worker.cameras_detected_signal.connect(
             self._handle_detected_cameras
         )
         self._detect_cameras_worker.start()
 
+    def _cameras_stay_open_through_detection(self) -> bool:
+        try:
+            return (self._cam_group_frame_worker.isRunning()
+                    and self._cam_group_frame_worker.cameras_connected
+                    and not self._cam_group_frame_worker.is_recording)
+        except AttributeError:
+            return False  # (no camera group yet)
+
     def _start_camera_group_frame_worker(self, camera_ids):
+        if self._cam_group_frame_worker.isRunning():
+            logger.info(f"Camera group frame worker is running - switching it to camera_ids: {camera_ids}")
+            # (the camera views are rebuilt once the switch is done - see `_handle_camera_ids_updated`)
+            self._cam_group_frame_worker.camera_ids = camera_ids
+            return
 
         logger.info(f"Starting camera group frame worker with camera_ids: {camera_ids}")
         self._cam_group_frame_worker.annotate_images = self.annotate_images
+        if self.screen() is not None:
+            self._cam_group_frame_worker.display_refresh_rate = self.screen().refreshRate()
         self._cam_group_frame_worker.camera_ids = camera_ids
         self._dictionary_of_single_camera_view_widgets = self._create_camera_view_widgets_and_add_them_to_grid_layout(
             camera_config_dictionary=self._cam_group_frame_worker.camera_config_dictionary
@@ -228,6 +253,10 @@ class SkellyCamWidget(QWidget):
             self.camera_group_created_signal.emit
         )
 
+        cam_group_frame_worker.camera_ids_updated_signal.connect(
+            self._handle_camera_ids_updated
+        )
+
         cam_group_frame_worker.videos_saved_to_this_folder_signal.connect(
             self._handle_cam_group_frame_worker_videos_saved_to_this_folder
         )
@@ -253,14 +282,27 @@ class SkellyCamWidget(QWidget):
         )
         self._start_camera_group_frame_worker(self._camera_ids)
 
+    def _handle_camera_ids_updated(self, camera_config_dictionary: Dict[str, CameraConfig]):
+        self._clear_camera_grid_view(self._dictionary_of_single_camera_view_widgets)
+        self._dictionary_of_single_camera_view_widgets = self._create_camera_view_widgets_and_add_them_to_grid_layout(
+            camera_config_dictionary=camera_config_dictionary)
+        for camera_id, camera_config in camera_config_dictionary.items():
+            if not camera_config.use_this_camera:
+                self._dictionary_of_single_camera_view_widgets[camera_id].hide()
+        self._reset_detect_available_cameras_button()
+
     def _handle_cameras_connected(self):
         self.cameras_connected_signal.emit()
         self._reset_detect_available_cameras_button()
 
     @Slot(str, QImage, dict)
     def _handle_image_update(self, camera_id: str, q_image: QImage, frame_diagnostics_dictionary: Dict):
-        self._dictionary_of_single_camera_view_widgets[camera_id].handle_image_update(q_image=q_image,
-                                                                                      frame_diagnostics_dictionary=frame_diagnostics_dictionary)
+        try:
+            self._dictionary_of_single_camera_view_widgets[camera_id].handle_image_update(
+                q_image=q_image,
+                frame_diagnostics_dictionary=frame_diagnostics_dictionary)
+        finally:
+            self._cam_group_frame_worker.acknowledge_preview(camera_id)
 
     def _reset_detect_available_cameras_button(self):
         self._detect_available_cameras_push_button.setText("Detect Available Cameras")
@@ -290,6 +332,20 @@ class SkellyCamWidget(QWidget):
     def set_charuco_board(self, charuco_name: str):
         self._cam_group_frame_worker.charuco_board = charuco_name
 
+    def set_video_encoder_preset(self, video_encoder_preset_name: str):
+        self._cam_group_frame_worker.video_encoder_config = video_encoder_preset_name
+
+    def set_segment_config(self, segment_config: SegmentConfig):
+        self._cam_group_frame_worker.segment_config = segment_config
+
+    def set_calibration_frame_selection_config(self,
+                                               calibration_frame_selection_config: Union[
+                                                   CalibrationFrameSelectionConfig, None]):
+        self._cam_group_frame_worker.calibration_frame_selection_config = calibration_frame_selection_config
+
+    def set_preview_frames_per_second(self, preview_frames_per_second: float):
+        self._cam_group_frame_worker.preview_frames_per_second = preview_frames_per_second
+
     def _get_landscape_or_portrait(self, camera_config: CameraConfig) -> str:
         if (
                 camera_config.rotate_video_cv2_code == cv2.ROTATE_90_CLOCKWISE
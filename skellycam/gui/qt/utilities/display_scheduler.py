@@ -0,0 +1,96 @@
+import logging
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREVIEW_FRAMES_PER_SECOND = 15
+# previews sent to the GUI that it hasn't painted yet - past this, the GUI is behind and frames are skipped
+MAX_NUMBER_OF_PREVIEWS_IN_FLIGHT = 2
+SMOOTHING_FACTOR = 0.1
+# frames don't arrive exactly on time - one that arrives a little early is still due (a 60 fps camera should give a
+# steady 15 fps preview, not every 5th frame)
+PREVIEW_INTERVAL_TOLERANCE = 0.1
+
+
+class DisplayScheduler:
+    """
+    Decides which frames get shown in the GUI, independently of how fast the cameras run (every frame is still
+    recorded - this only throttles the previews).
+
+    Each camera is shown at most every `preview_interval_ns`, which is the slowest of: the requested preview frame
+    rate, the monitor's refresh rate, and how long the GUI has recently been taking to paint a camera's previews.
+    A camera whose previous previews haven't been painted yet is skipped until the GUI catches up. Since frames are
+    checked as they arrive, whichever frame is in hand when a camera is due is the newest one.
+    """
+
+    def __init__(self, preview_frames_per_second: float = DEFAULT_PREVIEW_FRAMES_PER_SECOND):
+        self._preview_frames_per_second = preview_frames_per_second
+        self._display_refresh_rate = None
+
+        self._last_display_time_ns: Dict[str, int] = {}
+        # each counter is only written by one thread - the worker counts what it sends, the GUI what it has painted
+        self._number_of_previews_sent: Dict[str, int] = {}
+        self._number_of_previews_painted: Dict[str, int] = {}
+        self._paint_latency_ns: Dict[str, float] = {}
+        self._number_of_frames_skipped = 0
+
+    @property
+    def preview_frames_per_second(self) -> float:
+        return self._preview_frames_per_second
+
+    @preview_frames_per_second.setter
+    def preview_frames_per_second(self, preview_frames_per_second: float):
+        self._preview_frames_per_second = preview_frames_per_second
+        logger.info(f"Preview frame rate set to {preview_frames_per_second} fps")
+
+    @property
+    def display_refresh_rate(self) -> float:
+        return self._display_refresh_rate
+
+    @display_refresh_rate.setter
+    def display_refresh_rate(self, display_refresh_rate: float):
+        self._display_refresh_rate = display_refresh_rate if display_refresh_rate and display_refresh_rate > 0 else None
+
+    @property
+    def number_of_frames_skipped(self) -> int:
+        return self._number_of_frames_skipped
+
+    def preview_interval_ns(self, camera_id: str) -> float:
+        frames_per_second = self._preview_frames_per_second
+        if self._display_refresh_rate is not None:
+            frames_per_second = min(frames_per_second, self._display_refresh_rate)
+        return max(1e9 / frames_per_second, self._paint_latency_ns.get(camera_id, 0))
+
+    def should_display(self, camera_id: str, now_ns: int = None) -> bool:
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+
+        number_of_previews_in_flight = (self._number_of_previews_sent.get(camera_id, 0)
+                                        - self._number_of_previews_painted.get(camera_id, 0))
+        last_display_time_ns = self._last_display_time_ns.get(camera_id)
+
+        if number_of_previews_in_flight >= MAX_NUMBER_OF_PREVIEWS_IN_FLIGHT or (
+                last_display_time_ns is not None
+                and now_ns - last_display_time_ns < self.preview_interval_ns(camera_id) * (
+                        1 - PREVIEW_INTERVAL_TOLERANCE)):
+            self._number_of_frames_skipped += 1
+            return False
+
+        self._last_display_time_ns[camera_id] = now_ns
+        self._number_of_previews_sent[camera_id] = self._number_of_previews_sent.get(camera_id, 0) + 1
+        return True
+
+    def acknowledge(self, camera_id: str, now_ns: int = None):
+        """Called (from the GUI thread) once a camera's preview has been painted"""
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+
+        self._number_of_previews_painted[camera_id] = self._number_of_previews_painted.get(camera_id, 0) + 1
+
+        last_display_time_ns = self._last_display_time_ns.get(camera_id)
+        if last_display_time_ns is not None:
+            paint_latency_ns = now_ns - last_display_time_ns
+            previous_paint_latency_ns = self._paint_latency_ns.get(camera_id, paint_latency_ns)
+            self._paint_latency_ns[camera_id] = previous_paint_latency_ns + SMOOTHING_FACTOR * (
+                    paint_latency_ns - previous_paint_latency_ns)
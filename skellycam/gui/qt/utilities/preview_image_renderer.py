@@ -0,0 +1,72 @@
+import logging
+from typing import Callable, Dict, List, Tuple
+
+import cv2
+import numpy as np
+from PySide6.QtGui import QImage
+
+logger = logging.getLogger(__name__)
+
+# a `QImage` made from a numpy array doesn't copy it, so every camera cycles through a few buffers - the GUI thread
+# has to be done painting a preview before its buffer comes around again
+NUMBER_OF_PREVIEW_BUFFERS = 3
+
+
+class PreviewImageRenderer:
+    """
+    Turns camera frames into preview `QImage`s in a single pass: the (BGR) frame is resized straight to the size of
+    the widget that shows it, into a reused buffer, and wrapped in a BGR888 `QImage` (no color conversion, no copy)
+    """
+
+    def __init__(self, number_of_buffers: int = NUMBER_OF_PREVIEW_BUFFERS):
+        self._number_of_buffers = number_of_buffers
+        self._preview_sizes: Dict[str, Tuple[int, int]] = {}
+        self._buffers: Dict[str, List[np.ndarray]] = {}
+        self._retired_buffers: Dict[str, List[np.ndarray]] = {}
+        self._next_buffer_index: Dict[str, int] = {}
+
+    def set_preview_size(self, camera_id: str, width: int, height: int):
+        """The size of the area the camera's preview is shown in - previews are fit inside it"""
+        self._preview_sizes[camera_id] = (max(int(width), 1), max(int(height), 1))
+
+    def render(self,
+               camera_id: str,
+               image: np.ndarray,
+               draw_overlay: Callable[[np.ndarray], None] = None) -> QImage:
+        """`draw_overlay` can draw on the resized preview (never on `image`) before it is wrapped in the `QImage`"""
+        image_height, image_width = image.shape[:2]
+        preview_width, preview_height = self._get_preview_size(camera_id, image_width, image_height)
+
+        buffer = self._get_next_buffer(camera_id, preview_width, preview_height)
+        if (preview_width, preview_height) == (image_width, image_height):
+            np.copyto(buffer, image)
+        else:
+            # (`INTER_AREA` looks a little better when shrinking, but is ~20x slower for non-integer scale factors)
+            cv2.resize(image, (preview_width, preview_height), dst=buffer, interpolation=cv2.INTER_LINEAR)
+        if draw_overlay is not None:
+            draw_overlay(buffer)
+
+        return QImage(buffer.data, preview_width, preview_height, buffer.strides[0], QImage.Format.Format_BGR888)
+
+    def _get_preview_size(self, camera_id: str, image_width: int, image_height: int) -> Tuple[int, int]:
+        if camera_id not in self._preview_sizes:
+            # until the widget reports its size, half resolution (what the previews always used to be)
+            return max(image_width // 2, 1), max(image_height // 2, 1)
+
+        available_width, available_height = self._preview_sizes[camera_id]
+        scale = min(available_width / image_width, available_height / image_height)
+        return max(int(image_width * scale), 1), max(int(image_height * scale), 1)
+
+    def _get_next_buffer(self, camera_id: str, width: int, height: int) -> np.ndarray:
+        buffers = self._buffers.get(camera_id)
+        if buffers is None or buffers[0].shape != (height, width, 3):
+            # the preview size changed - hang on to the old buffers for a while, the GUI may still be painting them
+            if buffers is not None:
+                self._retired_buffers[camera_id] = buffers
+            buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(self._number_of_buffers)]
+            self._buffers[camera_id] = buffers
+            self._next_buffer_index[camera_id] = 0
+
+        buffer_index = self._next_buffer_index[camera_id]
+        self._next_buffer_index[camera_id] = (buffer_index + 1) % self._number_of_buffers
+        return buffers[buffer_index]
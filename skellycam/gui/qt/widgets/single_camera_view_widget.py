@@ -1,4 +1,4 @@
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QEvent, QObject, Qt, Signal
 from PySide6.QtGui import QImage, QPixmap
 from PySide6.QtWidgets import QLabel, QSizePolicy, QVBoxLayout, QWidget
 
@@ -6,6 +6,9 @@ from skellycam import CameraConfig
 
 
 class SingleCameraViewWidget(QWidget):
+    # (camera_id, width, height) of the area the preview should fit in - previews arrive already at this size
+    preview_size_changed_signal = Signal(str, int, int)
+
     def __init__(self,
                  camera_id: str,
                  camera_config: CameraConfig,
@@ -33,6 +36,7 @@ class SingleCameraViewWidget(QWidget):
         self._image_label_widget.setStyleSheet("border: 1px solid;")
         self._image_label_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self._image_label_widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._image_label_widget.installEventFilter(self)
         self._layout.addWidget(self._image_label_widget)
 
     @property
@@ -43,30 +47,36 @@ class SingleCameraViewWidget(QWidget):
     def image_label_widget(self):
         return self._image_label_widget
 
-    def handle_image_update(self, q_image: QImage, frame_diagnostics_dictionary: dict):
-        pixmap = QPixmap.fromImage(q_image)
-
-        image_label_widget_width = self._image_label_widget.width()
-        image_label_widget_height = self._image_label_widget.height()
-
-        scaled_width = int(image_label_widget_width * .95)
-        scaled_height = int(image_label_widget_height * .95)
+    @property
+    def preview_size(self):
+        return int(self._image_label_widget.width() * .95), int(self._image_label_widget.height() * .95)
 
-        pixmap = pixmap.scaled(
-            scaled_width,
-            scaled_height,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation, )
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if watched is self._image_label_widget and event.type() == QEvent.Type.Resize:
+            self.preview_size_changed_signal.emit(str(self._camera_id), *self.preview_size)
+        return super().eventFilter(watched, event)
 
-        self._image_label_widget.setPixmap(pixmap)
+    def handle_image_update(self, q_image: QImage, frame_diagnostics_dictionary: dict):
+        # already resized to `preview_size` by the worker thread
+        self._image_label_widget.setPixmap(QPixmap.fromImage(q_image))
 
         q_size = frame_diagnostics_dictionary['queue_size']
         frames_recorded = frame_diagnostics_dictionary['frames_recorded']
         if frames_recorded is None:
             frames_recorded = 0
-        self._title_label_widget.setText(
-            self._camera_name_string + f"\nQueue Size:{q_size} | "
-                                       f"Frames Recorded#{str(frames_recorded)}".ljust(38))
+        title_string = self._camera_name_string + f"\nQueue Size:{q_size} | Frames Recorded#{str(frames_recorded)}"
+        frames_per_second = frame_diagnostics_dictionary.get('frames_per_second')
+        if frames_per_second is not None:
+            title_string += (f"\n{frames_per_second:.1f} fps | "
+                             f"Jitter:{frame_diagnostics_dictionary['frame_interval_jitter_ms']:.1f} ms | "
+                             f"Max Interval:{frame_diagnostics_dictionary['max_frame_interval_ms']:.0f} ms | "
+                             f"Dropped#{frame_diagnostics_dictionary['number_of_frames_dropped']} | "
+                             f"Render:{frame_diagnostics_dictionary['preview_render_ms']:.1f} ms | "
+                             f"Latency:{frame_diagnostics_dictionary['capture_to_emit_latency_ms']:.0f} ms")
+        charuco_detection_latency_ms = frame_diagnostics_dictionary.get('charuco_detection_latency_ms')
+        if charuco_detection_latency_ms is not None:
+            title_string += f" | Charuco:{charuco_detection_latency_ms:.0f} ms"
+        self._title_label_widget.setText(title_string.ljust(38))
 
     def show(self):
         super().show()
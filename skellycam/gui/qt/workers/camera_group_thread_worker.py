@@ -1,19 +1,27 @@
+import dataclasses
+import functools
 import logging
 import time
-from copy import deepcopy
-from typing import List, Union
+from typing import Dict, List, Tuple, Union
 
-import cv2
-from PySide6.QtCore import Signal, Qt, QThread
+from PySide6.QtCore import Signal, QThread
 from PySide6.QtGui import QImage
-from skellycam.detection.charuco.charuco_definition import CHARUCO_BOARDS, charuco_7x5
-from skellycam.detection.charuco.charuco_detection import draw_charuco_on_image
-
+from skellycam.detection.charuco.charuco_definition import CHARUCO_BOARDS, charuco_7x5, get_charuco_board_name
+from skellycam.detection.charuco.charuco_annotator import CharucoAnnotator
 from skellycam.detection.models.frame_payload import FramePayload
+
+from skellycam.gui.qt.utilities.display_scheduler import DisplayScheduler
+from skellycam.gui.qt.utilities.preview_image_renderer import PreviewImageRenderer
 from skellycam.gui.qt.workers.video_save_thread_worker import VideoSaveThreadWorker
 from skellycam.opencv.camera.types.camera_id import CameraId
 from skellycam.opencv.group.camera_group import CameraGroup
-from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+from skellycam.opencv.group.camera_group_frame_loop import CameraGroupFrameLoop
+from skellycam.opencv.video_recorder.calibration_recording_session import CalibrationRecordingSession
+from skellycam.opencv.video_recorder.models.calibration_frame_selection_config import \
+    CalibrationFrameSelectionConfig
+from skellycam.opencv.video_recorder.models.segment_config import SegmentConfig
+from skellycam.opencv.video_recorder.models.video_encoder_config import VIDEO_ENCODER_PRESETS, VideoEncoderConfig
+from skellycam.opencv.video_recorder.recording_session import RecordingSession
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +31,10 @@ class CamGroupThreadWorker(QThread):
     cameras_connected_signal = Signal()
     cameras_closed_signal = Signal()
     camera_group_created_signal = Signal(dict)
+    camera_ids_updated_signal = Signal(dict)
+    # (for a segmented recording, the folder holds `segment_###` folders of videos - see `RecordingSession`)
     videos_saved_to_this_folder_signal = Signal(str)
+    _recording_session_finished_signal = Signal(object, str)
 
     def __init__(
             self,
@@ -43,22 +54,28 @@ class CamGroupThreadWorker(QThread):
         self.annotate_images = annotate_images
 
         self._should_pause_bool = False
-        self._should_record_frames_bool = False
 
-        self._updating_camera_settings_bool = False
         self._current_recording_name = None
         self._video_save_process = None
 
         self._charuco_board = charuco_7x5()
+        self._charuco_board_name = get_charuco_board_name(self._charuco_board)
+        self._charuco_annotator = CharucoAnnotator(charuco_board=self._charuco_board)
+        self._preview_image_renderer = PreviewImageRenderer()
+        self._preview_sizes: Dict[str, Tuple[int, int]] = {}
+        self._display_scheduler = DisplayScheduler()
+
+        self._recording_session_finished_signal.connect(self._launch_save_video_thread_worker)
 
+        # (the recording, and the commands that change it, are shared with `HeadlessCameraGroupWorker`)
+        self._frame_loop = CameraGroupFrameLoop(camera_group=None, is_running=self.isRunning)
+        self._frame_loop.set_charuco_board(self._charuco_board, self._charuco_board_name)
         if self._camera_ids is not None:
-            self._camera_group = self._create_camera_group(self._camera_ids)
-            self._video_recorder_dictionary = (
-                self._initialize_video_recorder_dictionary()
-            )
-        else:
-            self._camera_group = None
-            self._video_recorder_dictionary = None
+            self._frame_loop.camera_group = self._create_camera_group(self._camera_ids)
+
+    @property
+    def _camera_group(self) -> Union[CameraGroup, None]:
+        return self._frame_loop.camera_group
 
     @property
     def camera_ids(self):
@@ -68,14 +85,17 @@ class CamGroupThreadWorker(QThread):
     def camera_ids(self, camera_ids: List[str]):
         self._camera_ids = camera_ids
 
+        if self._camera_ids is not None and self.isRunning() and self.cameras_connected:
+            self._frame_loop.send_control_command(self._update_camera_ids, self._camera_ids)
+            return
+
         if self._camera_ids is not None:
             if self._camera_group is not None:
                 while self._camera_group.is_capturing:
                     self._camera_group.close()
                     time.sleep(0.1)
 
-        self._camera_group = self._create_camera_group(self._camera_ids)
-        self._video_recorder_dictionary = self._initialize_video_recorder_dictionary()
+        self._frame_loop.camera_group = self._create_camera_group(self._camera_ids)
 
     @property
     def slot_dictionary(self):
@@ -100,7 +120,7 @@ class CamGroupThreadWorker(QThread):
 
     @property
     def is_recording(self):
-        return self._should_record_frames_bool
+        return self._frame_loop.is_recording
 
     @property
     def charuco_board(self):
@@ -110,63 +130,151 @@ class CamGroupThreadWorker(QThread):
     def charuco_board(self, charuco_name: str):
         if charuco_name in CHARUCO_BOARDS:
             self._charuco_board = CHARUCO_BOARDS[charuco_name]()
+            self._charuco_board_name = charuco_name
+            self._charuco_annotator.charuco_board = self._charuco_board
+            self._frame_loop.set_charuco_board(self._charuco_board, self._charuco_board_name)
             logger.info(f"Set charuco board to {charuco_name}")
         else:
             logger.error(f"Charuco board {charuco_name} not found in CHARUCO_BOARDS.")
 
+    @property
+    def video_encoder_config(self) -> VideoEncoderConfig:
+        return self._frame_loop.video_encoder_config
+
+    @video_encoder_config.setter
+    def video_encoder_config(self, video_encoder_preset_name: str):
+        """Takes effect from the next recording on"""
+        if video_encoder_preset_name in VIDEO_ENCODER_PRESETS:
+            self._frame_loop.set_video_encoder_config(VIDEO_ENCODER_PRESETS[video_encoder_preset_name]())
+            logger.info(f"Set video encoder to {video_encoder_preset_name} - {self.video_encoder_config}")
+        else:
+            logger.error(f"Video encoder preset {video_encoder_preset_name} not found in VIDEO_ENCODER_PRESETS.")
+
+    @property
+    def segment_config(self) -> SegmentConfig:
+        return self._frame_loop.segment_config
+
+    @segment_config.setter
+    def segment_config(self, segment_config: SegmentConfig):
+        """Takes effect from the next recording on"""
+        self._frame_loop.set_segment_config(segment_config)
+        logger.info(f"Set recording segments to {segment_config}")
+
+    @property
+    def calibration_frame_selection_config(self) -> Union[CalibrationFrameSelectionConfig, None]:
+        return self._frame_loop.calibration_frame_selection_config
+
+    @calibration_frame_selection_config.setter
+    def calibration_frame_selection_config(self,
+                                           calibration_frame_selection_config: Union[
+                                               CalibrationFrameSelectionConfig, None]):
+        """
+        With a config, recordings only keep the frame sets worth calibrating with (see `CalibrationRecordingSession`),
+        with `None` they record everything again. Takes effect from the next recording on
+        """
+        self._frame_loop.set_calibration_frame_selection_config(calibration_frame_selection_config)
+        logger.info(f"Set calibration frame selection to {calibration_frame_selection_config}")
+
+    @property
+    def preview_frames_per_second(self) -> float:
+        return self._display_scheduler.preview_frames_per_second
+
+    @preview_frames_per_second.setter
+    def preview_frames_per_second(self, preview_frames_per_second: float):
+        """How often each camera's preview is updated - doesn't affect what gets recorded"""
+        self._display_scheduler.preview_frames_per_second = preview_frames_per_second
+
+    @property
+    def display_refresh_rate(self) -> float:
+        return self._display_scheduler.display_refresh_rate
+
+    @display_refresh_rate.setter
+    def display_refresh_rate(self, display_refresh_rate: float):
+        """Previews are never updated faster than the monitor can show them"""
+        self._display_scheduler.display_refresh_rate = display_refresh_rate
+
     def run(self):
         logger.info("Starting camera group thread worker")
+        # the previews come from their own (downscaled) stream - full resolution frames are only sent while recording
+        self._camera_group.subscribe_to_preview_frames(True)
+        self._camera_group.subscribe_to_full_resolution_frames(self._frame_loop.is_recording)
+        for camera_id, (width, height) in self._preview_sizes.items():
+            self._camera_group.set_preview_size(camera_id, width, height)
         self._camera_group.start()
-        should_continue = True
 
         logger.info("Emitting `cameras_connected_signal`")
         self.cameras_connected_signal.emit()
 
-        while self._camera_group.is_capturing and should_continue:
-            if self._updating_camera_settings_bool:
-                continue
-
-            frame_payload_dictionary = self._camera_group.latest_frames()
-            for camera_id, frame_payload in frame_payload_dictionary.items():
-                if frame_payload:
-                    if not self._should_pause_bool:
-                        if self._should_record_frames_bool:
-                            self._video_recorder_dictionary[camera_id].append_frame_payload_to_list(frame_payload)
-                            logger.info(f"camera:frame_count - {self._get_recorder_frame_count_dict()}")
-
-                        if self.annotate_images:
-                            draw_charuco_on_image(image=frame_payload.image, charuco_board=self.charuco_board)
-
-                        q_image = self._convert_frame(frame_payload)
-
-                        frame_diagnostic_dictionary = {}
-                        frame_diagnostic_dictionary["mean_frames_per_second"] = frame_payload.mean_frames_per_second,
-                        frame_diagnostic_dictionary["frames_received"] = frame_payload.number_of_frames_received,
-                        frame_diagnostic_dictionary["queue_size"] = self._camera_group.queue_size[camera_id]
-
-                        try:
-                            frame_diagnostic_dictionary["frames_recorded"] = self._video_recorder_dictionary[
-                                camera_id].number_of_frames
-                        except KeyError:
-                            frame_diagnostic_dictionary["frames_recorded"] = 0
-                        except Exception as e:
-                            logger.error(f"Error getting frame count for camera {camera_id}: {e}")
-
-                        self.new_image_signal.emit(camera_id, q_image, frame_diagnostic_dictionary)
-
-    def _convert_frame(self, frame: FramePayload):
-        image = frame.image
-        # image = cv2.flip(image, 1)
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        converted_frame = QImage(
-            image.data,
-            image.shape[1],
-            image.shape[0],
-            QImage.Format.Format_RGB888,
-        )
+        self._frame_loop.run(handle_preview_frames=self._handle_preview_frames)
+
+    def _handle_preview_frames(self, preview_frame_payload_dictionary: Dict[str, FramePayload], arrival_time_ns: int):
+        for camera_id, frame_payload in preview_frame_payload_dictionary.items():
+            if frame_payload:
+                if not self._should_pause_bool:
+                    # only the previews the GUI has time for are shown
+                    if not self._display_scheduler.should_display(camera_id):
+                        continue
+
+                    draw_overlay = None
+                    if self.annotate_images:
+                        # detected in the background - the preview gets the latest result that is ready, drawn on
+                        # the preview itself (so the annotations never end up in the recording)
+                        self._charuco_annotator.submit(camera_id, frame_payload.image, frame_payload.timestamp_ns)
+                        draw_overlay = functools.partial(self._charuco_annotator.draw_latest_detection, camera_id)
+
+                    render_start_time_ns = time.perf_counter_ns()
+                    q_image = self._preview_image_renderer.render(camera_id, frame_payload.image, draw_overlay)
+
+                    frame_diagnostic_dictionary = {}
+                    frame_diagnostic_dictionary["preview_render_ms"] = (
+                            (time.perf_counter_ns() - render_start_time_ns) / 1e6)
+                    frame_diagnostic_dictionary["mean_frames_per_second"] = frame_payload.mean_frames_per_second
+                    frame_diagnostic_dictionary["frames_received"] = frame_payload.number_of_frames_received
+                    frame_diagnostic_dictionary["queue_size"] = frame_payload.queue_size
+                    frame_diagnostic_dictionary["preview_frames_skipped"] = (
+                        self._display_scheduler.number_of_frames_skipped)
+                    if self.annotate_images:
+                        frame_diagnostic_dictionary["charuco_detection_latency_ms"] = (
+                            self._charuco_annotator.detection_latency_ms(camera_id))
+                        charuco_tracker = self._charuco_annotator.charuco_tracker(camera_id)
+                        if charuco_tracker is not None:
+                            frame_diagnostic_dictionary["charuco_region_of_interest_detection_ms"] = (
+                                charuco_tracker.region_of_interest_detection_ms)
+                            frame_diagnostic_dictionary["charuco_full_frame_detection_ms"] = (
+                                charuco_tracker.full_frame_detection_ms)
+                    if frame_payload.frame_rate_statistics is not None:
+                        frame_diagnostic_dictionary.update(dataclasses.asdict(frame_payload.frame_rate_statistics))
+
+                    try:
+                        frame_diagnostic_dictionary["frames_recorded"] = self._frame_loop.recording_session.number_of_frames[
+                            camera_id]
+                    except KeyError:
+                        frame_diagnostic_dictionary["frames_recorded"] = 0
+                    except Exception as e:
+                        logger.error(f"Error getting frame count for camera {camera_id}: {e}")
+
+                    # (`timestamp_ns` is `perf_counter_ns` in the camera process - the same clock system-wide)
+                    emit_time_ns = time.perf_counter_ns()
+                    frame_diagnostic_dictionary["arrival_to_emit_latency_ms"] = (
+                            (emit_time_ns - arrival_time_ns) / 1e6)
+                    frame_diagnostic_dictionary["capture_to_emit_latency_ms"] = (
+                            (emit_time_ns - frame_payload.timestamp_ns) / 1e6)
+
+                    self.new_image_signal.emit(camera_id, q_image, frame_diagnostic_dictionary)
+
+    def set_preview_size(self, camera_id: str, width: int, height: int):
+        """
+        Previews are downscaled (once, in the camera process) to fit the area the GUI shows them in - and fit to it
+        exactly in this thread, in case the size changes while they're on the way
+        """
+        self._preview_sizes[camera_id] = (width, height)
+        self._preview_image_renderer.set_preview_size(camera_id, width, height)
+        if self._camera_group is not None:
+            self._camera_group.set_preview_size(camera_id, width, height)
 
-        return converted_frame.scaled(int(image.shape[1] / 2), int(image.shape[0] / 2),
-                                      Qt.AspectRatioMode.KeepAspectRatio)
+    def acknowledge_preview(self, camera_id: str):
+        """Called by the GUI once it has shown a preview - the next one isn't sent until the GUI keeps up"""
+        self._display_scheduler.acknowledge(camera_id)
 
     def close(self):
         logger.info("Closing camera group")
@@ -177,61 +285,59 @@ class CamGroupThreadWorker(QThread):
 
     def pause(self):
         logger.info("Pausing image display")
-        self._should_pause_bool = True
+        self._frame_loop.send_control_command(self._pause)
 
     def play(self):
         logger.info("Resuming image display")
-        self._should_pause_bool = False
+        self._frame_loop.send_control_command(self._play)
 
     def start_recording(self):
         logger.info("Starting recording")
         if self.cameras_connected:
             if self._synchronized_video_folder_path is None:
                 self._synchronized_video_folder_path = self._get_new_synchronized_videos_folder_callable()
-            self._should_record_frames_bool = True
+            self._frame_loop.send_control_command(self._frame_loop.start_recording,
+                                                  self._synchronized_video_folder_path)
         else:
             logger.warning("Cannot start recording - cameras not connected")
 
     def stop_recording(self):
         logger.info("Stopping recording")
-        self._should_record_frames_bool = False
-
-        self._launch_save_video_thread_worker()
-        # self._launch_save_video_process()
-        del self._video_recorder_dictionary
-        self._video_recorder_dictionary = self._initialize_video_recorder_dictionary()
+        self._synchronized_video_folder_path = None
+        self._frame_loop.send_control_command(self._stop_recording)
 
     def update_camera_group_configs(self, camera_config_dictionary: dict):
         if self._camera_ids is None:
             self._camera_ids = list(camera_config_dictionary.keys())
 
         if self._camera_group is None:
-            self._camera_group = self._create_camera_group(
+            self._frame_loop.camera_group = self._create_camera_group(
                 camera_ids=self.camera_ids,
                 camera_config_dictionary=camera_config_dictionary,
             )
             return
 
-        self._video_recorder_dictionary = self._initialize_video_recorder_dictionary()
-        self._updating_camera_settings_bool = True
-        self._updating_camera_settings_bool = not self._update_camera_settings(
-            camera_config_dictionary
-        )
+        self._frame_loop.send_control_command(self._frame_loop.update_camera_configs, camera_config_dictionary)
 
-    def _launch_save_video_thread_worker(self):
-        logger.info("Launching save video thread worker")
+    def _pause(self):
+        self._should_pause_bool = True
 
-        synchronized_videos_folder = self._synchronized_video_folder_path
-        self._synchronized_video_folder_path = None
+    def _play(self):
+        self._should_pause_bool = False
+
+    def _stop_recording(self):
+        recording_session, synchronized_videos_folder, _ = self._frame_loop.stop_recording()
+        # (the save worker is started from the GUI thread)
+        self._recording_session_finished_signal.emit(recording_session, str(synchronized_videos_folder))
 
-        video_recorders_to_save = {}
-        for camera_id, video_recorder in self._video_recorder_dictionary.items():
-            if video_recorder.number_of_frames > 0:
-                video_recorders_to_save[camera_id] = deepcopy(video_recorder)
+    def _launch_save_video_thread_worker(self,
+                                         recording_session: Union[RecordingSession, CalibrationRecordingSession],
+                                         synchronized_videos_folder: str):
+        logger.info("Launching save video thread worker")
 
         self._video_save_thread_worker = VideoSaveThreadWorker(
-            dictionary_of_video_recorders=video_recorders_to_save,
-            folder_to_save_videos=str(synchronized_videos_folder),
+            recording_session=recording_session,
+            folder_to_save_videos=synchronized_videos_folder,
             create_diagnostic_plots_bool=True,
         )
         self._video_save_thread_worker.start()
@@ -243,19 +349,6 @@ class CamGroupThreadWorker(QThread):
         logger.debug(f"Emitting `videos_saved_to_this_folder_signal` with string: {folder_path}")
         self.videos_saved_to_this_folder_signal.emit(folder_path)
 
-    def _initialize_video_recorder_dictionary(self):
-        video_recorder_dictionary = {}
-        for camera_id, config in self._camera_group.camera_config_dictionary.items():
-            if config.use_this_camera:
-                video_recorder_dictionary[camera_id] = VideoRecorder()
-        return video_recorder_dictionary
-
-    def _get_recorder_frame_count_dict(self):
-        return {
-            camera_id: recorder.number_of_frames
-            for camera_id, recorder in self._video_recorder_dictionary.items()
-        }
-
     def _create_camera_group(
             self, camera_ids: List[Union[str, int]], camera_config_dictionary: dict = None
     ):
@@ -270,11 +363,7 @@ class CamGroupThreadWorker(QThread):
         self.camera_group_created_signal.emit(camera_group.camera_config_dictionary)
         return camera_group
 
-    def _update_camera_settings(self, camera_config_dictionary: dict):
-        try:
-            self._camera_group.update_camera_configs(camera_config_dictionary)
-
-        except Exception as e:
-            logger.error(f"Problem updating camera settings: {e}")
-
-        return True
+    def _update_camera_ids(self, camera_ids: List[str]):
+        self._frame_loop.update_camera_ids(camera_ids)
+        self.camera_group_created_signal.emit(self._camera_group.camera_config_dictionary)
+        self.camera_ids_updated_signal.emit(self._camera_group.camera_config_dictionary)
@@ -1,4 +1,5 @@
 import logging
+from typing import List
 
 from PySide6.QtCore import Signal, QThread
 
@@ -10,10 +11,12 @@ logger = logging.getLogger(__name__)
 class DetectCamerasWorker(QThread):
     cameras_detected_signal = Signal(list)
 
-    def __init__(self, parent=None):
+    def __init__(self, camera_ids_already_open: List[str] = None, parent=None):
         super().__init__(parent=parent)
+        self._camera_ids_already_open = camera_ids_already_open
 
     def run(self):
         logger.info("Starting detect cameras thread worker")
-        camera_ids = detect_cameras(use_cache=False).cameras_found_list
+        camera_ids = detect_cameras(use_cache=False,
+                                    camera_ids_already_open=self._camera_ids_already_open).cameras_found_list
         self.cameras_detected_signal.emit(camera_ids)
@@ -1,11 +1,11 @@
 import logging
 from pathlib import Path
-from typing import Dict, Union
+from typing import Union
 
 from PySide6.QtCore import Signal, QThread
 
-from skellycam.opencv.video_recorder.save_synchronized_videos import save_synchronized_videos
-from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+from skellycam.opencv.video_recorder.calibration_recording_session import CalibrationRecordingSession
+from skellycam.opencv.video_recorder.recording_session import RecordingSession
 
 logger = logging.getLogger(__name__)
 
@@ -15,25 +15,24 @@ class VideoSaveThreadWorker(QThread):
 
     def __init__(
             self,
-            dictionary_of_video_recorders: Dict[str, VideoRecorder],
+            recording_session: Union[RecordingSession, CalibrationRecordingSession],
             folder_to_save_videos: Union[str, Path],
             create_diagnostic_plots_bool: bool = True,
 
     ):
         super().__init__()
-        self._dictionary_of_video_recorders = dictionary_of_video_recorders
+        self._recording_session = recording_session
         self._folder_to_save_videos = folder_to_save_videos
         self._create_diagnostic_plots_bool = create_diagnostic_plots_bool
 
     def run(self):
-        logger.info(f"Saving synchronized videos to folder: {str(self._folder_to_save_videos)}")
+        logger.info(f"Saving synchronized videos to folder: {str(self._folder_to_save_videos)} - "
+                    f"recording holds {self._recording_session.number_of_bytes / 1e6:.1f} MB of frames")
 
-        save_synchronized_videos(
-            dictionary_of_video_recorders=self._dictionary_of_video_recorders,
-            folder_to_save_videos=self._folder_to_save_videos,
-            create_diagnostic_plots_bool=self._create_diagnostic_plots_bool,
-        )
+        self._recording_session.save(folder_to_save_videos=self._folder_to_save_videos,
+                                     create_diagnostic_plots_bool=self._create_diagnostic_plots_bool)
 
+        self._recording_session = None
         logger.info(
             f"`VideoSaveThreadWorker` finished saving synchronized videos to folder: {str(self._folder_to_save_videos)}")
         self.finished_signal.emit(str(self._folder_to_save_videos))
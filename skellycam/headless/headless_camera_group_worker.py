@@ -0,0 +1,207 @@
+import dataclasses
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Union
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.group.camera_group_frame_loop import CameraGroupFrameLoop
+from skellycam.opencv.video_recorder.models.segment_config import SegmentConfig
+from skellycam.opencv.video_recorder.models.video_encoder_config import VideoEncoderConfig
+from skellycam.opencv.video_recorder.recording_session import RecordingSession
+from skellycam.system.environment.default_paths import create_new_synchronized_videos_folder, \
+    get_default_recording_name, get_default_session_folder_path
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessCameraGroupWorker(threading.Thread):
+    """
+    `CamGroupThreadWorker` without Qt: keeps a `CameraGroup` running and records from it on command (both run a
+    `CameraGroupFrameLoop`).
+
+    Commands (start/stop recording, camera configs...) are carried out by the frame loop between frames - they return
+    a `Future` that is done once the loop has carried them out. Recordings are saved on a background thread while the
+    cameras keep running. What happens (recording started, videos saved...) is reported to the event listeners as
+    dicts with an `"event"` key - listeners are called from the worker's threads, so they should be quick.
+
+    No previews are sent over from the camera processes, and full resolution frames only while recording.
+    """
+
+    def __init__(self,
+                 camera_ids: List[str],
+                 camera_config_dictionary: Dict[str, CameraConfig] = None,
+                 get_new_synchronized_videos_folder_callable: Callable[[], str] = None,
+                 video_encoder_config: VideoEncoderConfig = None,
+                 segment_config: SegmentConfig = None,
+                 create_diagnostic_plots_bool: bool = False):
+        super().__init__(name="headless_camera_group_worker", daemon=True)
+        if get_new_synchronized_videos_folder_callable is None:
+            session_folder_path = get_default_session_folder_path(create_folder=False)
+            get_new_synchronized_videos_folder_callable = lambda: create_new_synchronized_videos_folder(
+                Path(session_folder_path) / get_default_recording_name())
+        self._get_new_synchronized_videos_folder_callable = get_new_synchronized_videos_folder_callable
+        self._create_diagnostic_plots_bool = create_diagnostic_plots_bool
+
+        self._camera_group = CameraGroup(camera_ids_list=camera_ids, camera_config_dictionary=camera_config_dictionary)
+        self._camera_group.subscribe_to_full_resolution_frames(False)
+        self._camera_group.subscribe_to_preview_frames(False)
+        self._frame_loop = CameraGroupFrameLoop(camera_group=self._camera_group,
+                                                is_running=self.is_alive,
+                                                video_encoder_config=video_encoder_config,
+                                                segment_config=segment_config)
+
+        self._cameras_connected_event = threading.Event()
+        self._event_listeners: List[Callable[[dict], None]] = []
+        self._video_save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="headless_video_save")
+
+    @property
+    def camera_ids(self) -> List[str]:
+        return list(self._camera_group.camera_config_dictionary.keys())
+
+    @property
+    def camera_config_dictionary(self) -> Dict[str, CameraConfig]:
+        return self._camera_group.camera_config_dictionary
+
+    @property
+    def camera_group(self) -> CameraGroup:
+        return self._camera_group
+
+    @property
+    def cameras_connected(self) -> bool:
+        return self._cameras_connected_event.is_set() and self._camera_group.is_capturing
+
+    @property
+    def is_recording(self) -> bool:
+        return self._frame_loop.is_recording
+
+    @property
+    def video_encoder_config(self) -> VideoEncoderConfig:
+        return self._frame_loop.video_encoder_config
+
+    def add_event_listener(self, event_listener: Callable[[dict], None]):
+        self._event_listeners.append(event_listener)
+
+    def remove_event_listener(self, event_listener: Callable[[dict], None]):
+        if event_listener in self._event_listeners:
+            self._event_listeners.remove(event_listener)
+
+    def wait_for_cameras(self, timeout: float = None) -> bool:
+        return self._cameras_connected_event.wait(timeout)
+
+    def status(self) -> dict:
+        is_recording = self._frame_loop.is_recording
+        recording_session = self._frame_loop.recording_session
+        telemetry = self._camera_group.telemetry if self.cameras_connected else {}
+        return {
+            "cameras_connected": self.cameras_connected,
+            "is_recording": is_recording,
+            "synchronized_videos_folder": self._frame_loop.synchronized_videos_folder,
+            "recording_duration_seconds": self._frame_loop.recording_duration_seconds,
+            "frames_recorded": recording_session.number_of_frames if is_recording else {},
+            "camera_configs": {camera_id: camera_config.dict()
+                               for camera_id, camera_config in self._camera_group.camera_config_dictionary.items()},
+            "telemetry": {camera_id: dataclasses.asdict(camera_telemetry)
+                          for camera_id, camera_telemetry in telemetry.items()},
+        }
+
+    def run(self):
+        logger.info(f"Starting headless camera group worker for cameras {self.camera_ids}")
+        self._camera_group.start()
+        self._cameras_connected_event.set()
+        self._emit_event("cameras_connected", camera_ids=self.camera_ids)
+
+        try:
+            self._frame_loop.run()
+        finally:
+            if self._frame_loop.is_recording:
+                logger.warning("Cameras stopped while recording - saving what was recorded")
+                self._stop_recording()
+            self._cameras_connected_event.clear()
+            self._emit_event("cameras_closed")
+            logger.info("Headless camera group worker stopped")
+
+    def start_recording(self, synchronized_videos_folder: Union[str, Path] = None) -> Future:
+        """The future's result is the folder the videos will be saved to"""
+        return self._frame_loop.send_control_command(
+            self._start_recording, None if synchronized_videos_folder is None else str(synchronized_videos_folder))
+
+    def stop_recording(self) -> Future:
+        """
+        The future's result is another future, done once the videos are saved - with a summary of the recording (see
+        `_save_recording`)
+        """
+        return self._frame_loop.send_control_command(self._stop_recording)
+
+    def update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig]) -> Future:
+        return self._frame_loop.send_control_command(self._update_camera_configs, camera_config_dictionary)
+
+    def set_video_encoder_config(self, video_encoder_config: VideoEncoderConfig) -> Future:
+        """Takes effect from the next recording on"""
+        return self._frame_loop.set_video_encoder_config(video_encoder_config)
+
+    def close(self, wait_for_videos_to_save: bool = True):
+        logger.info("Closing headless camera group worker")
+        self._frame_loop.stop()
+        if self.is_alive():
+            self.join()
+        self._camera_group.close()
+        self._video_save_executor.shutdown(wait=wait_for_videos_to_save)
+
+    def _start_recording(self, synchronized_videos_folder: Union[str, None]) -> str:
+        if synchronized_videos_folder is None and not self._frame_loop.is_recording:
+            synchronized_videos_folder = self._get_new_synchronized_videos_folder_callable()
+        synchronized_videos_folder = self._frame_loop.start_recording(synchronized_videos_folder)
+        self._emit_event("recording_started", synchronized_videos_folder=synchronized_videos_folder)
+        return synchronized_videos_folder
+
+    def _stop_recording(self) -> Future:
+        recording_session, synchronized_videos_folder, recording_duration_seconds = self._frame_loop.stop_recording()
+        self._emit_event("recording_stopped",
+                         synchronized_videos_folder=synchronized_videos_folder,
+                         recording_duration_seconds=recording_duration_seconds,
+                         frames_recorded=recording_session.number_of_frames)
+        return self._video_save_executor.submit(self._save_recording,
+                                                recording_session,
+                                                synchronized_videos_folder,
+                                                recording_duration_seconds)
+
+    def _save_recording(self,
+                        recording_session: RecordingSession,
+                        synchronized_videos_folder: str,
+                        recording_duration_seconds: float) -> dict:
+        frames_recorded = recording_session.number_of_frames
+        save_start_time = time.perf_counter()
+        try:
+            recording_session.save(folder_to_save_videos=synchronized_videos_folder,
+                                   create_diagnostic_plots_bool=self._create_diagnostic_plots_bool)
+        except Exception as e:
+            logger.error(f"Problem saving videos to {synchronized_videos_folder}: {e}")
+            logger.exception(e)
+            self._emit_event("videos_save_failed", synchronized_videos_folder=synchronized_videos_folder, error=str(e))
+            raise
+        recording_summary = {
+            "synchronized_videos_folder": synchronized_videos_folder,
+            "frames_recorded": frames_recorded,
+            "recording_duration_seconds": recording_duration_seconds,
+            "save_duration_seconds": time.perf_counter() - save_start_time,
+        }
+        self._emit_event("videos_saved", **recording_summary)
+        return recording_summary
+
+    def _update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig]):
+        self._frame_loop.update_camera_configs(camera_config_dictionary)
+        self._emit_event("camera_configs_updated",
+                         camera_configs={camera_id: camera_config.dict()
+                                         for camera_id, camera_config in camera_config_dictionary.items()})
+
+    def _emit_event(self, event_name: str, **event_data):
+        event = {"event": event_name, "timestamp_ns": time.perf_counter_ns(), **event_data}
+        for event_listener in list(self._event_listeners):
+            try:
+                event_listener(event)
+            except Exception as e:
+                logger.error(f"Problem sending event {event_name} to {event_listener}: {e}")
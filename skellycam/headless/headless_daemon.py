@@ -0,0 +1,236 @@
+import ipaddress
+import json
+import logging
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List
+
+from skellycam.headless.headless_camera_group_worker import HeadlessCameraGroupWorker
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.video_recorder.models.video_encoder_config import VIDEO_ENCODER_PRESETS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47474
+DEFAULT_STATUS_INTERVAL_SECONDS = 1.0
+# how long a command waits for the frame loop to carry it out
+COMMAND_TIMEOUT_SECONDS = 10.0
+
+
+class HeadlessDaemon:
+    """
+    Runs a `HeadlessCameraGroupWorker` and takes commands for it over a local TCP socket, one JSON object per line:
+
+        {"command": "start_recording", "id": 1}                -> {"type": "response", "id": 1, "ok": true, ...}
+        {"command": "stop_recording", "wait_for_save": true}
+        {"command": "status"}
+        {"command": "update_camera_configs", "camera_configs": {"0": {"exposure": -6}}}
+        {"command": "set_video_encoder", "preset": "H.264 - fast and big"}
+        {"command": "subscribe"}    (then events - `{"type": "event", "event": "recording_started", ...}` - and a
+                                     `status` event every `status_interval_seconds` are sent to this connection)
+        {"command": "unsubscribe"}
+        {"command": "shutdown"}
+
+    Every response has `"ok"` (and `"error"` if it isn't), echoes the command's `"id"` if it had one, and says how long
+    the command took in `"command_duration_ms"`. If the frame loop doesn't get to a command within
+    `COMMAND_TIMEOUT_SECONDS` it is cancelled (`"pending": false` - it will never run), unless it had already started,
+    in which case it still finishes (`"pending": true` - watch the events, or `status`, to see when).
+
+    There is no authentication (anyone who can connect can record to any folder, or shut the daemon down), so it only
+    listens on loopback addresses.
+    """
+
+    def __init__(self,
+                 headless_camera_group_worker: HeadlessCameraGroupWorker,
+                 host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT,
+                 status_interval_seconds: float = DEFAULT_STATUS_INTERVAL_SECONDS):
+        if not _is_loopback_address(host):
+            raise ValueError(f"The headless daemon only listens on loopback addresses (e.g. {DEFAULT_HOST}), not {host}")
+        self._worker = headless_camera_group_worker
+        self._status_interval_seconds = status_interval_seconds
+        self._subscribers: List["_ControlConnectionHandler"] = []
+        self._subscribers_lock = threading.Lock()
+        self._shutdown_event = threading.Event()
+
+        self._server = _ControlServer((host, port), _ControlConnectionHandler)
+        self._server.headless_daemon = self
+        self._worker.add_event_listener(self._broadcast_event)
+
+    @property
+    def address(self):
+        """(host, port) the daemon listens on - e.g. if it was created with port 0"""
+        return self._server.server_address
+
+    def serve_forever(self):
+        """Start the cameras and take commands until a `shutdown` command (or a KeyboardInterrupt)"""
+        self._worker.start()
+        threading.Thread(target=self._send_status_events, name="headless_daemon_status", daemon=True).start()
+        logger.info(f"Headless daemon listening on {self.address[0]}:{self.address[1]}")
+        try:
+            self._server.serve_forever(poll_interval=0.1)
+        finally:
+            self._shutdown_event.set()
+            self._server.server_close()
+            self._worker.close()
+
+    def shutdown(self):
+        # (`serve_forever` returns - not from the thread that called `serve_forever`, which would wait on itself)
+        threading.Thread(target=self._server.shutdown, name="headless_daemon_shutdown", daemon=True).start()
+
+    def handle_command(self, command_dictionary: dict, connection_handler: "_ControlConnectionHandler") -> dict:
+        command = command_dictionary.get("command")
+        if command == "status":
+            return {"status": self._worker.status()}
+        if command == "start_recording":
+            future = self._worker.start_recording(command_dictionary.get("synchronized_videos_folder"))
+            return {"synchronized_videos_folder": _wait_for_command(future)}
+        if command == "stop_recording":
+            video_save_future: Future = _wait_for_command(self._worker.stop_recording())
+            if command_dictionary.get("wait_for_save", False):
+                return {**video_save_future.result(), "videos_saved": True}
+            return {"videos_saved": False}
+        if command == "update_camera_configs":
+            _wait_for_command(self._worker.update_camera_configs(
+                self._merge_camera_configs(command_dictionary.get("camera_configs", {}))))
+            return {"camera_configs": self._worker.status()["camera_configs"]}
+        if command == "set_video_encoder":
+            preset = command_dictionary.get("preset")
+            if preset not in VIDEO_ENCODER_PRESETS:
+                raise ValueError(f"Video encoder preset {preset} not found in {list(VIDEO_ENCODER_PRESETS)}")
+            _wait_for_command(self._worker.set_video_encoder_config(VIDEO_ENCODER_PRESETS[preset]()))
+            return {"video_encoder_config": self._worker.video_encoder_config.dict()}
+        if command == "subscribe":
+            with self._subscribers_lock:
+                if connection_handler not in self._subscribers:
+                    self._subscribers.append(connection_handler)
+            return {}
+        if command == "unsubscribe":
+            self._unsubscribe(connection_handler)
+            return {}
+        if command == "shutdown":
+            self.shutdown()
+            return {}
+        raise ValueError(f"Unknown command: {command}")
+
+    def _merge_camera_configs(self, camera_config_changes: Dict[str, dict]) -> Dict[str, CameraConfig]:
+        """The current camera configs, with the fields given for each camera changed"""
+        camera_config_dictionary = dict(self._worker.camera_config_dictionary)
+        for camera_id, changes in camera_config_changes.items():
+            if camera_id not in camera_config_dictionary:
+                raise ValueError(f"Unknown camera {camera_id} - cameras are {list(camera_config_dictionary)}")
+            camera_config_dictionary[camera_id] = CameraConfig(**{**camera_config_dictionary[camera_id].dict(),
+                                                                  **changes})
+        return camera_config_dictionary
+
+    def _unsubscribe(self, connection_handler: "_ControlConnectionHandler"):
+        with self._subscribers_lock:
+            if connection_handler in self._subscribers:
+                self._subscribers.remove(connection_handler)
+
+    def _broadcast_event(self, event: dict):
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.send({"type": "event", **event})
+
+    def _send_status_events(self):
+        while not self._shutdown_event.wait(self._status_interval_seconds):
+            if self._subscribers:
+                self._broadcast_event({"event": "status", "timestamp_ns": time.perf_counter_ns(),
+                                       "status": self._worker.status()})
+
+
+class CommandTimeoutError(TimeoutError):
+    def __init__(self, message: str, still_pending: bool):
+        super().__init__(message)
+        self.still_pending = still_pending
+
+
+def _wait_for_command(future: Future):
+    """The command's result - or, if it takes too long, cancel it (if the frame loop hasn't started it yet)"""
+    try:
+        return future.result(timeout=COMMAND_TIMEOUT_SECONDS)
+    except TimeoutError:
+        if future.cancel():
+            raise CommandTimeoutError(f"The frame loop didn't get to the command within {COMMAND_TIMEOUT_SECONDS} "
+                                      f"seconds - it was cancelled", still_pending=False)
+        if future.done():
+            return future.result()  # (it finished just now)
+        raise CommandTimeoutError(f"The command is still running after {COMMAND_TIMEOUT_SECONDS} seconds - it will "
+                                  f"finish in the background", still_pending=True)
+
+
+def _is_loopback_address(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # (a host name other than localhost, or an empty string - i.e. every interface)
+
+
+class _ControlServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    headless_daemon: HeadlessDaemon = None
+
+
+class _ControlConnectionHandler(socketserver.StreamRequestHandler):
+    """
+    One per connection - reads commands line by line, and writes responses and events from a thread of its own, so a
+    slow client never holds up the frame loop (which sends the events)
+    """
+
+    def setup(self):
+        super().setup()
+        self._outgoing_messages = queue.SimpleQueue()
+        self._writer_thread = threading.Thread(target=self._write_messages, name="headless_daemon_writer", daemon=True)
+        self._writer_thread.start()
+
+    def handle(self):
+        headless_daemon: HeadlessDaemon = self.server.headless_daemon
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            received_time_ns = time.perf_counter_ns()
+            response = {"type": "response"}
+            try:
+                command_dictionary = json.loads(line)
+                if "id" in command_dictionary:
+                    response["id"] = command_dictionary["id"]
+                response["command"] = command_dictionary.get("command")
+                response.update(headless_daemon.handle_command(command_dictionary, self))
+                response["ok"] = True
+            except Exception as e:
+                logger.error(f"Problem handling command {line!r}: {e}")
+                response["ok"] = False
+                response["error"] = f"{type(e).__name__}: {e}"
+                if isinstance(e, CommandTimeoutError):
+                    response["pending"] = e.still_pending
+            response["command_duration_ms"] = (time.perf_counter_ns() - received_time_ns) / 1e6
+            self.send(response)
+
+    def finish(self):
+        self.server.headless_daemon._unsubscribe(self)
+        self._outgoing_messages.put(None)
+        self._writer_thread.join(timeout=1.0)
+        super().finish()
+
+    def send(self, message: dict):
+        self._outgoing_messages.put(message)
+
+    def _write_messages(self):
+        while True:
+            message = self._outgoing_messages.get()
+            if message is None:
+                return
+            try:
+                self.wfile.write((json.dumps(message, default=str) + "\n").encode())
+                self.wfile.flush()
+            except OSError:
+                return  # the client went away
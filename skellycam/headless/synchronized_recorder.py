@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, Union
+
+from skellycam.detection.models.camera_recording_progress import CameraRecordingProgress
+from skellycam.headless.headless_camera_group_worker import HeadlessCameraGroupWorker
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.video_recorder.models.recording_result import RecordingResult
+from skellycam.opencv.video_recorder.models.segment_config import SegmentConfig
+from skellycam.opencv.video_recorder.models.video_encoder_config import VideoEncoderConfig
+from skellycam.system.environment.default_paths import create_new_synchronized_videos_folder, \
+    get_default_recording_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAMERA_START_TIMEOUT_SECONDS = 60.0
+COMMAND_TIMEOUT_SECONDS = 10.0
+
+
+class SynchronizedRecorder:
+    """
+    Record synchronized videos from a script - the cameras stay open between recordings, and each recording is saved
+    in the background while the next one goes on:
+
+        with SynchronizedRecorder(camera_ids=["0", "1"]) as recorder:
+            for trial_number in range(1000):
+                result = recorder.record(duration_seconds=5, synchronized_videos_folder=f"trials/{trial_number}")
+                print(result.video_paths, result.segments[0].synchronization_map_path)
+
+    or, from async code:
+
+        async with SynchronizedRecorder() as recorder:
+            await recorder.start_recording_async()
+            ...
+            result = await recorder.stop_recording_async()
+
+    Frames go to a `RecordingSession`, encoded with `video_encoder_config` (the backend - OpenCV, PyAV...) - give it
+    a segmented `segment_config` for long recordings, so they are written out as they go instead of held in memory.
+    """
+
+    def __init__(self,
+                 camera_ids: List[str] = None,
+                 camera_config_dictionary: Dict[str, CameraConfig] = None,
+                 video_encoder_config: VideoEncoderConfig = None,
+                 segment_config: SegmentConfig = None,
+                 recordings_folder: Union[str, Path] = None,
+                 create_diagnostic_plots_bool: bool = False,
+                 camera_start_timeout_seconds: float = DEFAULT_CAMERA_START_TIMEOUT_SECONDS):
+        """
+        Without `camera_ids` (or `camera_config_dictionary`) every camera that is found is used. Recordings go to
+        `synchronized_videos_folder` if it is given when they start, otherwise to a new folder in `recordings_folder`
+        (by default, today's session folder)
+        """
+        if camera_ids is None and camera_config_dictionary is not None:
+            camera_ids = list(camera_config_dictionary.keys())
+        if camera_ids is None:
+            from skellycam.detection.detect_cameras import detect_cameras
+            camera_ids = detect_cameras().cameras_found_list
+
+        get_new_synchronized_videos_folder_callable = None
+        if recordings_folder is not None:
+            get_new_synchronized_videos_folder_callable = lambda: create_new_synchronized_videos_folder(
+                Path(recordings_folder) / get_default_recording_name())
+
+        self._camera_start_timeout_seconds = camera_start_timeout_seconds
+        self._worker = HeadlessCameraGroupWorker(
+            camera_ids=[str(camera_id) for camera_id in camera_ids],
+            camera_config_dictionary=camera_config_dictionary,
+            get_new_synchronized_videos_folder_callable=get_new_synchronized_videos_folder_callable,
+            video_encoder_config=video_encoder_config,
+            segment_config=segment_config,
+            create_diagnostic_plots_bool=create_diagnostic_plots_bool,
+        )
+
+    @property
+    def camera_ids(self) -> List[str]:
+        return self._worker.camera_ids
+
+    @property
+    def camera_group(self) -> CameraGroup:
+        return self._worker.camera_group
+
+    @property
+    def cameras_connected(self) -> bool:
+        return self._worker.cameras_connected
+
+    @property
+    def is_recording(self) -> bool:
+        return self._worker.is_recording
+
+    def open(self):
+        """Start the cameras - returns once they are all delivering frames"""
+        if not self._worker.is_alive():
+            self._worker.start()
+        if not self._worker.wait_for_cameras(timeout=self._camera_start_timeout_seconds):
+            raise TimeoutError(f"Cameras {self.camera_ids} didn't start within {self._camera_start_timeout_seconds} s")
+
+    def close(self):
+        """Stop the recording (if one is going), wait for all the videos to be saved and close the cameras"""
+        if self._worker.is_recording:
+            self.stop_recording(wait_for_save=False)
+        self._worker.close(wait_for_videos_to_save=True)
+
+    def __enter__(self) -> "SynchronizedRecorder":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self) -> "SynchronizedRecorder":
+        await asyncio.to_thread(self.open)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await asyncio.to_thread(self.close)
+
+    def start_recording(self, synchronized_videos_folder: Union[str, Path] = None) -> Path:
+        """Returns (once frames are being recorded) the folder the videos will be saved to"""
+        return Path(self._worker.start_recording(synchronized_videos_folder).result(timeout=COMMAND_TIMEOUT_SECONDS))
+
+    def stop_recording(self, wait_for_save: bool = True) -> Union[RecordingResult, Future]:
+        """
+        Stops recording right away - the videos are saved in the background, and the cameras can record again
+        meanwhile. Returns the `RecordingResult` once the videos are saved, or (without `wait_for_save`) a `Future` of it
+        """
+        video_save_future = self._worker.stop_recording().result(timeout=COMMAND_TIMEOUT_SECONDS)
+        recording_result_future = Future()
+
+        def _set_recording_result(finished_video_save_future: Future):
+            try:
+                recording_summary = finished_video_save_future.result()
+                recording_result_future.set_result(RecordingResult.from_folder(
+                    synchronized_videos_folder=recording_summary["synchronized_videos_folder"],
+                    frames_recorded=recording_summary["frames_recorded"],
+                    recording_duration_seconds=recording_summary["recording_duration_seconds"],
+                    save_duration_seconds=recording_summary["save_duration_seconds"],
+                ))
+            except Exception as e:
+                recording_result_future.set_exception(e)
+
+        video_save_future.add_done_callback(_set_recording_result)
+        if wait_for_save:
+            return recording_result_future.result()
+        return recording_result_future
+
+    def record(self,
+               duration_seconds: float,
+               synchronized_videos_folder: Union[str, Path] = None,
+               wait_for_save: bool = True) -> Union[RecordingResult, Future]:
+        self.start_recording(synchronized_videos_folder)
+        time.sleep(duration_seconds)
+        return self.stop_recording(wait_for_save=wait_for_save)
+
+    async def start_recording_async(self, synchronized_videos_folder: Union[str, Path] = None) -> Path:
+        future = self._worker.start_recording(synchronized_videos_folder)
+        return Path(await asyncio.wrap_future(future))
+
+    async def stop_recording_async(self) -> RecordingResult:
+        return await asyncio.wrap_future(self.stop_recording(wait_for_save=False))
+
+    async def record_async(self,
+                           duration_seconds: float,
+                           synchronized_videos_folder: Union[str, Path] = None) -> RecordingResult:
+        await self.start_recording_async(synchronized_videos_folder)
+        await asyncio.sleep(duration_seconds)
+        return await self.stop_recording_async()
+
+    def progress(self) -> Dict[str, CameraRecordingProgress]:
+        """How the current recording is going, by camera"""
+        status = self._worker.status()
+        progress_dictionary = {}
+        for camera_id in self.camera_ids:
+            telemetry = status["telemetry"].get(camera_id, {})
+            progress_dictionary[camera_id] = CameraRecordingProgress(
+                frames_recorded=status["frames_recorded"].get(camera_id, 0),
+                frames_per_second=telemetry.get("frames_per_second"),
+                number_of_frames_dropped=telemetry.get("number_of_frames_dropped", 0),
+                queue_size=telemetry.get("queue_size", 0),
+            )
+        return progress_dictionary
@@ -3,7 +3,7 @@ import logging
 import multiprocessing
 import time
 import traceback
-from typing import Optional
+from typing import Callable, Optional
 
 from skellycam.opencv.camera.attributes import Attributes
 from skellycam.opencv.camera.internal_camera_thread import VideoCaptureThread
@@ -47,7 +47,11 @@ class Camera:
     def latest_frame(self):
         return self._capture_thread.latest_frame
 
-    def connect(self, ready_event: multiprocessing.Event = None):
+    def connect(self, ready_event: multiprocessing.Event = None, on_startup_phase: Callable[[str], None] = None):
+        """
+        Returns right away - the camera is opened on its capture thread, and `ready_event` is set once its first frame
+        has arrived (see `VideoCaptureThread`)
+        """
         if ready_event is None:
             self._ready_event = multiprocessing.Event()
             self._ready_event.set()
@@ -61,7 +65,10 @@ class Camera:
         self._capture_thread = VideoCaptureThread(
             config=self._config,
             ready_event=self._ready_event,
+            on_startup_phase=on_startup_phase,
         )
+        if not self._config.use_this_camera:
+            self._capture_thread.pause()
         self._capture_thread.start()
 
     def stop_frame_capture(self):
@@ -99,10 +106,13 @@ class Camera:
         logger.info(
             f"Updating config for camera_id: {self.camera_id}  -  {camera_config}"
         )
-        if not camera_config.use_this_camera:
-            self.close()
+        self._config = camera_config
+        if self._capture_thread is None or not self._capture_thread.is_alive():
+            self.connect(self._ready_event)
+        self._capture_thread.update_camera_config(camera_config)
+
+        # (cameras that aren't used are paused rather than closed, so they come back without being reopened)
+        if camera_config.use_this_camera:
+            self._capture_thread.resume()
         else:
-            if not self._capture_thread.is_capturing_frames:
-                self.connect(self._ready_event)
-
-            self._capture_thread.update_camera_config(camera_config)
+            self._capture_thread.pause()
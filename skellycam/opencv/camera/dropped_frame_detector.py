@@ -0,0 +1,94 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# an interval has to be this many configured frame intervals longer than usual before it counts as a dropped frame
+DROPPED_FRAME_TOLERANCE = 0.5
+# if the camera runs this much slower than configured (e.g. it lowered its frame rate for a long exposure), compare
+# against the interval it is actually running at instead, otherwise every frame would count as a drop
+SLOWER_THAN_CONFIGURED_RATIO = 1.5
+SMOOTHING_FACTOR = 0.05
+
+
+class DroppedFrameDetector:
+    """
+    Counts, in real time, the frames a camera produced that we never received.
+
+    Each frame's interval is compared against the configured frame rate, and if the backend reports a device frame
+    counter that goes up by more than one, the gap is counted too (whichever says more frames were missed wins).
+    """
+
+    def __init__(self, configured_frames_per_second: float, camera_id: str = None):
+        self._camera_id = camera_id
+        self._configured_interval_ns = None
+        self.configured_frames_per_second = configured_frames_per_second
+
+        self._previous_timestamp_ns = None
+        self._previous_device_frame_number = None
+        self._typical_interval_ns = None
+        self._number_of_frames_dropped = 0
+        self._number_of_drop_events = 0
+
+    @property
+    def configured_frames_per_second(self) -> float:
+        return 1e9 / self._configured_interval_ns
+
+    @configured_frames_per_second.setter
+    def configured_frames_per_second(self, configured_frames_per_second: float):
+        self._configured_interval_ns = 1e9 / configured_frames_per_second
+
+    @property
+    def number_of_frames_dropped(self) -> int:
+        return self._number_of_frames_dropped
+
+    @property
+    def number_of_drop_events(self) -> int:
+        return self._number_of_drop_events
+
+    @property
+    def reference_interval_ns(self) -> float:
+        """The interval frames are expected to arrive at"""
+        if (self._typical_interval_ns is not None
+                and self._typical_interval_ns > self._configured_interval_ns * SLOWER_THAN_CONFIGURED_RATIO):
+            return self._typical_interval_ns
+        return self._configured_interval_ns
+
+    def update(self, timestamp_ns: int, device_frame_number: int = None) -> int:
+        """
+        Returns how many frames were missed right before this one
+        """
+        number_of_frames_missed = 0
+
+        if self._previous_timestamp_ns is not None:
+            interval_ns = timestamp_ns - self._previous_timestamp_ns
+            number_of_frames_missed = max(
+                int(interval_ns / self.reference_interval_ns + (1 - DROPPED_FRAME_TOLERANCE)) - 1, 0
+            )
+            self._update_typical_interval(interval_ns)
+
+        if (device_frame_number is not None and device_frame_number > 0
+                and self._previous_device_frame_number is not None):
+            number_of_frames_missed = max(number_of_frames_missed,
+                                          device_frame_number - self._previous_device_frame_number - 1)
+
+        self._previous_timestamp_ns = timestamp_ns
+        if device_frame_number is not None and device_frame_number > 0:
+            self._previous_device_frame_number = device_frame_number
+
+        if number_of_frames_missed > 0:
+            self._number_of_frames_dropped += number_of_frames_missed
+            self._number_of_drop_events += 1
+            logger.debug(f"Camera {self._camera_id} dropped {number_of_frames_missed} frame(s) - "
+                         f"{self._number_of_frames_dropped} dropped so far")
+        return number_of_frames_missed
+
+    def skip_gap(self):
+        """The next frame doesn't follow on from the last one (e.g. the camera was paused) - don't count the gap"""
+        self._previous_timestamp_ns = None
+        self._previous_device_frame_number = None
+
+    def _update_typical_interval(self, interval_ns: int):
+        if self._typical_interval_ns is None:
+            self._typical_interval_ns = float(interval_ns)
+        else:
+            self._typical_interval_ns += SMOOTHING_FACTOR * (interval_ns - self._typical_interval_ns)
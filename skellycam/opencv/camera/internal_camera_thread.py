@@ -3,12 +3,16 @@ import multiprocessing
 import threading
 import time
 import traceback
+from typing import Callable, Union
 
 import cv2
 
 from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.detection.models.frame_rate_statistics import FrameRateStatistics
+from skellycam.opencv.camera.dropped_frame_detector import DroppedFrameDetector
 from skellycam.opencv.camera.models.camera_config import CameraConfig
-from skellycam.opencv.config.apply_config import apply_configuration
+from skellycam.opencv.camera.rolling_frame_rate_statistics import RollingFrameRateStatistics
+from skellycam.opencv.config.apply_config import RESOLUTION_FIELDS, apply_configuration
 from skellycam.opencv.config.determine_backend import determine_backend
 
 logger = logging.getLogger(__name__)
@@ -19,9 +23,14 @@ class VideoCaptureThread(threading.Thread):
             self,
             config: CameraConfig,
             ready_event: multiprocessing.Event = None,
+            on_startup_phase: Callable[[str], None] = None,
     ):
+        """
+        The camera is opened and configured on this thread once it starts (so cameras open in parallel), and
+        `ready_event` is set once the first frame with the config has arrived. `on_startup_phase` is called with
+        `"opened"`, `"configured"` and `"first_frame"` as the camera gets through them
+        """
         super().__init__()
-        self._previous_frame_timestamp_ns = None
         self._new_frame_ready = False
         self.daemon = False
 
@@ -32,16 +41,25 @@ class VideoCaptureThread(threading.Thread):
             self._ready_event = ready_event
 
         self._config = config
+        self._on_startup_phase = on_startup_phase
         self._is_capturing_frames = False
         self._is_recording_frames = False
+        self._is_paused = False
+        self._first_frame_grabbed = False
+        # config changes wait here for the frame loop, which owns the capture object, to apply them between frames
+        # (only the latest one - taken and cleared in one go, so one that comes in meanwhile isn't lost)
+        self._pending_config: Union[CameraConfig, None] = None
+        self._pending_config_lock = threading.Lock()
 
         self._number_of_frames_received: int = 0
 
         # self._elapsed_during_frame_grab = [] #TODO
         self._capture_timestamps = []
-        self._mean_frames_per_second = None
+        self._frame_rate_statistics = RollingFrameRateStatistics()
+        self._dropped_frame_detector = DroppedFrameDetector(configured_frames_per_second=self._config.framerate,
+                                                            camera_id=str(self._config.camera_id))
         self._frame: FramePayload = FramePayload()
-        self._cv2_video_capture = self._create_cv2_capture()
+        self._cv2_video_capture = None
 
     @property
     def first_frame_timestamp(self):
@@ -49,26 +67,9 @@ class VideoCaptureThread(threading.Thread):
             return self._capture_timestamps[0]
         return None
 
-    #
-    # @property
-    # def mean_frames_per_second(self):
-    #     return self._mean_frames_per_second
-    #
-    # def update_mean_frames_per_second(self, latest_frame_timestamp_ns: float):
-    #
-    #     if self._previous_frame_timestamp_ns is None:
-    #         self._previous_frame_timestamp_ns = latest_frame_timestamp_ns
-    #         return 0
-    #
-    #     frame_duration_in_seconds = ((latest_frame_timestamp_ns - self._previous_frame_timestamp_ns) / 1e9) ** -1
-    #
-    #     if self._mean_frames_per_second is None:
-    #         self._mean_frames_per_second = frame_duration_in_seconds
-    #         return self._mean_frames_per_second
-    #
-    #     self._mean_frames_per_second = (self._mean_frames_per_second + frame_duration_in_seconds) / 2
-    #
-    #     return self._mean_frames_per_second
+    @property
+    def frame_rate_statistics(self) -> FrameRateStatistics:
+        return self._frame_rate_statistics.statistics
 
     @property
     def latest_frame(self) -> FramePayload:
@@ -80,22 +81,37 @@ class VideoCaptureThread(threading.Thread):
     def new_frame_ready(self):
         return self._new_frame_ready
 
+    @property
+    def is_paused(self) -> bool:
+        return self._is_paused
+
     @property
     def is_capturing_frames(self) -> bool:
         """Is the thread capturing frames from the cameras (but not necessarily recording them, that's handled by `is_recording_frames`)"""
         return self._is_capturing_frames
 
     def run(self):
+        self._is_capturing_frames = True
+        self._cv2_video_capture = self._create_cv2_capture()
+        if not self._is_capturing_frames:
+            # (stopped while the camera was opening)
+            if self._cv2_video_capture is not None:
+                self._cv2_video_capture.release()
+            return
         self._start_frame_loop()
 
     def _start_frame_loop(self):
-        self._is_capturing_frames = True
         logger.info(
             f"Camera ID: [{self._config.camera_id}] Frame capture loop has started"
         )
         try:
             while self._is_capturing_frames:
                 try:
+                    if self._pending_config is not None:
+                        self._apply_pending_config()
+                    if self._is_paused:
+                        self._grab_while_paused()
+                        continue
                     self._frame = self._get_next_frame()
                 except Exception as e:
                     logger.error(e)
@@ -125,8 +141,20 @@ class VideoCaptureThread(threading.Thread):
         else:
             self._new_frame_ready = success
 
+        number_of_frames_missed = None
         if success:
             self._number_of_frames_received += 1
+            self._handle_first_frame()
+            number_of_frames_missed = self._dropped_frame_detector.update(
+                timestamp_ns=retrieval_timestamp,
+                device_frame_number=self._get_device_frame_number(),
+            )
+            frame_rate_statistics = self._frame_rate_statistics.update(
+                retrieval_timestamp,
+                number_of_frames_missed=number_of_frames_missed,
+            )
+        else:
+            frame_rate_statistics = self._frame_rate_statistics.statistics
 
         return FramePayload(
             success=success,
@@ -134,8 +162,19 @@ class VideoCaptureThread(threading.Thread):
             timestamp_ns=retrieval_timestamp,
             number_of_frames_received=self._number_of_frames_received,
             camera_id=str(self._config.camera_id),
+            mean_frames_per_second=frame_rate_statistics.frames_per_second,
+            frame_rate_statistics=frame_rate_statistics,
+            number_of_frames_missed=number_of_frames_missed,
         )
 
+    def _get_device_frame_number(self) -> Union[int, None]:
+        """The backend's frame counter, if it has one (most webcam backends report 0 or -1)"""
+        try:
+            device_frame_number = int(self._cv2_video_capture.get(cv2.CAP_PROP_POS_FRAMES))
+        except Exception:
+            return None
+        return device_frame_number if device_frame_number > 0 else None
+
     def _create_cv2_capture(self):
         logger.info(f"Connecting to Camera: {self._config.camera_id}...")
         cap_backend = determine_backend()
@@ -146,6 +185,7 @@ class VideoCaptureThread(threading.Thread):
             pass
 
         capture = cv2.VideoCapture(int(self._config.camera_id), cap_backend)
+        self._report_startup_phase("opened")
 
         try:
             success, image = capture.read()
@@ -164,16 +204,49 @@ class VideoCaptureThread(threading.Thread):
             )
             capture.release()
             del capture
+            if not self._is_capturing_frames:
+                return None  # (stopped meanwhile - don't try again)
             return self._create_cv2_capture()
 
         apply_configuration(capture, self._config)
+        self._report_startup_phase("configured")
 
         logger.info(f"Successfully connected to Camera: {self._config.camera_id}!")
-        if not self._ready_event.is_set():
-            self._ready_event.set()
-
         return capture
 
+    def _handle_first_frame(self):
+        if self._first_frame_grabbed:
+            return
+        self._first_frame_grabbed = True
+        self._report_startup_phase("first_frame")
+        self._ready_event.set()
+
+    def _grab_while_paused(self):
+        """Keeps the camera streaming (and its buffer fresh) without decoding or handing out the frames"""
+        self._new_frame_ready = False  # (in case a frame came in while pausing)
+        if self._cv2_video_capture.grab():
+            self._handle_first_frame()
+
+    def pause(self):
+        """Stop handing out frames, but keep the camera open - `resume` brings it back without reopening it"""
+        if not self._is_paused:
+            logger.info(f"Pausing Camera: {self._config.camera_id}")
+        self._is_paused = True
+        self._new_frame_ready = False
+
+    def resume(self):
+        if not self._is_paused:
+            return
+        logger.info(f"Resuming Camera: {self._config.camera_id}")
+        # (the pause isn't a run of dropped frames)
+        self._dropped_frame_detector.skip_gap()
+        self._frame_rate_statistics.skip_gap()
+        self._is_paused = False
+
+    def _report_startup_phase(self, phase: str):
+        if self._on_startup_phase is not None:
+            self._on_startup_phase(phase)
+
     def stop(self):
         self._is_capturing_frames = False
         if self._cv2_video_capture is not None:
@@ -183,6 +256,30 @@ class VideoCaptureThread(threading.Thread):
             self._cv2_video_capture.release()
 
     def update_camera_config(self, new_config: CameraConfig):
-        self._config = new_config
+        """
+        Queued for the frame loop - returns right away (so every camera's change is applied at the same time). If the
+        camera is still opening, it's applied once it's open (against the config it was opened with)
+        """
         logger.info(f"Updating Camera: {self._config.camera_id} config to {new_config}")
-        apply_configuration(self._cv2_video_capture, new_config)
+        with self._pending_config_lock:
+            self._pending_config = new_config
+
+    def _apply_pending_config(self):
+        with self._pending_config_lock:
+            new_config, self._pending_config = self._pending_config, None
+        if new_config is None:
+            return
+        previous_config = self._config
+        self._config = new_config
+        self._dropped_frame_detector.configured_frames_per_second = new_config.framerate
+        property_updates = apply_configuration(self._cv2_video_capture, new_config, previous_config=previous_config)
+        if not property_updates:
+            return  # (nothing to set on the device - e.g. only the rotation changed)
+
+        if any(property_update.name in RESOLUTION_FIELDS and not property_update.was_applied
+               for property_update in property_updates):
+            logger.info(f"Camera: {new_config.camera_id} didn't take the new resolution while open - reopening it")
+            self._cv2_video_capture = self._create_cv2_capture()
+        # (frames from before and after the change don't make for one interval)
+        self._dropped_frame_detector.skip_gap()
+        self._frame_rate_statistics.skip_gap()
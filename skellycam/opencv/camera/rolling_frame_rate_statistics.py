@@ -0,0 +1,96 @@
+import math
+from collections import deque
+
+from skellycam.detection.models.frame_rate_statistics import FrameRateStatistics
+
+DEFAULT_WINDOW_SIZE = 120  # frames - a few seconds at typical webcam frame rates
+DEFAULT_SMOOTHING_FACTOR = 0.05
+
+
+class RollingFrameRateStatistics:
+    """
+    Frame rate statistics that are updated in O(1) per frame, so they can run in the capture thread.
+
+    - frames per second and jitter are an exponentially weighted moving average/standard deviation of the frame
+      interval
+    - the min/max frame interval over the last `window_size` frames come from monotonic deques
+    - dropped frames are estimated from intervals that are (rounded) multiples of the typical interval, unless the
+      caller passes in a count of its own (e.g. from a `DroppedFrameDetector`)
+    """
+
+    def __init__(self,
+                 window_size: int = DEFAULT_WINDOW_SIZE,
+                 smoothing_factor: float = DEFAULT_SMOOTHING_FACTOR):
+        self._window_size = window_size
+        self._smoothing_factor = smoothing_factor
+
+        self._previous_timestamp_ns = None
+        self._number_of_intervals = 0
+        self._mean_interval_ns = None
+        self._interval_variance_ns2 = 0.0
+        self._number_of_frames_dropped = 0
+
+        # (interval number, interval) - increasing intervals in `_window_minimums`, decreasing in `_window_maximums`
+        self._window_minimums = deque()
+        self._window_maximums = deque()
+
+    @property
+    def statistics(self) -> FrameRateStatistics:
+        if self._mean_interval_ns is None:
+            return FrameRateStatistics()
+
+        return FrameRateStatistics(
+            frames_per_second=1e9 / self._mean_interval_ns if self._mean_interval_ns > 0 else None,
+            frame_interval_jitter_ms=math.sqrt(self._interval_variance_ns2) / 1e6,
+            min_frame_interval_ms=self._window_minimums[0][1] / 1e6,
+            max_frame_interval_ms=self._window_maximums[0][1] / 1e6,
+            number_of_frames_dropped=self._number_of_frames_dropped,
+        )
+
+    def update(self, timestamp_ns: int, number_of_frames_missed: int = None) -> FrameRateStatistics:
+        if number_of_frames_missed is not None:
+            self._number_of_frames_dropped += number_of_frames_missed
+
+        if self._previous_timestamp_ns is None:
+            self._previous_timestamp_ns = timestamp_ns
+            return self.statistics
+
+        interval_ns = timestamp_ns - self._previous_timestamp_ns
+        self._previous_timestamp_ns = timestamp_ns
+
+        if self._mean_interval_ns is None:
+            self._mean_interval_ns = float(interval_ns)
+        else:
+            # compared to the typical interval *before* this one pulls the average up
+            if number_of_frames_missed is None and self._mean_interval_ns > 0:
+                self._number_of_frames_dropped += max(round(interval_ns / self._mean_interval_ns) - 1, 0)
+
+            deviation = interval_ns - self._mean_interval_ns
+            self._mean_interval_ns += self._smoothing_factor * deviation
+            self._interval_variance_ns2 = (1 - self._smoothing_factor) * (
+                    self._interval_variance_ns2 + self._smoothing_factor * deviation ** 2)
+
+        self._update_window(interval_ns)
+        return self.statistics
+
+    def skip_gap(self):
+        """The next frame doesn't follow on from the last one (e.g. the camera was paused) - don't count the gap"""
+        self._previous_timestamp_ns = None
+
+    def _update_window(self, interval_ns: int):
+        interval_number = self._number_of_intervals
+        self._number_of_intervals += 1
+
+        while self._window_minimums and self._window_minimums[-1][1] >= interval_ns:
+            self._window_minimums.pop()
+        self._window_minimums.append((interval_number, interval_ns))
+
+        while self._window_maximums and self._window_maximums[-1][1] <= interval_ns:
+            self._window_maximums.pop()
+        self._window_maximums.append((interval_number, interval_ns))
+
+        oldest_interval_number_in_window = interval_number - self._window_size + 1
+        if self._window_minimums[0][0] < oldest_interval_number_in_window:
+            self._window_minimums.popleft()
+        if self._window_maximums[0][0] < oldest_interval_number_in_window:
+            self._window_maximums.popleft()
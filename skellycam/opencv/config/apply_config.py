@@ -1,22 +1,44 @@
 import logging
+import time
 import traceback
+from typing import List
 
 import cv2
 
+from skellycam.detection.models.camera_property_update import CameraPropertyUpdate
 from skellycam.opencv.camera.models.camera_config import CameraConfig
 
 logger = logging.getLogger(__name__)
 
+# the `CameraConfig` fields that are set on the capture device (the rest are handled in software), in the order they
+# are set - the pixel format and resolution decide which frame rates (and exposures) the camera offers
+CAPTURE_PROPERTIES = {
+    "fourcc": cv2.CAP_PROP_FOURCC,
+    "resolution_width": cv2.CAP_PROP_FRAME_WIDTH,
+    "resolution_height": cv2.CAP_PROP_FRAME_HEIGHT,
+    "framerate": cv2.CAP_PROP_FPS,
+    "exposure": cv2.CAP_PROP_EXPOSURE,
+}
+RESOLUTION_FIELDS = ["resolution_width", "resolution_height"]
+
+
+def apply_configuration(cv2_vid_cap: cv2.VideoCapture,
+                        config: CameraConfig,
+                        previous_config: CameraConfig = None) -> List[CameraPropertyUpdate]:
+    """
+    Set the capture properties in `config` - only the ones that differ from `previous_config`, if it is given (every
+    property that is set costs time, and some drivers restart the stream for it). Each one is read back after it is set
+    """
+    changed_field_names = [field_name for field_name in CAPTURE_PROPERTIES
+                           if previous_config is None
+                           or getattr(previous_config, field_name) != getattr(config, field_name)]
+    if not changed_field_names:
+        return []
 
-def apply_configuration(cv2_vid_cap: cv2.VideoCapture, config: CameraConfig):
     # set camera stream parameters
     logger.info(
-        f"Applying configuration to Camera {config.camera_id}:"
-        f"Exposure: {config.exposure}, "
-        f"Resolution width: {config.resolution_width}, "
-        f"Resolution height: {config.resolution_height}, "
-        f"Framerate: {config.framerate}, "
-        f"Fourcc: {config.fourcc}"
+        f"Applying configuration to Camera {config.camera_id}: "
+        + ", ".join(f"{field_name}: {getattr(config, field_name)}" for field_name in changed_field_names)
     )
     try:
         if not cv2_vid_cap.isOpened():
@@ -24,20 +46,47 @@ def apply_configuration(cv2_vid_cap: cv2.VideoCapture, config: CameraConfig):
                 f"Failed to apply configuration to Camera {config.camera_id} - camera is "
                 f"not open"
             )
-            return
+            return []
     except Exception as e:
         logger.error(
             f"Failed when trying to check if Camera {config.camera_id} is open"
         )
-        return
+        return []
 
     try:
-        cv2_vid_cap.set(cv2.CAP_PROP_EXPOSURE, config.exposure)
-        cv2_vid_cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.resolution_width)
-        cv2_vid_cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.resolution_height)
-        cv2_vid_cap.set(cv2.CAP_PROP_FPS, config.framerate)
-        cv2_vid_cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*config.fourcc))
+        property_updates = [_set_capture_property(cv2_vid_cap, field_name, getattr(config, field_name))
+                            for field_name in changed_field_names]
     except Exception as e:
         logger.error(f"Problem applying configuration for camera: {config.camera_id}")
         traceback.print_exc()
         raise e
+
+    for property_update in property_updates:
+        if not property_update.was_applied:
+            logger.warning(f"Camera {config.camera_id} {property_update.name} is {property_update.read_back_value} "
+                           f"after setting it to {property_update.requested_value}")
+    logger.info(f"Applied configuration to Camera {config.camera_id} in "
+                f"{sum(property_update.latency_ms for property_update in property_updates):.1f} ms - "
+                + ", ".join(f"{property_update.name}: {property_update.latency_ms:.1f} ms"
+                            for property_update in property_updates))
+    return property_updates
+
+
+def _set_capture_property(cv2_vid_cap: cv2.VideoCapture, field_name: str, value) -> CameraPropertyUpdate:
+    property_id = CAPTURE_PROPERTIES[field_name]
+    start_time_ns = time.perf_counter_ns()
+    if field_name == "fourcc":
+        cv2_vid_cap.set(property_id, cv2.VideoWriter_fourcc(*value))
+        read_back_value = _decode_fourcc(cv2_vid_cap.get(property_id))
+    else:
+        cv2_vid_cap.set(property_id, value)
+        read_back_value = cv2_vid_cap.get(property_id)
+    return CameraPropertyUpdate(name=field_name,
+                                requested_value=value,
+                                read_back_value=read_back_value,
+                                latency_ms=(time.perf_counter_ns() - start_time_ns) / 1e6)
+
+
+def _decode_fourcc(fourcc_code: float) -> str:
+    fourcc_code = int(fourcc_code)
+    return "".join(chr((fourcc_code >> (8 * byte_index)) & 0xFF) for byte_index in range(4))
@@ -3,11 +3,12 @@ import multiprocessing
 import time
 from typing import Dict, List
 
-from PySide6.QtCore import Signal
-
 from skellycam import CameraConfig
 from skellycam.detection.detect_cameras import detect_cameras
+from skellycam.detection.models.camera_startup_timings import CameraStartupTimings
+from skellycam.detection.models.camera_telemetry import CameraTelemetry
 from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.detection.models.frame_rate_statistics import FrameRateStatistics
 from skellycam.opencv.group.strategies.grouped_process_strategy import (
     GroupedProcessStrategy,
 )
@@ -27,8 +28,14 @@ class CameraGroup:
             f"Creating camera group for cameras: {camera_ids_list} with strategy {strategy} and camera configs {camera_config_dictionary}"
         )
         self._event_dictionary = None
+        self._frames_available_event = None
+        self._start_timestamp_ns = None
+        # which streams the camera processes send over - by default only full resolution frames, like always
+        self._full_resolution_subscribed_event = multiprocessing.Event()
+        self._full_resolution_subscribed_event.set()
+        self._preview_subscribed_event = multiprocessing.Event()
+        self._frame_rate_statistics_dictionary: Dict[str, FrameRateStatistics] = {}
         self._strategy_enum = strategy
-        self._camera_ids = camera_ids_list
 
         # Make optional, if a list of cams is sent then just use that
         if camera_ids_list is None:
@@ -36,6 +43,7 @@ class CameraGroup:
                 camera_ids_list = list(camera_config_dictionary.keys())
             else:
                 camera_ids_list = detect_cameras().cameras_found_list
+        self._camera_ids = list(camera_ids_list)
 
         self._strategy_class = self._resolve_strategy(camera_ids_list)
 
@@ -71,21 +79,67 @@ class CameraGroup:
     def queue_size(self) -> Dict[str, int]:
         return self._strategy_class.queue_size
 
+    @property
+    def telemetry(self) -> Dict[str, CameraTelemetry]:
+        """Queue sizes, frame rates, drops and latencies of every camera, read from shared memory (no IPC)"""
+        return self._strategy_class.telemetry
+
+    @property
+    def frame_rate_statistics(self) -> Dict[str, FrameRateStatistics]:
+        """Rolling frame rate statistics of each camera, as of the latest frame pulled from it"""
+        return self._frame_rate_statistics_dictionary
+
+    @property
+    def startup_timings(self) -> Dict[str, CameraStartupTimings]:
+        """How long each camera took to get through each phase of the last `start` (None for phases not reached yet)"""
+        if self._start_timestamp_ns is None:
+            return {}
+        return self._strategy_class.get_startup_timings(self._start_timestamp_ns)
+
     def update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig]):
         logger.info(f"Updating camera configs to {camera_config_dictionary}")
         self._camera_config_dictionary = camera_config_dictionary
         self._strategy_class.update_camera_configs(camera_config_dictionary)
 
+    def update_camera_ids(self, camera_ids: List[str]):
+        """
+        Use these cameras from now on, without closing any - cameras that are left out are paused (`use_this_camera`
+        is turned off, and their capture stays open so they come back instantly), and new ones are started in
+        processes of their own next to the running ones
+        """
+        camera_ids = [str(camera_id) for camera_id in camera_ids]
+        new_camera_ids = [camera_id for camera_id in camera_ids if camera_id not in self._camera_config_dictionary]
+
+        camera_config_dictionary = {
+            camera_id: CameraConfig(**{**camera_config.dict(), "use_this_camera": camera_id in camera_ids})
+            for camera_id, camera_config in self._camera_config_dictionary.items()
+        }
+        for camera_id in new_camera_ids:
+            camera_config_dictionary[camera_id] = CameraConfig(camera_id=camera_id)
+
+        if new_camera_ids:
+            logger.info(f"Adding cameras {new_camera_ids} to camera group")
+            self._camera_ids = self._camera_ids + new_camera_ids
+            self._strategy_class.add_cameras(new_camera_ids,
+                                             event_dictionary=self._event_dictionary,
+                                             camera_config_dict=camera_config_dictionary)
+        self.update_camera_configs(camera_config_dictionary)
+
     def start(self):
         """
         Creates new processes to manage cameras. Use the `get` API to grab camera frames
         :return:
         """
         logger.info(f"Starting camera group with strategy {self._strategy_enum}")
+        self._start_timestamp_ns = time.perf_counter_ns()
         self._exit_event = multiprocessing.Event()
         self._start_event = multiprocessing.Event()
+        self._frames_available_event = multiprocessing.Event()
         self._event_dictionary = {"start": self._start_event,
-                                  "exit": self._exit_event}
+                                  "exit": self._exit_event,
+                                  "frames_available": self._frames_available_event,
+                                  "full_resolution_subscribed": self._full_resolution_subscribed_event,
+                                  "preview_subscribed": self._preview_subscribed_event}
         self._strategy_class.start_capture(
             event_dictionary=self._event_dictionary,
             camera_config_dict=self._camera_config_dictionary,
@@ -95,41 +149,111 @@ class CameraGroup:
 
     def _wait_for_cameras_to_start(self, restart_process_if_it_dies: bool = True):
         logger.info(f"Waiting for cameras {self._camera_ids} to start")
-        all_cameras_started = False
-        while not all_cameras_started:
-            time.sleep(0.5)
-            camera_started_dictionary = dict.fromkeys(self._camera_ids, False)
-
-            for camera_id in self._camera_ids:
-                camera_started_dictionary[camera_id] = self.check_if_camera_is_ready(
-                    camera_id
-                )
-
-            logger.debug(f"Camera started? {camera_started_dictionary}")
-
-            logger.debug(f"Active processes {multiprocessing.active_children()}")
+        cameras_not_started = list(self._camera_ids)
+        while cameras_not_started:
+            # (wakes up as soon as a camera's first frame arrives - the timeout is only for checking on the processes)
+            if self._strategy_class.wait_for_camera_to_be_ready(cameras_not_started[0], timeout=0.1):
+                cameras_not_started = [camera_id for camera_id in cameras_not_started
+                                       if not self.check_if_camera_is_ready(camera_id)]
+                continue
+
+            logger.debug(f"Cameras not started yet: {cameras_not_started}")
             if restart_process_if_it_dies:
                 self._restart_dead_processes()
 
-            all_cameras_started = all(list(camera_started_dictionary.values()))
-
         logger.info(f"All cameras {self._camera_ids} started!")
+        self._log_startup_timings()
         self._start_event.set()  # start frame capture on all cameras
 
+    def _log_startup_timings(self):
+        for camera_id, startup_timings in self.startup_timings.items():
+            logger.info(f"Camera {camera_id} startup (ms): {startup_timings}")
+
     def check_if_camera_is_ready(self, cam_id: str):
         return self._strategy_class.check_if_camera_is_ready(cam_id)
 
     def get_by_cam_id(self, cam_id: str):
-        return self._strategy_class.get_current_frame_by_cam_id(cam_id)
+        frame_payload = self._strategy_class.get_current_frame_by_cam_id(cam_id)
+        self._update_frame_rate_statistics(cam_id, frame_payload)
+        return frame_payload
 
     def latest_frames(self) -> Dict[str, FramePayload]:
-        return self._strategy_class.get_latest_frames()
+        frame_payload_dictionary = self._strategy_class.get_latest_frames()
+        for camera_id, frame_payload in frame_payload_dictionary.items():
+            self._update_frame_rate_statistics(camera_id, frame_payload)
+        return frame_payload_dictionary
+
+    def latest_preview_frames(self) -> Dict[str, FramePayload]:
+        """Like `latest_frames`, but from the downscaled preview stream (see `subscribe_to_preview_frames`)"""
+        frame_payload_dictionary = self._strategy_class.get_latest_preview_frames()
+        for camera_id, frame_payload in frame_payload_dictionary.items():
+            self._update_frame_rate_statistics(camera_id, frame_payload)
+        return frame_payload_dictionary
+
+    @property
+    def is_subscribed_to_full_resolution_frames(self) -> bool:
+        return self._full_resolution_subscribed_event.is_set()
+
+    @property
+    def is_subscribed_to_preview_frames(self) -> bool:
+        return self._preview_subscribed_event.is_set()
+
+    def subscribe_to_full_resolution_frames(self, subscribe: bool = True):
+        """
+        Whether the camera processes send full resolution frames (to `latest_frames`/`get_by_cam_id`) - they are big,
+        so only subscribe while they are needed (e.g. while recording)
+        """
+        self._set_subscription(self._full_resolution_subscribed_event, subscribe, preview=False)
+
+    def subscribe_to_preview_frames(self, subscribe: bool = True):
+        """
+        Whether the camera processes also send a downscaled copy of every frame (to `latest_preview_frames`), sized
+        to fit `set_preview_size` (half resolution until that is set)
+        """
+        self._set_subscription(self._preview_subscribed_event, subscribe, preview=True)
+
+    def set_preview_size(self, camera_id: str, width: int, height: int):
+        self._strategy_class.set_preview_size(camera_id, width, height)
+
+    def _set_subscription(self, subscribed_event: multiprocessing.Event, subscribe: bool, preview: bool):
+        if subscribe == subscribed_event.is_set():
+            return
+        if subscribe:
+            # frames left over from the last subscription are stale (the camera processes don't add any meanwhile)
+            self._strategy_class.discard_queued_frames(preview=preview)
+            subscribed_event.set()
+        else:
+            subscribed_event.clear()
+
+    def wait_for_frames(self, timeout: float = None) -> bool:
+        """
+        Block until a camera process has put a new frame in its queue (or `wake` is called), without polling.
+        Returns `False` if nothing happened within `timeout` seconds - the frames themselves come from `latest_frames`
+        """
+        if self._frames_available_event is None:
+            time.sleep(timeout if timeout is not None else 0)
+            return False
+
+        if not self._frames_available_event.wait(timeout=timeout):
+            return False
+        # cleared *before* the queues are read, so a frame put in after this wakes the next wait
+        self._frames_available_event.clear()
+        return True
+
+    def wake(self):
+        """Wake up whoever is in `wait_for_frames` (e.g. to deal with a command), whether or not frames arrived"""
+        if self._frames_available_event is not None:
+            self._frames_available_event.set()
+
+    def _update_frame_rate_statistics(self, camera_id: str, frame_payload: FramePayload):
+        if frame_payload is not None and frame_payload.frame_rate_statistics is not None:
+            self._frame_rate_statistics_dictionary[camera_id] = frame_payload.frame_rate_statistics
 
     def _resolve_strategy(self, cam_ids: List[str]):
         if self._strategy_enum == Strategy.X_CAM_PER_PROCESS:
             return GroupedProcessStrategy(cam_ids)
 
-    def close(self, wait_for_exit: bool = True, cameras_closed_signal: Signal = None):
+    def close(self, wait_for_exit: bool = True, cameras_closed_signal=None):
         logger.info("Closing camera group")
         self._set_exit_event()
         # self._terminate_processes()
@@ -0,0 +1,295 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Tuple, Union
+
+from skellycam.detection.charuco.charuco_definition import CharucoBoardDefinition
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.video_recorder.calibration_recording_session import CalibrationRecordingSession
+from skellycam.opencv.video_recorder.models.calibration_frame_selection_config import \
+    CalibrationFrameSelectionConfig
+from skellycam.opencv.video_recorder.models.segment_config import SegmentConfig
+from skellycam.opencv.video_recorder.models.video_encoder_config import VideoEncoderConfig
+from skellycam.opencv.video_recorder.recording_session import RecordingSession
+
+logger = logging.getLogger(__name__)
+
+# how long the frame loop sleeps at most without frames or commands (e.g. to notice that the cameras closed)
+FRAME_WAIT_TIMEOUT_SECONDS = 0.1
+
+
+class CameraGroupFrameLoop:
+    """
+    What `CamGroupThreadWorker` (Qt) and `HeadlessCameraGroupWorker` share - the loop that takes the frames from a
+    `CameraGroup` and records them, and the commands that loop carries out. It has no thread of its own: the worker
+    calls `run` from its thread.
+
+    Commands are carried out by the frame loop between frames (so e.g. a recording never changes halfway through
+    handling a frame) - `send_control_command` returns a `Future` that is done once the loop has carried the command
+    out, and the loop is woken up for it, so it doesn't wait for the next frame to arrive. While the worker's thread
+    isn't running (or once the loop is done), commands are carried out right away. The methods that change the
+    recording (`start_recording`, `stop_recording`, `update_camera_configs`...) are meant to be run as commands.
+    """
+
+    def __init__(self,
+                 camera_group: Union[CameraGroup, None],
+                 is_running: Callable[[], bool],
+                 video_encoder_config: VideoEncoderConfig = None,
+                 segment_config: SegmentConfig = None):
+        self._camera_group = camera_group
+        self._is_running = is_running
+        self._video_encoder_config = video_encoder_config or VideoEncoderConfig()
+        self._segment_config = segment_config or SegmentConfig()
+        self._calibration_frame_selection_config: Union[CalibrationFrameSelectionConfig, None] = None
+        self._charuco_board: Union[CharucoBoardDefinition, None] = None
+        self._charuco_board_name: Union[str, None] = None
+
+        self._should_continue = True
+        self._frame_loop_finished = False
+        self._should_record_frames_bool = False
+        self._synchronized_videos_folder: Union[str, None] = None
+        self._recording_start_time_ns: Union[int, None] = None
+        self._control_command_queue = queue.Queue()
+        self._control_command_lock = threading.Lock()
+        self._recording_session = self._create_recording_session()
+
+    @property
+    def camera_group(self) -> Union[CameraGroup, None]:
+        return self._camera_group
+
+    @camera_group.setter
+    def camera_group(self, camera_group: CameraGroup):
+        """Only while the loop isn't running"""
+        self._camera_group = camera_group
+        self._recording_session = self._create_recording_session()
+
+    @property
+    def recording_session(self) -> Union[RecordingSession, CalibrationRecordingSession, None]:
+        return self._recording_session
+
+    @property
+    def is_recording(self) -> bool:
+        return self._should_record_frames_bool
+
+    @property
+    def synchronized_videos_folder(self) -> Union[str, None]:
+        """Where the current recording goes"""
+        return self._synchronized_videos_folder
+
+    @property
+    def recording_duration_seconds(self) -> Union[float, None]:
+        if self._recording_start_time_ns is None:
+            return None
+        return (time.perf_counter_ns() - self._recording_start_time_ns) / 1e9
+
+    @property
+    def video_encoder_config(self) -> VideoEncoderConfig:
+        return self._video_encoder_config
+
+    @property
+    def segment_config(self) -> SegmentConfig:
+        return self._segment_config
+
+    @property
+    def calibration_frame_selection_config(self) -> Union[CalibrationFrameSelectionConfig, None]:
+        return self._calibration_frame_selection_config
+
+    # (these take effect from the next recording on)
+    def set_video_encoder_config(self, video_encoder_config: VideoEncoderConfig) -> Future:
+        self._video_encoder_config = video_encoder_config
+        return self.send_control_command(self.replace_recording_session_if_not_recording)
+
+    def set_segment_config(self, segment_config: SegmentConfig) -> Future:
+        self._segment_config = segment_config
+        return self.send_control_command(self.replace_recording_session_if_not_recording)
+
+    def set_calibration_frame_selection_config(
+            self, calibration_frame_selection_config: Union[CalibrationFrameSelectionConfig, None]) -> Future:
+        """
+        With a config, recordings only keep the frame sets worth calibrating with (see `CalibrationRecordingSession`),
+        with `None` they record everything again
+        """
+        self._calibration_frame_selection_config = calibration_frame_selection_config
+        return self.send_control_command(self.replace_recording_session_if_not_recording)
+
+    def set_charuco_board(self, charuco_board: CharucoBoardDefinition, charuco_board_name: str) -> Future:
+        """The board calibration recordings look for (`charuco_board_name` is its key in `CHARUCO_BOARDS`)"""
+        self._charuco_board = charuco_board
+        self._charuco_board_name = charuco_board_name
+        return self.send_control_command(self.replace_recording_session_if_not_recording)
+
+    def run(self, handle_preview_frames: Callable[[Dict[str, FramePayload], int], None] = None):
+        """
+        Until the cameras close (or `stop`) - recording the full resolution frames while recording, and handing the
+        previews (with the time they arrived, in `perf_counter_ns`) to `handle_preview_frames`. Without
+        `handle_preview_frames`, it only reads frames while recording, and otherwise just waits for commands
+        """
+        with self._control_command_lock:
+            self._frame_loop_finished = False
+        queues_may_have_frames = False
+        try:
+            while self._camera_group.is_capturing and self._should_continue:
+                if handle_preview_frames is None and not self._should_record_frames_bool:
+                    # (no frames are coming over - just wait for commands)
+                    self._handle_control_commands(timeout=FRAME_WAIT_TIMEOUT_SECONDS)
+                    queues_may_have_frames = False
+                    continue
+
+                self._handle_control_commands()
+
+                # sleep until a camera process puts a frame in its queue (or a command comes in), instead of polling.
+                # Once woken, keep reading until the queues are empty - only then is it safe to go back to sleep
+                if not queues_may_have_frames:
+                    if not self._camera_group.wait_for_frames(timeout=FRAME_WAIT_TIMEOUT_SECONDS):
+                        continue
+
+                full_resolution_frame_payload_dictionary = {}
+                if self._should_record_frames_bool:
+                    full_resolution_frame_payload_dictionary = self._camera_group.latest_frames()
+                preview_frame_payload_dictionary = {}
+                if handle_preview_frames is not None:
+                    preview_frame_payload_dictionary = self._camera_group.latest_preview_frames()
+                arrival_time_ns = time.perf_counter_ns()
+                queues_may_have_frames = (any(full_resolution_frame_payload_dictionary.values())
+                                          or any(preview_frame_payload_dictionary.values()))
+
+                for camera_id, frame_payload in full_resolution_frame_payload_dictionary.items():
+                    if frame_payload:
+                        self._recording_session.append_frame_payload(camera_id, frame_payload)
+
+                if handle_preview_frames is not None:
+                    handle_preview_frames(preview_frame_payload_dictionary, arrival_time_ns)
+        finally:
+            self._cancel_control_commands()
+
+    def stop(self):
+        """`run` returns (from another thread - the cameras stay open)"""
+        self._should_continue = False
+        if self._camera_group is not None:
+            self._camera_group.wake()
+
+    def send_control_command(self, command: Callable, *args) -> Future:
+        future = Future()
+        with self._control_command_lock:
+            if self._is_running() and not self._frame_loop_finished:
+                self._control_command_queue.put((command, args, future, time.perf_counter_ns()))
+                self._camera_group.wake()
+                return future
+        self._run_control_command(command, args, future, time.perf_counter_ns())
+        return future
+
+    def start_recording(self, synchronized_videos_folder: str) -> str:
+        """Returns the folder the videos will be saved to"""
+        if self._should_record_frames_bool:
+            raise RuntimeError(f"Already recording to {self._synchronized_videos_folder}")
+        Path(synchronized_videos_folder).mkdir(parents=True, exist_ok=True)
+
+        self._synchronized_videos_folder = str(synchronized_videos_folder)
+        self._recording_session.set_folder_to_save_videos(self._synchronized_videos_folder)
+        self._camera_group.subscribe_to_full_resolution_frames(True)
+        self._should_record_frames_bool = True
+        self._recording_start_time_ns = time.perf_counter_ns()
+        return self._synchronized_videos_folder
+
+    def stop_recording(self) -> Tuple[Union[RecordingSession, CalibrationRecordingSession], str, float]:
+        """
+        Returns the finished recording session (for the worker to save), the folder it goes to and how long it was.
+        It is handed over as-is and a fresh one takes its place (no copying)
+        """
+        if not self._should_record_frames_bool:
+            raise RuntimeError("Not recording")
+        self._should_record_frames_bool = False
+        self._camera_group.subscribe_to_full_resolution_frames(False)
+
+        recording_session = self._recording_session
+        synchronized_videos_folder = self._synchronized_videos_folder
+        recording_duration_seconds = self.recording_duration_seconds
+        self._recording_session = self._create_recording_session()
+        self._synchronized_videos_folder = None
+        self._recording_start_time_ns = None
+        return recording_session, synchronized_videos_folder, recording_duration_seconds
+
+    def update_camera_configs(self, camera_config_dictionary: dict):
+        if self._should_record_frames_bool:
+            raise RuntimeError("Can't change the camera configs while recording")
+        self._camera_group.update_camera_configs(camera_config_dictionary)
+        self._recording_session = self._create_recording_session()
+
+    def update_camera_ids(self, camera_ids):
+        """The running cameras stay open - see `CameraGroup.update_camera_ids`"""
+        if self._should_record_frames_bool:
+            raise RuntimeError("Can't change the cameras while recording")
+        self._camera_group.update_camera_ids(camera_ids)
+        self._recording_session = self._create_recording_session()
+
+    def replace_recording_session_if_not_recording(self):
+        if not self._should_record_frames_bool:
+            self._recording_session = self._create_recording_session()
+
+    def _handle_control_commands(self, timeout: float = None):
+        try:
+            if timeout is None:
+                command_tuple = self._control_command_queue.get_nowait()
+            else:
+                command_tuple = self._control_command_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+
+        while True:
+            self._run_control_command(*command_tuple)
+            try:
+                command_tuple = self._control_command_queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _run_control_command(self, command: Callable, args: tuple, future: Future, sent_time_ns: int):
+        if not future.set_running_or_notify_cancel():
+            logger.debug(f"Skipping {command.__name__} - it was cancelled (e.g. it timed out) before it could run")
+            return
+        try:
+            result = command(*args)
+        except Exception as e:
+            logger.error(f"Problem running {command.__name__}: {e}")
+            logger.exception(e)
+            future.set_exception(e)
+            return
+        logger.debug(f"Ran {command.__name__} {(time.perf_counter_ns() - sent_time_ns) / 1e6:.3f} ms after it was sent")
+        future.set_result(result)
+
+    def _cancel_control_commands(self):
+        """The loop is done - the commands it didn't get to won't run (the ones sent from now on run right away)"""
+        with self._control_command_lock:
+            self._frame_loop_finished = True
+            while True:
+                try:
+                    command, _, future, _ = self._control_command_queue.get_nowait()
+                except queue.Empty:
+                    return
+                logger.debug(f"Cancelling {command.__name__} - the frame loop stopped before it could run")
+                future.cancel()
+
+    def _create_recording_session(self) -> Union[RecordingSession, CalibrationRecordingSession, None]:
+        if self._camera_group is None:
+            return None
+        camera_ids = [
+            camera_id
+            for camera_id, camera_config in self._camera_group.camera_config_dictionary.items()
+            if camera_config.use_this_camera
+        ]
+        if self._calibration_frame_selection_config is not None:
+            return CalibrationRecordingSession(
+                camera_ids=camera_ids,
+                charuco_board=self._charuco_board,
+                charuco_board_name=self._charuco_board_name,
+                calibration_frame_selection_config=self._calibration_frame_selection_config,
+                video_encoder_config=self._video_encoder_config,
+            )
+        return RecordingSession(
+            camera_ids=camera_ids,
+            video_encoder_config=self._video_encoder_config,
+            segment_config=self._segment_config,
+        )
@@ -1,3 +1,5 @@
+import dataclasses
+import functools
 import logging
 import math
 import multiprocessing
@@ -5,15 +7,26 @@ from multiprocessing import Process
 from time import perf_counter_ns, sleep
 from typing import Dict, List, Union
 
+import cv2
 from setproctitle import setproctitle
 
 from skellycam import Camera, CameraConfig
+from skellycam.detection.models.camera_startup_timings import CameraStartupTimings
+from skellycam.detection.models.camera_telemetry import CameraTelemetry
 from skellycam.detection.models.frame_payload import FramePayload
 from skellycam.opencv.group.strategies.queue_communicator import QueueCommunicator
+from skellycam.opencv.group.strategies.shared_camera_startup_timestamps import SharedCameraStartupTimestamps
+from skellycam.opencv.group.strategies.shared_camera_telemetry import SharedCameraTelemetry
+from skellycam.system.log_config.logsetup import configure_process_logging
 
 logger = logging.getLogger(__name__)
 
 CAMERA_CONFIG_DICT_QUEUE_NAME = "camera_config_dict_queue"
+PREVIEW_QUEUE_NAME_SUFFIX = "_preview"
+
+
+def get_preview_queue_name(camera_id: str) -> str:
+    return f"{camera_id}{PREVIEW_QUEUE_NAME_SUFFIX}"
 
 
 class CamGroupQueueProcess:
@@ -27,10 +40,23 @@ class CamGroupQueueProcess:
         self._process: Process = None
         self._payload = None
         queue_name_list = self._cam_ids.copy()
+        queue_name_list.extend(get_preview_queue_name(camera_id) for camera_id in self._cam_ids)
         queue_name_list.append(CAMERA_CONFIG_DICT_QUEUE_NAME)
         communicator = QueueCommunicator(queue_name_list)
         self._queues = communicator.queues
 
+        # the camera process counts the frames it puts in each queue, so the queue sizes can be worked out here
+        # without asking the queues (every `Manager` queue call is a round trip to the manager process)
+        self._telemetry = SharedCameraTelemetry(self._cam_ids)
+        self._number_of_frames_taken = dict.fromkeys(self._cam_ids, 0)
+        self._preview_telemetry = SharedCameraTelemetry(self._cam_ids)
+        self._number_of_preview_frames_taken = dict.fromkeys(self._cam_ids, 0)
+
+        # (width, height) the camera process downscales each camera's preview frames to - 0 means half resolution
+        self._preview_sizes = multiprocessing.RawArray("i", 2 * len(self._cam_ids))
+
+        self._startup_timestamps = SharedCameraStartupTimestamps(self._cam_ids)
+
     @property
     def camera_ids(self):
         return self._cam_ids
@@ -45,8 +71,7 @@ class CamGroupQueueProcess:
             camera_config_dict: Dict[str, CameraConfig],
     ):
         """
-        Start capturing frames. Only return if the underlying process is fully running.
-        :return:
+        Start the process that captures the frames - returns right away, see `wait_for_camera_to_be_ready`
         """
 
         logger.info(f"Starting capture `Process` for {self._cam_ids}")
@@ -55,16 +80,22 @@ class CamGroupQueueProcess:
             camera_id: multiprocessing.Event() for camera_id in self._cam_ids
         }
         event_dictionary["ready"] = self._cameras_ready_event_dictionary
+        for camera_id in self._cam_ids:
+            self._startup_timestamps.reset(camera_id)
 
         self._process = Process(
             name=f"Cameras {self._cam_ids}",
             target=CamGroupQueueProcess._begin,
-            args=(self._cam_ids, self._queues, event_dictionary, camera_config_dict),
+            args=(self._cam_ids,
+                  self._queues,
+                  event_dictionary,
+                  camera_config_dict,
+                  self._telemetry,
+                  self._preview_telemetry,
+                  self._preview_sizes,
+                  self._startup_timestamps),
         )
         self._process.start()
-        while not self._process.is_alive():
-            logger.debug(f"Waiting for Process {self._process.name} to start")
-            sleep(0.25)
 
     @property
     def is_capturing(self):
@@ -91,13 +122,21 @@ class CamGroupQueueProcess:
             queues: Dict[str, multiprocessing.Queue],
             event_dictionary: Dict[str, multiprocessing.Event],
             camera_config_dict: Dict[str, CameraConfig],
+            telemetry: SharedCameraTelemetry,
+            preview_telemetry: SharedCameraTelemetry,
+            preview_sizes: multiprocessing.RawArray,
+            startup_timestamps: SharedCameraStartupTimestamps,
     ):
+        configure_process_logging()
         logger.info(
             f"Starting frame loop capture in CamGroupProcess for cameras: {cam_ids}"
         )
         ready_event_dictionary = event_dictionary["ready"]
         start_event = event_dictionary["start"]
         exit_event = event_dictionary["exit"]
+        frames_available_event = event_dictionary["frames_available"]
+        full_resolution_subscribed_event = event_dictionary["full_resolution_subscribed"]
+        preview_subscribed_event = event_dictionary["preview_subscribed"]
 
         setproctitle(f"Cameras {cam_ids}")
 
@@ -108,8 +147,11 @@ class CamGroupQueueProcess:
             camera_config_dict=process_camera_config_dict
         )
 
+        # (every camera opens on its own capture thread, so they all open at once)
         for camera in cameras_dictionary.values():
-            camera.connect(ready_event_dictionary[camera.camera_id])
+            startup_timestamps.record(camera.camera_id, "process_started")
+            camera.connect(ready_event_dictionary[camera.camera_id],
+                           on_startup_phase=functools.partial(startup_timestamps.record, camera.camera_id))
 
         while not exit_event.is_set():
             if not multiprocessing.parent_process().is_alive():
@@ -122,21 +164,37 @@ class CamGroupQueueProcess:
                 logger.info(
                     "Camera config dict queue has items - updating cameras configs"
                 )
+                # (only the cameras whose configs changed - see `GroupedProcessStrategy.update_camera_configs`)
                 camera_config_dictionary = queues[CAMERA_CONFIG_DICT_QUEUE_NAME].get()
 
-                for camera_id, camera in cameras_dictionary.items():
-                    camera.update_config(camera_config_dictionary[camera_id])
+                for camera_id, camera_config in camera_config_dictionary.items():
+                    cameras_dictionary[camera_id].update_config(camera_config)
 
-            if start_event.is_set():
+            if not start_event.is_set():
+                start_event.wait(timeout=0.1)
+            else:
                 # This tight loop ends up 100% the process, so a sleep between framecaptures is
                 # necessary. We can get away with this because we don't expect another frame for
                 # awhile.
                 sleep(0.001)
-                for camera in cameras_dictionary.values():
+                for camera_index, camera in enumerate(cameras_dictionary.values()):
                     if camera.new_frame_ready:
                         try:
-                            queue = queues[camera.camera_id]
-                            queue.put(camera.latest_frame)
+                            frame_payload = camera.latest_frame
+                            # full resolution frames only cross over to the main process if someone wants them
+                            if full_resolution_subscribed_event.is_set():
+                                queues[camera.camera_id].put(frame_payload)
+                                telemetry.record_frame_put(camera.camera_id, frame_payload)
+                            if preview_subscribed_event.is_set():
+                                preview_frame_payload = CamGroupQueueProcess._create_preview_frame_payload(
+                                    frame_payload,
+                                    preview_width=preview_sizes[2 * camera_index],
+                                    preview_height=preview_sizes[2 * camera_index + 1],
+                                )
+                                queues[get_preview_queue_name(camera.camera_id)].put(preview_frame_payload)
+                                preview_telemetry.record_frame_put(camera.camera_id, preview_frame_payload)
+                            # (after the put, so whoever is waiting finds the frame in the queue)
+                            frames_available_event.set()
                         except Exception as e:
                             logger.exception(
                                 f"Problem when putting a frame into the queue: Camera {camera.camera_id} - {e}"
@@ -148,9 +206,34 @@ class CamGroupQueueProcess:
             logger.info(f"Closing camera {camera.camera_id}")
             camera.close()
 
+    @staticmethod
+    def _create_preview_frame_payload(frame_payload: FramePayload,
+                                      preview_width: int,
+                                      preview_height: int) -> FramePayload:
+        """A copy of the frame, downscaled to fit inside (preview_width, preview_height) - or to half size if unset"""
+        image = frame_payload.image
+        if image is None:
+            return frame_payload
+
+        image_height, image_width = image.shape[:2]
+        if preview_width > 0 and preview_height > 0:
+            scale = min(preview_width / image_width, preview_height / image_height, 1.0)
+        else:
+            scale = 0.5
+        preview_size = (max(int(image_width * scale), 1), max(int(image_height * scale), 1))
+        if preview_size != (image_width, image_height):
+            image = cv2.resize(image, preview_size, interpolation=cv2.INTER_AREA)
+        return dataclasses.replace(frame_payload, image=image)
+
     def check_if_camera_is_ready(self, cam_id: str):
         return self._cameras_ready_event_dictionary[cam_id].is_set()
 
+    def wait_for_camera_to_be_ready(self, cam_id: str, timeout: float = None) -> bool:
+        return self._cameras_ready_event_dictionary[cam_id].wait(timeout=timeout)
+
+    def get_startup_timings_by_camera_id(self, camera_id: str, start_timestamp_ns: int) -> CameraStartupTimings:
+        return self._startup_timestamps.timings(camera_id, start_timestamp_ns)
+
     def _get_queue_by_camera_id(self, camera_id: str) -> multiprocessing.Queue:
         return self._queues[camera_id]
 
@@ -159,15 +242,52 @@ class CamGroupQueueProcess:
             if camera_id not in self._queues:
                 return
 
-            queue = self._get_queue_by_camera_id(camera_id)
-            if not queue.empty():
-                return queue.get(block=True)
+            if self.get_queue_size_by_camera_id(camera_id) > 0:
+                frame_payload = self._get_queue_by_camera_id(camera_id).get(block=True)
+                self._number_of_frames_taken[camera_id] += 1
+                frame_payload.queue_size = self.get_queue_size_by_camera_id(camera_id)
+                return frame_payload
         except Exception as e:
             logger.exception(f"Problem when grabbing a frame from: Camera {camera_id} - {e}")
             return
 
+    def get_current_preview_frame_by_camera_id(self, camera_id) -> Union[FramePayload, None]:
+        try:
+            if camera_id not in self._number_of_preview_frames_taken:
+                return
+
+            if self._get_preview_queue_size_by_camera_id(camera_id) > 0:
+                frame_payload = self._queues[get_preview_queue_name(camera_id)].get(block=True)
+                self._number_of_preview_frames_taken[camera_id] += 1
+                frame_payload.queue_size = self._get_preview_queue_size_by_camera_id(camera_id)
+                return frame_payload
+        except Exception as e:
+            logger.exception(f"Problem when grabbing a preview frame from: Camera {camera_id} - {e}")
+            return
+
+    def discard_queued_frames(self, preview: bool = False):
+        """Throw away the frames waiting in the (full resolution or preview) queues, e.g. before subscribing again"""
+        for camera_id in self._cam_ids:
+            if preview:
+                while self.get_current_preview_frame_by_camera_id(camera_id) is not None:
+                    pass
+            else:
+                while self.get_current_frame_by_camera_id(camera_id) is not None:
+                    pass
+
+    def set_preview_size(self, camera_id: str, width: int, height: int):
+        camera_index = self._cam_ids.index(camera_id)
+        self._preview_sizes[2 * camera_index] = int(width)
+        self._preview_sizes[2 * camera_index + 1] = int(height)
+
+    def _get_preview_queue_size_by_camera_id(self, camera_id: str) -> int:
+        return self._preview_telemetry.number_of_frames_put(camera_id) - self._number_of_preview_frames_taken[camera_id]
+
     def get_queue_size_by_camera_id(self, camera_id: str) -> int:
-        return self._queues[camera_id].qsize()
+        return self._telemetry.number_of_frames_put(camera_id) - self._number_of_frames_taken[camera_id]
+
+    def get_telemetry_by_camera_id(self, camera_id: str) -> CameraTelemetry:
+        return self._telemetry.snapshot(camera_id, self._number_of_frames_taken[camera_id])
 
     def update_camera_configs(self, camera_config_dictionary):
         self._queues[CAMERA_CONFIG_DICT_QUEUE_NAME].put(camera_config_dictionary)
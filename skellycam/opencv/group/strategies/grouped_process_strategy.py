@@ -3,6 +3,8 @@ import multiprocessing
 from typing import Dict, List
 
 from skellycam import CameraConfig
+from skellycam.detection.models.camera_startup_timings import CameraStartupTimings
+from skellycam.detection.models.camera_telemetry import CameraTelemetry
 from skellycam.detection.models.frame_payload import FramePayload
 from skellycam.opencv.group.strategies.cam_group_queue_process import CamGroupQueueProcess
 from skellycam.utils.array_split_by import array_split_by
@@ -21,6 +23,8 @@ class GroupedProcessStrategy:
     def __init__(self, camera_ids: List[str]):
         self._camera_ids = camera_ids
         self._processes, self._cam_id_process_map = self._create_processes(self._camera_ids)
+        # the configs the camera processes have, so updates only need to carry what changed
+        self._camera_config_dictionary: Dict[str, CameraConfig] = {}
 
     @property
     def processes(self):
@@ -37,12 +41,19 @@ class GroupedProcessStrategy:
     def queue_size(self) -> Dict[str, int]:
         return {camera_id: self._get_queue_size_by_camera_id(camera_id) for camera_id in self._camera_ids}
 
+    @property
+    def telemetry(self) -> Dict[str, CameraTelemetry]:
+        return {
+            camera_id: process.get_telemetry_by_camera_id(camera_id)
+            for camera_id, process in self._cam_id_process_map.items()
+        }
+
     def start_capture(
             self,
             event_dictionary: Dict[str, multiprocessing.Event],
             camera_config_dict: Dict[str, CameraConfig],
     ):
-
+        self._camera_config_dictionary.update(camera_config_dict)
         for process in self._processes:
             process.start_capture(
                 event_dictionary=event_dictionary, camera_config_dict=camera_config_dict
@@ -53,12 +64,38 @@ class GroupedProcessStrategy:
             if cam_id in process.camera_ids:
                 return process.check_if_camera_is_ready(cam_id)
 
+    def wait_for_camera_to_be_ready(self, cam_id: str, timeout: float = None) -> bool:
+        return self._cam_id_process_map[cam_id].wait_for_camera_to_be_ready(cam_id, timeout=timeout)
+
+    def get_startup_timings(self, start_timestamp_ns: int) -> Dict[str, CameraStartupTimings]:
+        return {
+            camera_id: process.get_startup_timings_by_camera_id(camera_id, start_timestamp_ns)
+            for camera_id, process in self._cam_id_process_map.items()
+        }
+
     def get_current_frame_by_cam_id(self, camera_id: str):
         for process in self._processes:
             current_frame = process.get_current_frame_by_camera_id(camera_id)
             if current_frame:
                 return current_frame
 
+    def get_current_preview_frame_by_cam_id(self, camera_id: str):
+        return self._cam_id_process_map[camera_id].get_current_preview_frame_by_camera_id(camera_id)
+
+    def get_latest_preview_frames(self) -> Dict[str, FramePayload]:
+        return {
+            cam_id: process.get_current_preview_frame_by_camera_id(cam_id)
+            for cam_id, process in self._cam_id_process_map.items()
+        }
+
+    def discard_queued_frames(self, preview: bool = False):
+        for process in self._processes:
+            process.discard_queued_frames(preview=preview)
+
+    def set_preview_size(self, camera_id: str, width: int, height: int):
+        if camera_id in self._cam_id_process_map:
+            self._cam_id_process_map[camera_id].set_preview_size(camera_id, width, height)
+
     def _get_queue_size_by_camera_id(self, camera_ids: str) -> int:
         for process in self._processes:
             if camera_ids in process.camera_ids:
@@ -85,7 +122,39 @@ class GroupedProcessStrategy:
                 cam_id_to_process[cam_id] = process
         return processes, cam_id_to_process
 
-    def update_camera_configs(self, camera_config_dictionary):
-        logger.info(f"Updating camera configs: {camera_config_dictionary}")
+    def add_cameras(self,
+                    camera_ids: List[str],
+                    event_dictionary: Dict[str, multiprocessing.Event] = None,
+                    camera_config_dict: Dict[str, CameraConfig] = None):
+        """
+        Add cameras in processes of their own, without touching the ones already running - and start them if the
+        `event_dictionary` of the running cameras is given
+        """
+        new_processes, new_cam_id_process_map = self._create_processes(camera_ids)
+        # (new containers rather than changing the old ones, which may be in the middle of being looped over)
+        self._processes = self._processes + new_processes
+        self._cam_id_process_map = {**self._cam_id_process_map, **new_cam_id_process_map}
+        self._camera_ids = self._camera_ids + list(camera_ids)
+        if event_dictionary is not None:
+            self._camera_config_dictionary.update({camera_id: camera_config_dict[camera_id] for camera_id in camera_ids})
+            for process in new_processes:
+                process.start_capture(event_dictionary=event_dictionary, camera_config_dict=camera_config_dict)
+
+    def update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig]):
+        """Each process is only sent the configs of its cameras that changed"""
+        changed_camera_config_dictionary = {
+            camera_id: camera_config for camera_id, camera_config in camera_config_dictionary.items()
+            if camera_id in self._cam_id_process_map and self._camera_config_dictionary.get(camera_id) != camera_config
+        }
+        if not changed_camera_config_dictionary:
+            logger.debug("Camera configs unchanged - nothing to update")
+            return
+
+        logger.info(f"Updating camera configs: {changed_camera_config_dictionary}")
+        self._camera_config_dictionary.update(changed_camera_config_dictionary)
         for process in self._processes:
-            process.update_camera_configs(camera_config_dictionary)
+            process_camera_config_dictionary = {camera_id: camera_config
+                                                for camera_id, camera_config in changed_camera_config_dictionary.items()
+                                                if camera_id in process.camera_ids}
+            if process_camera_config_dictionary:
+                process.update_camera_configs(process_camera_config_dictionary)
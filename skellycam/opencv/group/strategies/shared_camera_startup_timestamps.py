@@ -0,0 +1,47 @@
+import multiprocessing
+import time
+from typing import List
+
+from skellycam.detection.models.camera_startup_timings import CameraStartupTimings
+
+# in the order they happen - one row of timestamps per camera
+STARTUP_PHASES = ["process_started", "opened", "configured", "first_frame"]
+
+
+class SharedCameraStartupTimestamps:
+    """
+    When (`perf_counter_ns`, the same clock in every process) each camera got through each phase of starting up -
+    written by the camera processes into shared memory, read by the main process
+    """
+
+    def __init__(self, camera_ids: List[str]):
+        self._camera_ids = list(camera_ids)
+        self._camera_row = {camera_id: row for row, camera_id in enumerate(self._camera_ids)}
+        self._timestamps_ns = multiprocessing.RawArray("q", len(self._camera_ids) * len(STARTUP_PHASES))
+
+    def record(self, camera_id: str, phase: str):
+        self._timestamps_ns[self._index(camera_id, phase)] = time.perf_counter_ns()
+
+    def reset(self, camera_id: str):
+        for phase in STARTUP_PHASES:
+            self._timestamps_ns[self._index(camera_id, phase)] = 0
+
+    def timings(self, camera_id: str, start_timestamp_ns: int) -> CameraStartupTimings:
+        """The duration of each phase, for a start up that began at `start_timestamp_ns`"""
+        timestamps_ns = [start_timestamp_ns] + [self._timestamps_ns[self._index(camera_id, phase)]
+                                                for phase in STARTUP_PHASES]
+        durations_ms = [
+            (timestamps_ns[phase_index + 1] - timestamps_ns[phase_index]) / 1e6
+            if timestamps_ns[phase_index] > 0 and timestamps_ns[phase_index + 1] > 0 else None
+            for phase_index in range(len(STARTUP_PHASES))
+        ]
+        return CameraStartupTimings(
+            spawn_ms=durations_ms[0],
+            open_ms=durations_ms[1],
+            configure_ms=durations_ms[2],
+            first_frame_ms=durations_ms[3],
+            total_ms=(timestamps_ns[-1] - start_timestamp_ns) / 1e6 if timestamps_ns[-1] > 0 else None,
+        )
+
+    def _index(self, camera_id: str, phase: str) -> int:
+        return self._camera_row[camera_id] * len(STARTUP_PHASES) + STARTUP_PHASES.index(phase)
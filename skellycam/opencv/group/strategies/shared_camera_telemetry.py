@@ -0,0 +1,99 @@
+import logging
+import multiprocessing
+import time
+from typing import Dict, List
+
+from skellycam.detection.models.camera_telemetry import CameraTelemetry
+from skellycam.detection.models.frame_payload import FramePayload
+
+logger = logging.getLogger(__name__)
+
+# fps/drops/latency are published this often - the frame count is updated on every frame (the queue size relies on it)
+TELEMETRY_PUBLISH_INTERVAL_SECONDS = 0.1
+LATENCY_SMOOTHING_FACTOR = 0.1
+
+# one row of each array per camera
+_INTEGER_FIELDS = ["number_of_frames_put", "number_of_frames_dropped", "published_timestamp_ns"]
+_FLOAT_FIELDS = ["frames_per_second", "frame_interval_jitter_ms", "capture_to_queue_latency_ms"]
+_NOT_SET = float("nan")
+
+
+class SharedCameraTelemetry:
+    """
+    Per-camera telemetry that a camera process writes into shared memory and the main process reads without any IPC.
+
+    Each value is a single aligned 64 bit write, so no lock is needed - a snapshot can mix values from two consecutive
+    publishes, which doesn't matter for telemetry. The queue size is computed by the reader, as the frames the camera
+    process has put into a queue minus the frames the reader has taken out of it.
+    """
+
+    def __init__(self, camera_ids: List[str]):
+        self._camera_ids = list(camera_ids)
+        self._camera_row = {camera_id: row for row, camera_id in enumerate(self._camera_ids)}
+        self._integers = multiprocessing.RawArray("q", len(self._camera_ids) * len(_INTEGER_FIELDS))
+        self._floats = multiprocessing.RawArray("d", [_NOT_SET] * (len(self._camera_ids) * len(_FLOAT_FIELDS)))
+
+        # only used on the writing side, in the camera process
+        self._last_publish_time_ns: Dict[str, int] = {}
+        self._capture_to_queue_latency_ns: Dict[str, float] = {}
+
+    @property
+    def camera_ids(self) -> List[str]:
+        return self._camera_ids
+
+    def record_frame_put(self, camera_id: str, frame_payload: FramePayload):
+        """Called (in the camera process) right after a frame went into the camera's queue"""
+        now_ns = time.perf_counter_ns()
+        self._set_integer(camera_id, "number_of_frames_put", self.number_of_frames_put(camera_id) + 1)
+
+        if frame_payload.timestamp_ns is not None:
+            latency_ns = now_ns - frame_payload.timestamp_ns
+            previous_latency_ns = self._capture_to_queue_latency_ns.get(camera_id, latency_ns)
+            self._capture_to_queue_latency_ns[camera_id] = previous_latency_ns + LATENCY_SMOOTHING_FACTOR * (
+                    latency_ns - previous_latency_ns)
+
+        if now_ns - self._last_publish_time_ns.get(camera_id, 0) >= TELEMETRY_PUBLISH_INTERVAL_SECONDS * 1e9:
+            self._publish(camera_id, frame_payload, now_ns)
+
+    def number_of_frames_put(self, camera_id: str) -> int:
+        return self._get_integer(camera_id, "number_of_frames_put")
+
+    def snapshot(self, camera_id: str, number_of_frames_taken: int) -> CameraTelemetry:
+        number_of_frames_put = self.number_of_frames_put(camera_id)
+        published_timestamp_ns = self._get_integer(camera_id, "published_timestamp_ns")
+        return CameraTelemetry(
+            queue_size=max(number_of_frames_put - number_of_frames_taken, 0),
+            number_of_frames_put=number_of_frames_put,
+            frames_per_second=self._get_float(camera_id, "frames_per_second"),
+            frame_interval_jitter_ms=self._get_float(camera_id, "frame_interval_jitter_ms"),
+            number_of_frames_dropped=self._get_integer(camera_id, "number_of_frames_dropped"),
+            capture_to_queue_latency_ms=self._get_float(camera_id, "capture_to_queue_latency_ms"),
+            seconds_since_published=((time.perf_counter_ns() - published_timestamp_ns) / 1e9
+                                     if published_timestamp_ns > 0 else None),
+        )
+
+    def _publish(self, camera_id: str, frame_payload: FramePayload, now_ns: int):
+        self._last_publish_time_ns[camera_id] = now_ns
+
+        statistics = frame_payload.frame_rate_statistics
+        if statistics is not None:
+            self._set_float(camera_id, "frames_per_second", statistics.frames_per_second)
+            self._set_float(camera_id, "frame_interval_jitter_ms", statistics.frame_interval_jitter_ms)
+            self._set_integer(camera_id, "number_of_frames_dropped", statistics.number_of_frames_dropped)
+        if camera_id in self._capture_to_queue_latency_ns:
+            self._set_float(camera_id, "capture_to_queue_latency_ms", self._capture_to_queue_latency_ns[camera_id] / 1e6)
+        self._set_integer(camera_id, "published_timestamp_ns", now_ns)
+
+    def _get_integer(self, camera_id: str, field: str) -> int:
+        return self._integers[self._camera_row[camera_id] * len(_INTEGER_FIELDS) + _INTEGER_FIELDS.index(field)]
+
+    def _set_integer(self, camera_id: str, field: str, value: int):
+        self._integers[self._camera_row[camera_id] * len(_INTEGER_FIELDS) + _INTEGER_FIELDS.index(field)] = int(value)
+
+    def _get_float(self, camera_id: str, field: str):
+        value = self._floats[self._camera_row[camera_id] * len(_FLOAT_FIELDS) + _FLOAT_FIELDS.index(field)]
+        return None if value != value else value  # (NaN means not published yet)
+
+    def _set_float(self, camera_id: str, field: str, value: float):
+        self._floats[self._camera_row[camera_id] * len(_FLOAT_FIELDS) + _FLOAT_FIELDS.index(field)] = (
+            _NOT_SET if value is None else float(value))
@@ -0,0 +1,125 @@
+import logging
+from pathlib import Path
+from typing import Union
+
+import cv2
+import numpy as np
+
+from skellycam.opencv.video_recorder.video_frame_index import can_create_video_frame_index, load_video_frame_index
+
+logger = logging.getLogger(__name__)
+
+
+class IndexedVideoReader:
+    """
+    Random access to the frames of a recorded video.
+
+    If the video has a frame index (saved next to it by the `VideoRecorder`) and PyAV is installed, reading frame `k`
+    seeks straight to the last keyframe at or before `k` and decodes forward to exactly frame `k`. Reading frames in
+    order never seeks. Without an index, it falls back on OpenCV's (slower, and for some codecs imprecise) seeking.
+    """
+
+    def __init__(self, video_path: Union[str, Path]):
+        self._video_path = Path(video_path)
+        self._frame_index = load_video_frame_index(self._video_path)
+        self._next_frame_number = None
+
+        if self._frame_index is not None and can_create_video_frame_index():
+            self._open_with_pyav()
+        else:
+            logger.warning(f"No frame index for {self._video_path} (or PyAV is not installed) - "
+                           f"falling back on OpenCV seeking, which may be slow and imprecise")
+            self._frame_index = None
+            self._cv2_video_capture = cv2.VideoCapture(str(self._video_path))
+            self._number_of_frames = int(self._cv2_video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    @property
+    def video_path(self) -> Path:
+        return self._video_path
+
+    @property
+    def number_of_frames(self) -> int:
+        return self._number_of_frames
+
+    @property
+    def frame_index(self) -> Union[np.ndarray, None]:
+        return self._frame_index
+
+    @property
+    def timestamps(self) -> Union[np.ndarray, None]:
+        """Capture time (`time.perf_counter_ns()`) of each frame, if the video has a frame index"""
+        if self._frame_index is None:
+            return None
+        return self._frame_index["timestamp_ns"]
+
+    def __len__(self):
+        return self._number_of_frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def read_frame(self, frame_number: int) -> np.ndarray:
+        """The (BGR) image of frame `frame_number`"""
+        if not 0 <= frame_number < self._number_of_frames:
+            raise IndexError(f"Frame {frame_number} is out of range - {self._video_path} has "
+                             f"{self._number_of_frames} frames")
+
+        if self._frame_index is None:
+            image = self._read_frame_with_opencv(frame_number)
+        else:
+            image = self._read_frame_with_pyav(frame_number)
+
+        self._next_frame_number = frame_number + 1
+        return image
+
+    def close(self):
+        if self._frame_index is None:
+            self._cv2_video_capture.release()
+        else:
+            self._container.close()
+
+    def _open_with_pyav(self):
+        # opportunistic import - PyAV is an optional dependency
+        import av
+
+        self._container = av.open(str(self._video_path))
+        self._stream = self._container.streams.video[0]
+        self._decoded_frames = self._container.decode(self._stream)
+        self._next_frame_number = 0
+        self._number_of_frames = len(self._frame_index)
+        self._keyframe_numbers = np.flatnonzero(self._frame_index["is_keyframe"])
+
+    def _read_frame_with_pyav(self, frame_number: int) -> np.ndarray:
+        keyframe_number = self._keyframe_numbers[
+            max(np.searchsorted(self._keyframe_numbers, frame_number, side="right") - 1, 0)
+        ]
+
+        # decoding forward is cheaper than seeking if we're already past the keyframe we'd seek to
+        if not keyframe_number <= self._next_frame_number <= frame_number:
+            self._container.seek(int(self._frame_index["pts"][keyframe_number]),
+                                 stream=self._stream,
+                                 backward=True,
+                                 any_frame=False)
+            self._decoded_frames = self._container.decode(self._stream)
+
+        target_pts = self._frame_index["pts"][frame_number]
+        for video_frame in self._decoded_frames:
+            if video_frame.pts < target_pts:
+                continue
+            if video_frame.pts > target_pts:
+                break
+            return video_frame.to_ndarray(format="bgr24")
+
+        raise Exception(f"Could not decode frame {frame_number} (pts: {target_pts}) of {self._video_path}")
+
+    def _read_frame_with_opencv(self, frame_number: int) -> np.ndarray:
+        if frame_number != self._next_frame_number:
+            self._cv2_video_capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+
+        success, image = self._cv2_video_capture.read()
+        if not success:
+            raise Exception(f"Could not read frame {frame_number} of {self._video_path}")
+        return image
@@ -0,0 +1,57 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+
+from skellycam.opencv.video_reader.indexed_video_reader import IndexedVideoReader
+
+logger = logging.getLogger(__name__)
+
+
+class SynchronizedVideoReader:
+    """
+    Reads the same synchronized frame from every video in a `synchronized_videos` folder, decoding the videos
+    concurrently (one thread per video)
+    """
+
+    def __init__(self, video_folder_path: Union[str, Path], video_file_extension: str = ".mp4"):
+        self._video_folder_path = Path(video_folder_path)
+        list_of_video_paths = sorted(self._video_folder_path.glob(f"*{video_file_extension}"))
+        if len(list_of_video_paths) == 0:
+            raise FileNotFoundError(f"No videos found in {self._video_folder_path}")
+
+        self._video_readers = {video_path.stem: IndexedVideoReader(video_path) for video_path in list_of_video_paths}
+        self._number_of_frames = min(len(video_reader) for video_reader in self._video_readers.values())
+        self._executor = ThreadPoolExecutor(max_workers=len(self._video_readers))
+
+    @property
+    def video_readers(self) -> Dict[str, IndexedVideoReader]:
+        return self._video_readers
+
+    @property
+    def number_of_frames(self) -> int:
+        return self._number_of_frames
+
+    def __len__(self):
+        return self._number_of_frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def read_frame(self, frame_number: int) -> Dict[str, np.ndarray]:
+        """Video name -> (BGR) image of synchronized frame `frame_number`"""
+        futures = {
+            video_name: self._executor.submit(video_reader.read_frame, frame_number)
+            for video_name, video_reader in self._video_readers.items()
+        }
+        return {video_name: future.result() for video_name, future in futures.items()}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for video_reader in self._video_readers.values():
+            video_reader.close()
@@ -0,0 +1,218 @@
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Union
+
+from skellycam.detection.charuco.batch_charuco_detection import get_charuco_detections_path, save_charuco_detections
+from skellycam.detection.charuco.calibration_frame_selector import CalibrationFrameSelector
+from skellycam.detection.charuco.charuco_definition import CharucoBoardDefinition, get_charuco_board_name
+from skellycam.detection.charuco.charuco_detection import CharucoDetection
+from skellycam.detection.charuco.charuco_tracker import CharucoTracker
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.opencv.video_recorder.models.calibration_frame_selection_config import \
+    CalibrationFrameSelectionConfig
+from skellycam.opencv.video_recorder.models.segment_config import SegmentConfig
+from skellycam.opencv.video_recorder.models.video_encoder_config import VideoEncoderConfig
+from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_FRAME_SETS_FILE_NAME = "calibration_frame_sets.json"
+
+
+class CalibrationRecordingSession:
+    """
+    A recording (same interface as `RecordingSession`) that only keeps the synchronized frame sets worth calibrating
+    with, along with the charuco board detected in them.
+
+    Whenever every camera has a new frame and they were all taken within `max_timestamp_spread_ms` of each other,
+    that frame set is searched for the board (one thread per camera) while the recording goes on - frame sets that
+    come in meanwhile are skipped. A `CalibrationFrameSelector` decides whether the set is kept.
+
+    Saving writes one video per camera (frame `i` of every video is frame set `i`), a charuco detections sidecar per
+    video (see `load_charuco_detections`) and a `calibration_frame_sets.json` with the timestamps of each set - just
+    the json, with how many frame sets were considered, if none were selected.
+    """
+
+    def __init__(self,
+                 camera_ids: List[str],
+                 charuco_board: CharucoBoardDefinition,
+                 calibration_frame_selection_config: CalibrationFrameSelectionConfig = None,
+                 video_encoder_config: VideoEncoderConfig = None,
+                 charuco_board_name: str = None):
+        """`charuco_board_name` is the board's `CHARUCO_BOARDS` key (worked out from the board if it isn't given)"""
+        if calibration_frame_selection_config is None:
+            calibration_frame_selection_config = CalibrationFrameSelectionConfig()
+        if video_encoder_config is None:
+            video_encoder_config = VideoEncoderConfig()
+        self._camera_ids = list(camera_ids)
+        self._charuco_board = charuco_board
+        self._charuco_board_name = charuco_board_name or get_charuco_board_name(charuco_board)
+        self._config = calibration_frame_selection_config
+        self._video_encoder_config = video_encoder_config
+        self._folder_to_save_videos: Union[Path, None] = None
+
+        self._calibration_frame_selector = CalibrationFrameSelector(camera_ids=self._camera_ids,
+                                                                    charuco_board=charuco_board,
+                                                                    config=calibration_frame_selection_config)
+        self._charuco_trackers = {
+            camera_id: CharucoTracker(charuco_board=charuco_board,
+                                      detection_image_width=calibration_frame_selection_config.detection_image_width)
+            for camera_id in self._camera_ids
+        }
+        self._video_recorder_dictionary: Dict[str, VideoRecorder] = {
+            camera_id: VideoRecorder(video_encoder_config=video_encoder_config) for camera_id in self._camera_ids
+        }
+        self._selected_detections: Dict[str, List[CharucoDetection]] = {camera_id: [] for camera_id in self._camera_ids}
+        self._selected_frame_sets: List[dict] = []
+        self._selection_lock = threading.Lock()
+
+        self._latest_frame_payloads: Dict[str, FramePayload] = {}
+        self._last_considered_timestamps_ns: Dict[str, int] = {}
+        # (at least one worker - with every camera turned off there are no cameras, but the session still has to exist)
+        self._detection_executor = ThreadPoolExecutor(max_workers=max(1, len(self._camera_ids)),
+                                                      thread_name_prefix="calibration_detection")
+        self._frame_set_future: Union[Future, None] = None
+
+    @property
+    def camera_ids(self) -> List[str]:
+        return self._camera_ids
+
+    @property
+    def video_encoder_config(self) -> VideoEncoderConfig:
+        return self._video_encoder_config
+
+    @property
+    def segment_config(self) -> SegmentConfig:
+        return SegmentConfig()
+
+    @property
+    def folder_to_save_videos(self) -> Union[Path, None]:
+        return self._folder_to_save_videos
+
+    @property
+    def calibration_frame_selector(self) -> CalibrationFrameSelector:
+        return self._calibration_frame_selector
+
+    @property
+    def video_recorders_with_frames(self) -> Dict[str, VideoRecorder]:
+        return {
+            camera_id: video_recorder
+            for camera_id, video_recorder in self._video_recorder_dictionary.items()
+            if video_recorder.number_of_frames > 0
+        }
+
+    @property
+    def number_of_frames(self) -> Dict[str, int]:
+        """Frames kept so far by each camera (the same for every camera - one per selected frame set)"""
+        return {
+            camera_id: video_recorder.number_of_frames
+            for camera_id, video_recorder in self._video_recorder_dictionary.items()
+        }
+
+    @property
+    def number_of_bytes(self) -> int:
+        return sum(video_recorder.number_of_bytes for video_recorder in self._video_recorder_dictionary.values())
+
+    def set_folder_to_save_videos(self, folder_to_save_videos: Union[str, Path]):
+        self._folder_to_save_videos = Path(folder_to_save_videos)
+
+    def append_frame_payload(self, camera_id: str, frame_payload: FramePayload):
+        self._latest_frame_payloads[camera_id] = frame_payload
+
+        if self._frame_set_future is not None and not self._frame_set_future.done():
+            return  # still looking at the previous frame set
+        if self._calibration_frame_selector.is_full:
+            return
+        if len(self._latest_frame_payloads) < len(self._camera_ids):
+            return
+
+        timestamps_ns = {camera_id: payload.timestamp_ns for camera_id, payload in self._latest_frame_payloads.items()}
+        if any(timestamp_ns <= self._last_considered_timestamps_ns.get(camera_id, -1)
+               for camera_id, timestamp_ns in timestamps_ns.items()):
+            return  # not every camera has a new frame yet
+        if max(timestamps_ns.values()) - min(timestamps_ns.values()) > self._config.max_timestamp_spread_ms * 1e6:
+            return
+
+        self._last_considered_timestamps_ns = timestamps_ns
+        self._frame_set_future = self._detection_executor.submit(self._consider_frame_set,
+                                                                 dict(self._latest_frame_payloads))
+
+    def save(self, folder_to_save_videos: Union[str, Path] = None, create_diagnostic_plots_bool: bool = False):
+        if folder_to_save_videos is None:
+            folder_to_save_videos = self._folder_to_save_videos
+        folder_to_save_videos = Path(folder_to_save_videos)
+
+        if self._frame_set_future is not None:
+            self._frame_set_future.result()
+        self._detection_executor.shutdown(wait=True)
+
+        selector = self._calibration_frame_selector
+        logger.info(f"Saving {selector.number_of_frame_sets_selected} calibration frame sets "
+                    f"(of {selector.number_of_frame_sets_considered} considered) to {folder_to_save_videos}")
+        folder_to_save_videos.mkdir(parents=True, exist_ok=True)
+        # (written even if nothing was selected, so what happened is on disk next to the (missing) videos)
+        self._save_calibration_frame_sets(folder_to_save_videos)
+        if selector.number_of_frame_sets_selected == 0:
+            logger.warning("No calibration frame sets were selected - is the charuco board visible in enough cameras?")
+            return
+
+        for camera_id, video_recorder in self._video_recorder_dictionary.items():
+            video_path = folder_to_save_videos / (f"Camera_{str(camera_id).zfill(3)}_synchronized"
+                                                  f"{self._video_encoder_config.file_extension}")
+            video_recorder.save_frame_list_to_video_file(
+                video_file_save_path=video_path,
+                frame_payload_list=video_recorder.release_frame_payload_list(),
+                frames_per_second=self._config.encode_frames_per_second,
+            )
+            save_charuco_detections(charuco_detections_path=get_charuco_detections_path(video_path),
+                                    detections=self._selected_detections[camera_id],
+                                    charuco_board=self._charuco_board,
+                                    charuco_board_name=self._charuco_board_name,
+                                    video_file_name=video_path.name)
+
+    def _save_calibration_frame_sets(self, folder_to_save_videos: Path):
+        selector = self._calibration_frame_selector
+        with open(folder_to_save_videos / CALIBRATION_FRAME_SETS_FILE_NAME, "w") as file:
+            json.dump({
+                "charuco_board_name": self._charuco_board_name,
+                "calibration_frame_selection_config": self._config.model_dump(),
+                "number_of_frame_sets_considered": selector.number_of_frame_sets_considered,
+                "number_of_frame_sets_selected": selector.number_of_frame_sets_selected,
+                "coverage": selector.coverage(),
+                "frame_sets": self._selected_frame_sets,
+            }, file, indent=4)
+
+    def _consider_frame_set(self, frame_payloads: Dict[str, FramePayload]):
+        try:
+            detection_futures = {
+                camera_id: self._detection_executor.submit(self._charuco_trackers[camera_id].detect,
+                                                           frame_payload.image,
+                                                           frame_payload.timestamp_ns)
+                for camera_id, frame_payload in frame_payloads.items()
+                if camera_id != self._camera_ids[0]
+            }
+            # (the first camera is detected right here, the thread would otherwise just wait for the others)
+            detections = {self._camera_ids[0]: self._charuco_trackers[self._camera_ids[0]].detect(
+                frame_payloads[self._camera_ids[0]].image, frame_payloads[self._camera_ids[0]].timestamp_ns)}
+            detections.update({camera_id: future.result() for camera_id, future in detection_futures.items()})
+
+            frame_set_timestamp_ns = max(frame_payload.timestamp_ns for frame_payload in frame_payloads.values())
+            if not self._calibration_frame_selector.consider(frame_set_timestamp_ns, detections):
+                return
+
+            with self._selection_lock:
+                for camera_id, frame_payload in frame_payloads.items():
+                    self._video_recorder_dictionary[camera_id].append_frame_payload_to_list(frame_payload)
+                    self._selected_detections[camera_id].append(detections[camera_id])
+                self._selected_frame_sets.append({
+                    "timestamps_ns": {camera_id: int(frame_payload.timestamp_ns)
+                                      for camera_id, frame_payload in frame_payloads.items()},
+                    "number_of_charuco_corners": {camera_id: detection.number_of_charuco_corners
+                                                  for camera_id, detection in detections.items()},
+                })
+        except Exception as e:
+            logger.error(f"Problem looking for the charuco board in a calibration frame set: {e}")
+            logger.exception(e)
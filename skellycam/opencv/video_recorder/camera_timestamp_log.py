@@ -0,0 +1,170 @@
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Union
+
+import numpy as np
+
+from skellycam.detection.models.frame_payload import FramePayload
+
+logger = logging.getLogger(__name__)
+
+# one row per frame - integer columns are int64 so nanosecond timestamps stay exact
+TIMESTAMP_LOG_DTYPE = np.dtype(
+    [
+        ("frame_number", np.int64),  # index of the frame within this log
+        ("timestamp_ns", np.int64),  # `time.perf_counter_ns()` when the frame was retrieved from the camera
+        ("number_of_frames_received", np.int64),
+        ("success", np.bool_),
+        ("queue_size", np.int64),  # -1 if unknown
+        ("mean_frames_per_second", np.float64),  # nan if unknown
+        ("number_of_frames_missed", np.int64),  # dropped right before this frame (`DroppedFrameDetector`), -1 if unknown
+    ]
+)
+
+DEFAULT_CHUNK_SIZE = 1024
+
+
+class CameraTimestampLog:
+    """
+    Per-camera log of the capture-time fields of every frame.
+
+    Rows are written into fixed size chunks (so appending is O(1), no `np.append`), and full chunks can be flushed
+    to a raw binary file as they fill up, so the log survives a crash mid-recording. The raw file can be read back
+    with `load_camera_timestamp_log`. CSV/JSON versions are only built when asked for.
+    """
+
+    def __init__(self, flush_file_path: Union[str, Path] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._chunk_size = chunk_size
+        self._full_chunks: List[np.ndarray] = []
+        self._current_chunk = np.empty(chunk_size, dtype=TIMESTAMP_LOG_DTYPE)
+        self._number_of_rows_in_current_chunk = 0
+        self._number_of_rows_flushed = 0
+        self._flush_file_path = None
+        if flush_file_path is not None:
+            self.set_flush_file_path(flush_file_path)
+
+    @classmethod
+    def from_frame_payload_list(cls, frame_payload_list: List[FramePayload]) -> "CameraTimestampLog":
+        timestamp_log = cls(chunk_size=max(len(frame_payload_list), 1))
+        for frame_payload in frame_payload_list:
+            timestamp_log.append_frame_payload(frame_payload)
+        return timestamp_log
+
+    @property
+    def number_of_rows(self) -> int:
+        return len(self._full_chunks) * self._chunk_size + self._number_of_rows_in_current_chunk
+
+    @property
+    def flush_file_path(self) -> Union[Path, None]:
+        return self._flush_file_path
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.column("timestamp_ns")
+
+    def __len__(self):
+        return self.number_of_rows
+
+    def set_flush_file_path(self, flush_file_path: Union[str, Path]):
+        """Start flushing full chunks to this (raw binary) file - anything already full gets written right away"""
+        self._flush_file_path = Path(flush_file_path)
+        self._flush_file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._flush_file_path.write_bytes(b"")
+        self._number_of_rows_flushed = 0
+        self._flush_full_chunks()
+
+    def append_frame_payload(self, frame_payload: FramePayload):
+        self._current_chunk[self._number_of_rows_in_current_chunk] = (
+            self.number_of_rows,
+            frame_payload.timestamp_ns,
+            _int_or_default(frame_payload.number_of_frames_received),
+            bool(frame_payload.success),
+            _int_or_default(frame_payload.queue_size),
+            _float_or_nan(frame_payload.mean_frames_per_second),
+            _int_or_default(frame_payload.number_of_frames_missed),
+        )
+        self._number_of_rows_in_current_chunk += 1
+
+        if self._number_of_rows_in_current_chunk == self._chunk_size:
+            self._full_chunks.append(self._current_chunk)
+            self._current_chunk = np.empty(self._chunk_size, dtype=TIMESTAMP_LOG_DTYPE)
+            self._number_of_rows_in_current_chunk = 0
+            self._flush_full_chunks()
+
+    def to_array(self) -> np.ndarray:
+        return np.concatenate(
+            self._full_chunks + [self._current_chunk[:self._number_of_rows_in_current_chunk]]
+        )
+
+    def column(self, column_name: str) -> np.ndarray:
+        return self.to_array()[column_name]
+
+    def flush(self):
+        """Write everything that isn't on disk yet (including the partially filled chunk) to the flush file"""
+        self._write_rows_to_flush_file(end_row=self.number_of_rows)
+
+    def save(self, path: Union[str, Path]):
+        """Save as a (structured) `.npy` file"""
+        np.save(str(path), self.to_array())
+        logger.info(f"Saved timestamp log to path: {str(path)}")
+
+    def to_csv(self, path: Union[str, Path]):
+        save_timestamp_log_array_to_csv(self.to_array(), path)
+
+    def to_json(self, path: Union[str, Path]):
+        save_timestamp_log_array_to_json(self.to_array(), path)
+
+    def _flush_full_chunks(self):
+        self._write_rows_to_flush_file(end_row=len(self._full_chunks) * self._chunk_size)
+
+    def _write_rows_to_flush_file(self, end_row: int):
+        if self._flush_file_path is None or self._number_of_rows_flushed >= end_row:
+            return
+        with open(self._flush_file_path, "ab") as file:
+            while self._number_of_rows_flushed < end_row:
+                chunk_index, offset = divmod(self._number_of_rows_flushed, self._chunk_size)
+                if chunk_index < len(self._full_chunks):
+                    chunk = self._full_chunks[chunk_index]
+                else:
+                    chunk = self._current_chunk
+                stop = min(self._chunk_size, offset + end_row - self._number_of_rows_flushed)
+                file.write(chunk[offset:stop].tobytes())
+                self._number_of_rows_flushed += stop - offset
+
+
+def load_camera_timestamp_log(path: Union[str, Path]) -> np.ndarray:
+    """Load a timestamp log saved by `CameraTimestampLog.save` (`.npy`) or flushed during capture (raw binary)"""
+    if Path(path).suffix == ".npy":
+        return np.load(str(path))
+    return np.fromfile(str(path), dtype=TIMESTAMP_LOG_DTYPE)
+
+
+def save_timestamp_log_array_to_csv(timestamp_log_array: np.ndarray, path: Union[str, Path]):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(timestamp_log_array.dtype.names)
+        writer.writerows(timestamp_log_array.tolist())
+    logger.info(f"Saved timestamps to path: {str(path)}")
+
+
+def save_timestamp_log_array_to_json(timestamp_log_array: np.ndarray, path: Union[str, Path]):
+    with open(path, "w") as file:
+        json.dump(timestamp_log_array_to_dictionary(timestamp_log_array), file)
+    logger.info(f"Saved timestamps to path: {str(path)}")
+
+
+def timestamp_log_array_to_dictionary(timestamp_log_array: np.ndarray) -> Dict[str, list]:
+    return {
+        column_name: timestamp_log_array[column_name].tolist()
+        for column_name in timestamp_log_array.dtype.names
+    }
+
+
+def _int_or_default(value, default: int = -1) -> int:
+    return default if value is None else int(value)
+
+
+def _float_or_nan(value) -> float:
+    return np.nan if value is None else float(value)
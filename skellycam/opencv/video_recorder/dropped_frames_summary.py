@@ -0,0 +1,74 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DROPPED_FRAMES_SUMMARY_FILE_NAME = "dropped_frames_summary.json"
+
+
+def summarize_dropped_frames(timestamp_log_array: np.ndarray, zero_time_ns: int = None) -> dict:
+    """
+    Per-camera summary of the `number_of_frames_missed` column of a (raw) timestamp log, including where in the
+    recording each drop happened (`zero_time_ns` defaults to the camera's first frame)
+    """
+    if zero_time_ns is None and len(timestamp_log_array) > 0:
+        zero_time_ns = int(timestamp_log_array["timestamp_ns"][0])
+
+    number_of_frames_missed = timestamp_log_array["number_of_frames_missed"]
+    known_rows = number_of_frames_missed >= 0
+    drop_rows = np.flatnonzero(number_of_frames_missed > 0)
+    number_of_frames_dropped = int(number_of_frames_missed[known_rows].sum())
+    number_of_frames_received = len(timestamp_log_array)
+
+    return {
+        "drop_detection_available": bool(np.any(known_rows)),
+        "number_of_frames_received": number_of_frames_received,
+        "number_of_frames_dropped": number_of_frames_dropped,
+        "percent_of_frames_dropped": 100 * number_of_frames_dropped / max(
+            number_of_frames_received + number_of_frames_dropped, 1),
+        "number_of_drop_events": len(drop_rows),
+        "largest_drop": int(number_of_frames_missed.max()) if len(drop_rows) > 0 else 0,
+        "drop_events": [
+            {
+                "frame_number": int(timestamp_log_array["frame_number"][row]),
+                "seconds_into_recording": float(timestamp_log_array["timestamp_ns"][row] - zero_time_ns) / 1e9,
+                "number_of_frames_missed": int(number_of_frames_missed[row]),
+            }
+            for row in drop_rows
+        ],
+    }
+
+
+def save_dropped_frames_summary(timestamp_log_array_dictionary: Dict[str, np.ndarray],
+                                path_to_save_json: Union[str, Path]) -> Dict[str, dict]:
+    """
+    Summarize every camera's dropped frames on a shared clock (zero is the first frame of any camera) and save it
+    """
+    first_timestamps = [int(timestamp_log_array["timestamp_ns"][0])
+                        for timestamp_log_array in timestamp_log_array_dictionary.values()
+                        if len(timestamp_log_array) > 0]
+    zero_time_ns = min(first_timestamps) if len(first_timestamps) > 0 else 0
+
+    dropped_frames_summary = {
+        str(camera_id): summarize_dropped_frames(timestamp_log_array, zero_time_ns=zero_time_ns)
+        for camera_id, timestamp_log_array in timestamp_log_array_dictionary.items()
+    }
+
+    for camera_id, camera_summary in dropped_frames_summary.items():
+        if camera_summary["number_of_frames_dropped"] > 0:
+            logger.warning(
+                f"Camera {camera_id} dropped {camera_summary['number_of_frames_dropped']} frames "
+                f"({camera_summary['percent_of_frames_dropped']:.2f}%) in "
+                f"{camera_summary['number_of_drop_events']} drop events, the largest was "
+                f"{camera_summary['largest_drop']} frames"
+            )
+
+    Path(path_to_save_json).parent.mkdir(parents=True, exist_ok=True)
+    with open(path_to_save_json, "w") as file:
+        json.dump(dropped_frames_summary, file, indent=4)
+    logger.info(f"Saved dropped frames summary to path: {str(path_to_save_json)}")
+    return dropped_frames_summary
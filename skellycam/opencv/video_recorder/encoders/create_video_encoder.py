@@ -0,0 +1,64 @@
+import importlib.util
+import logging
+from pathlib import Path
+from typing import Union
+
+from skellycam.opencv.video_recorder.encoders.ffmpeg_pipe_video_encoder import (
+    FFmpegPipeVideoEncoder,
+    get_ffmpeg_executable_path,
+)
+from skellycam.opencv.video_recorder.encoders.opencv_video_encoder import OpenCVVideoEncoder
+from skellycam.opencv.video_recorder.encoders.pyav_video_encoder import PyAVVideoEncoder
+from skellycam.opencv.video_recorder.encoders.video_encoder import VideoEncoder
+from skellycam.opencv.video_recorder.models.video_encoder_config import VideoEncoderBackend, VideoEncoderConfig
+
+logger = logging.getLogger(__name__)
+
+VIDEO_ENCODER_BACKENDS = {
+    VideoEncoderBackend.OPENCV: OpenCVVideoEncoder,
+    VideoEncoderBackend.PYAV: PyAVVideoEncoder,
+    VideoEncoderBackend.FFMPEG_PIPE: FFmpegPipeVideoEncoder,
+}
+
+
+def is_backend_available(backend: VideoEncoderBackend) -> bool:
+    if backend == VideoEncoderBackend.PYAV:
+        return importlib.util.find_spec("av") is not None
+    if backend == VideoEncoderBackend.FFMPEG_PIPE:
+        return get_ffmpeg_executable_path() is not None
+    return True
+
+
+def resolve_backend(backend: VideoEncoderBackend) -> VideoEncoderBackend:
+    """
+    PyAV and the ffmpeg pipe take the same codec options, so if the requested one isn't installed, use the other
+    """
+    if is_backend_available(backend):
+        return backend
+
+    for fallback_backend in [VideoEncoderBackend.PYAV, VideoEncoderBackend.FFMPEG_PIPE]:
+        if fallback_backend != backend and is_backend_available(fallback_backend):
+            logger.warning(f"Video encoder backend `{backend.value}` is not available - "
+                           f"using `{fallback_backend.value}` instead")
+            return fallback_backend
+
+    raise RuntimeError(f"Video encoder backend `{backend.value}` is not available - "
+                       f"install PyAV (`pip install av`) or put `ffmpeg` on the PATH")
+
+
+def create_video_encoder(
+        config: VideoEncoderConfig,
+        path_to_save_video_file: Union[str, Path],
+        image_width: int,
+        image_height: int,
+        frames_per_second: float,
+) -> VideoEncoder:
+    backend = resolve_backend(config.backend)
+    logger.debug(f"Creating `{backend.value}` video encoder ({config.codec}) for: {path_to_save_video_file}")
+    return VIDEO_ENCODER_BACKENDS[backend](
+        config=config,
+        path_to_save_video_file=path_to_save_video_file,
+        image_width=image_width,
+        image_height=image_height,
+        frames_per_second=frames_per_second,
+    )
@@ -0,0 +1,53 @@
+import logging
+import shutil
+import subprocess
+
+import numpy as np
+
+from skellycam.opencv.video_recorder.encoders.video_encoder import VideoEncoder
+
+logger = logging.getLogger(__name__)
+
+
+def get_ffmpeg_executable_path() -> str:
+    return shutil.which("ffmpeg")
+
+
+class FFmpegPipeVideoEncoder(VideoEncoder):
+    """Streams raw BGR frames into an `ffmpeg` subprocess, which needs to be on the PATH"""
+
+    def _open(self):
+        ffmpeg_executable_path = get_ffmpeg_executable_path()
+        if ffmpeg_executable_path is None:
+            raise FileNotFoundError("Could not find an `ffmpeg` executable on the PATH")
+
+        command = [
+            ffmpeg_executable_path,
+            "-y",
+            "-loglevel", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", "bgr24",
+            "-s", f"{self._image_width}x{self._image_height}",
+            "-r", f"{self._frames_per_second}",
+            "-i", "-",
+            "-c:v", self._config.codec,
+            "-pix_fmt", self._config.pixel_format,
+            "-threads", str(self._config.threads),
+        ]
+        if self._config.preset is not None:
+            command.extend(["-preset", self._config.preset])
+        if self._config.crf is not None:
+            command.extend(["-crf", str(self._config.crf)])
+        command.append(str(self._path_to_save_video_file))
+
+        logger.debug(f"Starting ffmpeg - {' '.join(command)}")
+        self._ffmpeg_process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def _write_image(self, image: np.ndarray):
+        self._ffmpeg_process.stdin.write(np.ascontiguousarray(image).data)
+
+    def _close(self):
+        self._ffmpeg_process.stdin.close()
+        return_code = self._ffmpeg_process.wait()
+        if return_code != 0:
+            raise Exception(f"ffmpeg exited with code {return_code} while writing {self._path_to_save_video_file}")
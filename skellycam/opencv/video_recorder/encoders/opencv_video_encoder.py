@@ -0,0 +1,30 @@
+import logging
+
+import cv2
+import numpy as np
+
+from skellycam.opencv.video_recorder.encoders.video_encoder import VideoEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class OpenCVVideoEncoder(VideoEncoder):
+    def _open(self):
+        self._cv2_video_writer = cv2.VideoWriter(
+            str(self._path_to_save_video_file),
+            cv2.VideoWriter_fourcc(*self._config.codec),
+            self._frames_per_second,
+            (self._image_width, self._image_height),
+        )
+
+        if not self._cv2_video_writer.isOpened():
+            logger.error(
+                f"cv2.VideoWriter failed to initialize for: {str(self._path_to_save_video_file)}"
+            )
+            raise Exception("cv2.VideoWriter is not open")
+
+    def _write_image(self, image: np.ndarray):
+        self._cv2_video_writer.write(image)
+
+    def _close(self):
+        self._cv2_video_writer.release()
@@ -0,0 +1,47 @@
+import logging
+from fractions import Fraction
+
+import numpy as np
+
+from skellycam.opencv.video_recorder.encoders.video_encoder import VideoEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class PyAVVideoEncoder(VideoEncoder):
+    """Encodes in-process through `av` (PyAV, ffmpeg's libraries) - install with `pip install av`"""
+
+    def _open(self):
+        # opportunistic import - PyAV is an optional dependency
+        import av
+
+        self._container = av.open(str(self._path_to_save_video_file), mode="w")
+        self._stream = self._container.add_stream(
+            self._config.codec,
+            rate=Fraction(self._frames_per_second).limit_denominator(1001),
+        )
+        self._stream.width = self._image_width
+        self._stream.height = self._image_height
+        self._stream.pix_fmt = self._config.pixel_format
+        self._stream.thread_count = self._config.threads
+
+        options = {}
+        if self._config.preset is not None:
+            options["preset"] = self._config.preset
+        if self._config.crf is not None:
+            options["crf"] = str(self._config.crf)
+        self._stream.options = options
+
+    def _write_image(self, image: np.ndarray):
+        import av
+
+        video_frame = av.VideoFrame.from_ndarray(image, format="bgr24")
+        for packet in self._stream.encode(video_frame):
+            self._container.mux(packet)
+
+    def _close(self):
+        try:
+            for packet in self._stream.encode(None):  # flush the encoder
+                self._container.mux(packet)
+        finally:
+            self._container.close()
@@ -0,0 +1,88 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from skellycam.opencv.video_recorder.models.video_encoder_config import VideoEncoderConfig
+
+logger = logging.getLogger(__name__)
+
+
+class VideoEncoder(ABC):
+    """
+    Base class for the video encoder backends - subclasses only need to know how to open, write to and close
+    their writer, the bookkeeping (frame count and encode speed) happens here.
+    """
+
+    def __init__(
+            self,
+            config: VideoEncoderConfig,
+            path_to_save_video_file: Union[str, Path],
+            image_width: int,
+            image_height: int,
+            frames_per_second: float,
+    ):
+        self._config = config
+        self._path_to_save_video_file = Path(path_to_save_video_file)
+        self._image_width = int(image_width)
+        self._image_height = int(image_height)
+        self._frames_per_second = float(frames_per_second)
+
+        self._number_of_frames_written = 0
+        self._start_time_ns = time.perf_counter_ns()
+        self._end_time_ns = None
+        self._is_open = False
+
+        self._open()
+        self._is_open = True
+
+    @property
+    def config(self) -> VideoEncoderConfig:
+        return self._config
+
+    @property
+    def path_to_save_video_file(self) -> Path:
+        return self._path_to_save_video_file
+
+    @property
+    def number_of_frames_written(self) -> int:
+        return self._number_of_frames_written
+
+    @property
+    def encode_frames_per_second(self) -> float:
+        """Frames encoded per second of wall time, from opening the encoder until it was closed (or until now)"""
+        end_time_ns = self._end_time_ns if self._end_time_ns is not None else time.perf_counter_ns()
+        elapsed_seconds = (end_time_ns - self._start_time_ns) / 1e9
+        if elapsed_seconds <= 0:
+            return 0.0
+        return self._number_of_frames_written / elapsed_seconds
+
+    def write_image(self, image: np.ndarray):
+        self._write_image(image)
+        self._number_of_frames_written += 1
+
+    def close(self):
+        if not self._is_open:
+            return
+        self._is_open = False
+        self._close()
+        self._end_time_ns = time.perf_counter_ns()
+        logger.info(
+            f"{self.__class__.__name__} ({self._config.codec}) wrote {self._number_of_frames_written} frames "
+            f"to {self._path_to_save_video_file} at {self.encode_frames_per_second:.1f} frames per second"
+        )
+
+    @abstractmethod
+    def _open(self):
+        pass
+
+    @abstractmethod
+    def _write_image(self, image: np.ndarray):
+        pass
+
+    @abstractmethod
+    def _close(self):
+        pass
@@ -0,0 +1,26 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class CalibrationFrameSelectionConfig(BaseModel):
+    """
+    Record only the synchronized frame sets that are worth calibrating with - those where the charuco board is seen by
+    enough cameras and that show it in a new part of the image or in a new pose (see `CalibrationFrameSelector`)
+    """
+
+    min_number_of_cameras: int = 2
+    min_number_of_corners: int = 6  # for a camera to count as seeing the board
+    # each camera's image is split into a grid of cells - a cell needs this many views of corners to be covered
+    coverage_grid_width: int = 8
+    coverage_grid_height: int = 6
+    max_number_of_views_per_grid_cell: int = 2
+    # board poses are binned by in-image rotation, apparent size and tilt
+    number_of_rotation_bins: int = 8
+    max_number_of_views_per_pose_bin: int = 2
+    min_seconds_between_frame_sets: float = 0.2
+    max_number_of_frame_sets: int = 300
+    # a frame set is only formed from frames taken (nearly) at the same time
+    max_timestamp_spread_ms: float = 25.0
+    detection_image_width: Optional[int] = None  # downscale wider frames before detecting (full resolution if unset)
+    encode_frames_per_second: float = 10.0  # the saved videos are a slideshow of the selected frame sets
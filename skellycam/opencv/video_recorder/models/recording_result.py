@@ -0,0 +1,81 @@
+import dataclasses
+import json
+from pathlib import Path
+from typing import Dict, List, Union
+
+from skellycam.opencv.video_recorder.recording_session import RECORDING_MANIFEST_FILE_NAME
+from skellycam.opencv.video_recorder.synchronization_map import SYNCHRONIZATION_MAP_FILE_NAME, \
+    load_synchronization_map
+from skellycam.system.environment.default_paths import TIMESTAMPS_FOLDER_NAME
+
+
+@dataclasses.dataclass()
+class RecordingSegmentResult:
+    """One folder of synchronized videos - the whole recording, or one segment of a segmented recording"""
+    folder: Path
+    video_paths: Dict[str, Path]  # by camera id
+    number_of_frames: Dict[str, int]  # frames in each (synchronized) video, by camera id
+    timestamps_folder: Path
+    synchronization_map_path: Path
+
+    @classmethod
+    def from_folder(cls, folder: Union[str, Path]) -> "RecordingSegmentResult":
+        folder = Path(folder)
+        synchronization_map_path = folder / TIMESTAMPS_FOLDER_NAME / SYNCHRONIZATION_MAP_FILE_NAME
+        synchronization_map = load_synchronization_map(synchronization_map_path)
+        return cls(
+            folder=folder,
+            video_paths={camera_id: folder / camera_entry["video_file_name"]
+                         for camera_id, camera_entry in synchronization_map["cameras"].items()},
+            number_of_frames={camera_id: camera_entry["number_of_frames"]
+                              for camera_id, camera_entry in synchronization_map["cameras"].items()},
+            timestamps_folder=folder / TIMESTAMPS_FOLDER_NAME,
+            synchronization_map_path=synchronization_map_path,
+        )
+
+
+@dataclasses.dataclass()
+class RecordingResult:
+    """What a recording left on disk (see `SynchronizedRecorder`)"""
+    synchronized_videos_folder: Path
+    segments: List[RecordingSegmentResult]  # just one, unless the recording was segmented
+    frames_recorded: Dict[str, int]  # frames each camera recorded, before synchronization
+    recording_duration_seconds: float = None
+    save_duration_seconds: float = None
+    recording_manifest_path: Path = None  # segmented recordings only
+
+    @property
+    def video_paths(self) -> Dict[str, Path]:
+        """The videos, by camera id - for a segmented recording, see each of the `segments`"""
+        if len(self.segments) != 1:
+            raise ValueError(f"This recording has {len(self.segments)} segments - use `segments` to get their videos")
+        return self.segments[0].video_paths
+
+    @classmethod
+    def from_folder(cls,
+                    synchronized_videos_folder: Union[str, Path],
+                    frames_recorded: Dict[str, int] = None,
+                    recording_duration_seconds: float = None,
+                    save_duration_seconds: float = None) -> "RecordingResult":
+        synchronized_videos_folder = Path(synchronized_videos_folder)
+        recording_manifest_path = synchronized_videos_folder / RECORDING_MANIFEST_FILE_NAME
+        if recording_manifest_path.exists():
+            with open(recording_manifest_path) as file:
+                recording_manifest = json.load(file)
+            segments = [
+                RecordingSegmentResult.from_folder(synchronized_videos_folder / segment_entry["folder_name"])
+                for _, segment_entry in sorted(recording_manifest["segments"].items(), key=lambda item: int(item[0]))
+                if segment_entry.get("saved", False)
+            ]
+        else:
+            recording_manifest_path = None
+            segments = [RecordingSegmentResult.from_folder(synchronized_videos_folder)]
+
+        return cls(
+            synchronized_videos_folder=synchronized_videos_folder,
+            segments=segments,
+            frames_recorded=frames_recorded or {},
+            recording_duration_seconds=recording_duration_seconds,
+            save_duration_seconds=save_duration_seconds,
+            recording_manifest_path=recording_manifest_path,
+        )
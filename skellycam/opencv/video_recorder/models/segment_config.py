@@ -0,0 +1,19 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SegmentConfig(BaseModel):
+    """
+    Split a recording into segments, each saved (synchronized and encoded) as soon as every camera has moved on to
+    the next one. Set one of `segment_duration_seconds`/`segment_number_of_frames` - with neither set, the whole
+    recording is a single segment that is saved when the recording stops.
+    """
+
+    segment_duration_seconds: Optional[float] = None
+    segment_number_of_frames: Optional[int] = None  # per camera - the first camera to get there ends the segment
+    max_number_of_segments_saving_at_once: int = 2
+
+    @property
+    def is_segmented(self) -> bool:
+        return self.segment_duration_seconds is not None or self.segment_number_of_frames is not None
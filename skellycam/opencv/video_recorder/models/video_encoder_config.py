@@ -0,0 +1,59 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class VideoEncoderBackend(str, Enum):
+    OPENCV = "opencv"
+    PYAV = "pyav"
+    FFMPEG_PIPE = "ffmpeg_pipe"
+
+
+class VideoEncoderConfig(BaseModel):
+    backend: VideoEncoderBackend = VideoEncoderBackend.OPENCV
+    codec: str = "mp4v"  # fourcc for the `opencv` backend, ffmpeg encoder name (`libx264`, `libx265`, `ffv1`...) otherwise
+    file_extension: str = ".mp4"
+    preset: Optional[str] = None  # ffmpeg backends only, e.g. `ultrafast`, `medium`, `slow`
+    crf: Optional[int] = None  # ffmpeg backends only, lower is better quality/bigger files
+    threads: int = 0  # ffmpeg backends only, 0 lets the encoder decide
+    pixel_format: str = "yuv420p"  # ffmpeg backends only
+
+
+def opencv_mp4v() -> VideoEncoderConfig:
+    return VideoEncoderConfig()
+
+
+def h264_fast_and_big() -> VideoEncoderConfig:
+    return VideoEncoderConfig(
+        backend=VideoEncoderBackend.PYAV,
+        codec="libx264",
+        preset="ultrafast",
+        crf=17,
+    )
+
+
+def h265_slow_and_small() -> VideoEncoderConfig:
+    return VideoEncoderConfig(
+        backend=VideoEncoderBackend.PYAV,
+        codec="libx265",
+        preset="slow",
+        crf=26,
+    )
+
+
+def ffv1_lossless() -> VideoEncoderConfig:
+    return VideoEncoderConfig(
+        backend=VideoEncoderBackend.PYAV,
+        codec="ffv1",
+        file_extension=".mkv",
+        pixel_format="yuv444p",
+    )
+
+
+VIDEO_ENCODER_PRESETS = {
+    "OpenCV mp4v (default)": opencv_mp4v,
+    "H.264 - fast and big": h264_fast_and_big,
+    "H.265 - slow and small": h265_slow_and_small,
+    "FFV1 - lossless archive": ffv1_lossless,
+}
@@ -0,0 +1,306 @@
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Union
+
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.diagnostics.recording_diagnostics import launch_recording_diagnostics_process
+from skellycam.opencv.video_recorder.dropped_frames_summary import DROPPED_FRAMES_SUMMARY_FILE_NAME, \
+    save_dropped_frames_summary
+from skellycam.opencv.video_recorder.models.segment_config import SegmentConfig
+from skellycam.opencv.video_recorder.models.video_encoder_config import VideoEncoderConfig
+from skellycam.opencv.video_recorder.save_synchronized_videos import save_synchronized_videos
+from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+from skellycam.system.environment.default_paths import RAW_TIMESTAMPS_FOLDER_NAME, TIMESTAMPS_FOLDER_NAME
+
+logger = logging.getLogger(__name__)
+
+RECORDING_MANIFEST_FILE_NAME = "recording_manifest.json"
+
+
+class RecordingSession:
+    """
+    Owns the frames of a single recording, via one `VideoRecorder` per camera.
+
+    When a recording stops, the whole session object is handed over to the save pipeline (nothing is copied)
+    and the owner simply creates a new, empty `RecordingSession` for the next recording.
+
+    With a segmented `SegmentConfig`, the recording is split into segments that share the same boundary timestamps
+    across cameras. As soon as every camera has moved past a segment, that segment is synchronized and encoded (into
+    its own `segment_###` folder) on a background thread pool while the recording continues, and a
+    `recording_manifest.json` listing the saved segments is rewritten - so a crash costs at most the unsaved segments.
+
+    So the folder of a segmented recording doesn't hold any videos itself, it holds:
+
+        recording_manifest.json
+        timestamps/                  (raw timestamp logs of the whole recording, and its dropped frames summary)
+        segment_000/                 (a synchronized videos folder of its own - videos, timestamps, diagnostics)
+        segment_001/
+        ...
+
+    `saved_video_folders` lists the folders that hold the videos, either way.
+    """
+
+    def __init__(self,
+                 camera_ids: List[str],
+                 video_encoder_config: VideoEncoderConfig = None,
+                 segment_config: SegmentConfig = None):
+        if video_encoder_config is None:
+            video_encoder_config = VideoEncoderConfig()
+        if segment_config is None:
+            segment_config = SegmentConfig()
+        self._video_encoder_config = video_encoder_config
+        self._segment_config = segment_config
+        self._video_recorder_dictionary: Dict[str, VideoRecorder] = {
+            camera_id: VideoRecorder(video_encoder_config=video_encoder_config) for camera_id in camera_ids
+        }
+        self._folder_to_save_videos: Union[Path, None] = None
+
+        # segment `k` holds the frames with timestamps before `self._segment_end_timestamps_ns[k]`
+        self._segment_end_timestamps_ns: List[int] = []
+        self._recording_start_timestamp_ns = None
+        self._finished_segment_video_recorders: Dict[int, Dict[str, VideoRecorder]] = {}
+        self._segment_save_futures: List[Future] = []
+        self._segment_save_executor = None
+        self._manifest_lock = threading.Lock()
+        self._manifest = {
+            "camera_ids": self.camera_ids,
+            "video_encoder_config": self._video_encoder_config.dict(),
+            "segment_config": self._segment_config.dict(),
+            "recording_finished": False,
+            "segments": {},
+        }
+
+    @property
+    def camera_ids(self) -> List[str]:
+        return list(self._video_recorder_dictionary.keys())
+
+    @property
+    def video_encoder_config(self) -> VideoEncoderConfig:
+        return self._video_encoder_config
+
+    @property
+    def segment_config(self) -> SegmentConfig:
+        return self._segment_config
+
+    @property
+    def folder_to_save_videos(self) -> Union[Path, None]:
+        return self._folder_to_save_videos
+
+    @property
+    def saved_video_folders(self) -> List[Path]:
+        """The folders the videos were saved to - the segment folders of a segmented recording, in order"""
+        if self._folder_to_save_videos is None:
+            return []
+        if not self._segment_config.is_segmented:
+            return [self._folder_to_save_videos]
+        with self._manifest_lock:
+            return [self._folder_to_save_videos / segment_entry["folder_name"]
+                    for _, segment_entry in sorted(self._manifest["segments"].items(), key=lambda item: int(item[0]))
+                    if segment_entry.get("saved", False)]
+
+    @property
+    def video_recorder_dictionary(self) -> Dict[str, VideoRecorder]:
+        return self._video_recorder_dictionary
+
+    @property
+    def video_recorders_with_frames(self) -> Dict[str, VideoRecorder]:
+        return {
+            camera_id: video_recorder
+            for camera_id, video_recorder in self._video_recorder_dictionary.items()
+            if video_recorder.number_of_frames > 0
+        }
+
+    @property
+    def number_of_frames(self) -> Dict[str, int]:
+        """Frames recorded so far by each camera (including those in segments that have already been handed off)"""
+        return {
+            camera_id: video_recorder.timestamp_log.number_of_rows
+            for camera_id, video_recorder in self._video_recorder_dictionary.items()
+        }
+
+    @property
+    def number_of_bytes(self) -> int:
+        return sum(video_recorder.number_of_bytes for video_recorder in self._video_recorder_dictionary.values())
+
+    def append_frame_payload(self, camera_id: str, frame_payload: FramePayload):
+        if self._segment_config.is_segmented:
+            self._finish_segments_that_end_before(camera_id=camera_id, timestamp_ns=frame_payload.timestamp_ns)
+        self._video_recorder_dictionary[camera_id].append_frame_payload_to_list(frame_payload)
+
+    def set_folder_to_save_videos(self, folder_to_save_videos: Union[str, Path]):
+        """
+        Where the videos of this recording go - needs to be set before the first frame of a segmented recording.
+        Also starts streaming the raw timestamp logs to disk
+        """
+        self._folder_to_save_videos = Path(folder_to_save_videos)
+        self.flush_timestamps_to_folder(self._folder_to_save_videos / TIMESTAMPS_FOLDER_NAME / RAW_TIMESTAMPS_FOLDER_NAME)
+
+    def flush_timestamps_to_folder(self, timestamps_folder_path: Union[str, Path]):
+        """
+        Stream each camera's raw (unsynchronized) timestamp log to disk while recording, so it survives a crash
+        """
+        for camera_id, video_recorder in self._video_recorder_dictionary.items():
+            video_recorder.timestamp_log.set_flush_file_path(
+                Path(timestamps_folder_path) / f"Camera_{str(camera_id).zfill(3)}_raw_timestamp_log.bin"
+            )
+
+    def save(self, folder_to_save_videos: Union[str, Path] = None, create_diagnostic_plots_bool: bool = True):
+        """Save the (rest of the) recording - the frames are released as they are written"""
+        if folder_to_save_videos is None:
+            folder_to_save_videos = self._folder_to_save_videos
+
+        if self._segment_config.is_segmented:
+            # the earlier segments have been saving in the background all along - just the final one is left
+            self.finish_segmented_recording()
+            if create_diagnostic_plots_bool and self.saved_video_folders:
+                # (one process, for all the segments - the plots aren't opened, there would be one set per segment)
+                launch_recording_diagnostics_process(
+                    synchronized_videos_folder_path=self.saved_video_folders,
+                    video_file_extension=self._video_encoder_config.file_extension,
+                    open_plots_after_saving=False,
+                )
+        else:
+            # frames are released camera-by-camera as each video is written
+            save_synchronized_videos(
+                dictionary_of_video_recorders=self.video_recorders_with_frames,
+                folder_to_save_videos=folder_to_save_videos,
+                create_diagnostic_plots_bool=create_diagnostic_plots_bool,
+                video_encoder_config=self._video_encoder_config,
+            )
+
+    def finish_segmented_recording(self):
+        """
+        Hand off the last (partial) segment of every camera, then wait for all the segments to finish saving
+        """
+        final_segment_index = max(
+            video_recorder.segment_index for video_recorder in self._video_recorder_dictionary.values()
+        )
+        for camera_id, video_recorder in self._video_recorder_dictionary.items():
+            video_recorder.timestamp_log.flush()
+            while video_recorder.segment_index <= final_segment_index:
+                self._finish_segment(camera_id)
+
+        wait(self._segment_save_futures)
+        if self._segment_save_executor is not None:
+            self._segment_save_executor.shutdown(wait=True)
+
+        save_dropped_frames_summary(
+            timestamp_log_array_dictionary={
+                camera_id: video_recorder.timestamp_log.to_array()
+                for camera_id, video_recorder in self._video_recorder_dictionary.items()
+            },
+            path_to_save_json=self._folder_to_save_videos / TIMESTAMPS_FOLDER_NAME / DROPPED_FRAMES_SUMMARY_FILE_NAME,
+        )
+
+        with self._manifest_lock:
+            self._manifest["recording_finished"] = True
+            self._write_manifest()
+        logger.info(f"Finished saving {len(self._manifest['segments'])} segments to {self._folder_to_save_videos}")
+
+    def _finish_segments_that_end_before(self, camera_id: str, timestamp_ns: int):
+        video_recorder = self._video_recorder_dictionary[camera_id]
+
+        if self._recording_start_timestamp_ns is None:
+            self._recording_start_timestamp_ns = timestamp_ns
+
+        if self._segment_config.segment_duration_seconds is not None:
+            segment_duration_ns = int(self._segment_config.segment_duration_seconds * 1e9)
+            while len(self._segment_end_timestamps_ns) <= video_recorder.segment_index:
+                self._segment_end_timestamps_ns.append(
+                    self._recording_start_timestamp_ns + (len(self._segment_end_timestamps_ns) + 1) * segment_duration_ns
+                )
+        elif (len(self._segment_end_timestamps_ns) == video_recorder.segment_index
+              and video_recorder.number_of_frames >= self._segment_config.segment_number_of_frames):
+            # the first camera to fill up the current segment decides where it ends for every camera
+            self._segment_end_timestamps_ns.append(timestamp_ns)
+
+        # (a camera that stalled can skip over whole segments)
+        while (video_recorder.segment_index < len(self._segment_end_timestamps_ns)
+               and timestamp_ns >= self._segment_end_timestamps_ns[video_recorder.segment_index]):
+            self._finish_segment(camera_id)
+
+    def _finish_segment(self, camera_id: str):
+        segment_index = self._video_recorder_dictionary[camera_id].segment_index
+        segment_video_recorder = self._video_recorder_dictionary[camera_id].start_new_segment()
+
+        segment_video_recorders = self._finished_segment_video_recorders.setdefault(segment_index, {})
+        segment_video_recorders[camera_id] = segment_video_recorder
+        if len(segment_video_recorders) == len(self._video_recorder_dictionary):
+            self._submit_segment(segment_index, self._finished_segment_video_recorders.pop(segment_index))
+
+    def _submit_segment(self, segment_index: int, segment_video_recorders: Dict[str, VideoRecorder]):
+        if self._folder_to_save_videos is None:
+            raise Exception("`set_folder_to_save_videos` needs to be called before recording a segmented recording")
+
+        segment_video_recorders = {
+            camera_id: video_recorder
+            for camera_id, video_recorder in segment_video_recorders.items()
+            if video_recorder.number_of_frames > 0
+        }
+        if len(segment_video_recorders) < len(self._video_recorder_dictionary):
+            logger.warning(f"Segment {segment_index} only has frames from cameras {list(segment_video_recorders.keys())}")
+        if len(segment_video_recorders) == 0:
+            return
+
+        segment_folder_path = self._folder_to_save_videos / f"segment_{str(segment_index).zfill(3)}"
+        for camera_id, video_recorder in segment_video_recorders.items():
+            video_recorder.timestamp_log.set_flush_file_path(
+                segment_folder_path / TIMESTAMPS_FOLDER_NAME / RAW_TIMESTAMPS_FOLDER_NAME
+                / f"Camera_{str(camera_id).zfill(3)}_raw_timestamp_log.bin"
+            )
+
+        if self._segment_save_executor is None:
+            self._segment_save_executor = ThreadPoolExecutor(
+                max_workers=self._segment_config.max_number_of_segments_saving_at_once,
+                thread_name_prefix="segment_save",
+            )
+        logger.info(f"Handing off segment {segment_index} to be saved in {segment_folder_path}")
+        self._segment_save_futures.append(
+            self._segment_save_executor.submit(self._save_segment,
+                                               segment_index,
+                                               segment_video_recorders,
+                                               segment_folder_path)
+        )
+
+    def _save_segment(self,
+                      segment_index: int,
+                      segment_video_recorders: Dict[str, VideoRecorder],
+                      segment_folder_path: Path):
+        segment_manifest_entry = {
+            "folder_name": segment_folder_path.name,
+            "camera_ids": list(segment_video_recorders.keys()),
+            "number_of_raw_frames": {
+                camera_id: video_recorder.number_of_frames
+                for camera_id, video_recorder in segment_video_recorders.items()
+            },
+            "first_timestamp_ns": min(int(video_recorder.timestamps[0])
+                                      for video_recorder in segment_video_recorders.values()),
+            "last_timestamp_ns": max(int(video_recorder.timestamps[-1])
+                                     for video_recorder in segment_video_recorders.values()),
+        }
+        try:
+            save_synchronized_videos(
+                dictionary_of_video_recorders=segment_video_recorders,
+                folder_to_save_videos=segment_folder_path,
+                create_diagnostic_plots_bool=False,  # (they're made for all the segments at once - see `save`)
+                video_encoder_config=self._video_encoder_config,
+            )
+            segment_manifest_entry["saved"] = True
+        except Exception as e:
+            logger.error(f"Failed to save segment {segment_index} to {segment_folder_path}: {e}")
+            logger.exception(e)
+            segment_manifest_entry["saved"] = False
+
+        with self._manifest_lock:
+            self._manifest["segments"][str(segment_index)] = segment_manifest_entry
+            self._write_manifest()
+
+    def _write_manifest(self):
+        path_to_manifest = self._folder_to_save_videos / RECORDING_MANIFEST_FILE_NAME
+        path_to_manifest.parent.mkdir(parents=True, exist_ok=True)
+        with open(path_to_manifest, "w") as file:
+            json.dump(self._manifest, file, indent=4)
+        logger.debug(f"Updated recording manifest: {str(path_to_manifest)}")
@@ -1,13 +1,19 @@
 import logging
 import platform
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 import numpy as np
 
 from skellycam.detection.models.frame_payload import FramePayload
-from skellycam.diagnostics.create_diagnostic_plots import create_diagnostic_plots
+from skellycam.diagnostics.recording_diagnostics import launch_recording_diagnostics_process
+from skellycam.opencv.video_recorder.dropped_frames_summary import DROPPED_FRAMES_SUMMARY_FILE_NAME, \
+    save_dropped_frames_summary
+from skellycam.opencv.video_recorder.models.video_encoder_config import VideoEncoderConfig
+from skellycam.opencv.video_recorder.synchronization_map import SYNCHRONIZATION_MAP_FILE_NAME, \
+    load_synchronization_map, save_synchronization_map
 from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+from skellycam.system.environment.default_paths import RAW_TIMESTAMPS_FOLDER_NAME, TIMESTAMPS_FOLDER_NAME
 from skellycam.tests.test_frame_timestamp_synchronization import test_frame_timestamp_synchronization
 from skellycam.tests.test_synchronized_video_frame_counts import test_synchronized_video_frame_counts
 
@@ -18,15 +24,108 @@ def save_synchronized_videos(
         dictionary_of_video_recorders: Dict[str, VideoRecorder],
         folder_to_save_videos: Union[str, Path],
         create_diagnostic_plots_bool: bool = True,
+        video_encoder_config: VideoEncoderConfig = None,
 ):
+    """
+    NOTE - the frames are moved out of the `VideoRecorder`s (not copied) and released as soon as each camera's video
+    has been written, so the recorders will be empty once this function returns
+    """
     logger.info(f"Saving synchronized videos to folder: {str(folder_to_save_videos)}")
 
+    if video_encoder_config is None:
+        video_encoder_config = VideoEncoderConfig()
+
+    # the raw timestamp logs are usually streamed to disk during the recording already, if not write them out now
+    for camera_id, video_recorder in dictionary_of_video_recorders.items():
+        if video_recorder.timestamp_log.flush_file_path is None:
+            video_recorder.timestamp_log.set_flush_file_path(
+                Path(folder_to_save_videos) / TIMESTAMPS_FOLDER_NAME / RAW_TIMESTAMPS_FOLDER_NAME
+                / f"Camera_{str(camera_id).zfill(3)}_raw_timestamp_log.bin"
+            )
+        video_recorder.timestamp_log.flush()
+
+    save_dropped_frames_summary(
+        timestamp_log_array_dictionary={
+            camera_id: video_recorder.timestamp_log.to_array()
+            for camera_id, video_recorder in dictionary_of_video_recorders.items()
+        },
+        path_to_save_json=Path(folder_to_save_videos) / TIMESTAMPS_FOLDER_NAME / DROPPED_FRAMES_SUMMARY_FILE_NAME,
+    )
+    synchronized_frame_list_dictionary, synchronized_frame_indices_dictionary = \
+        create_synchronized_frame_list_dictionary(dictionary_of_video_recorders=dictionary_of_video_recorders)
+
+    test_frame_timestamp_synchronization(synchronized_frame_list_dictionary=synchronized_frame_list_dictionary)
+
+    number_of_bytes_held = sum(
+        get_number_of_bytes(frame_list) for frame_list in synchronized_frame_list_dictionary.values()
+    )
+    video_file_names_dictionary = {
+        camera_id: f"Camera_{str(camera_id).zfill(3)}_synchronized{video_encoder_config.file_extension}"
+        for camera_id in synchronized_frame_list_dictionary.keys()
+    }
+
+    Path(folder_to_save_videos).mkdir(parents=True, exist_ok=True)
+    synchronization_map_path = Path(folder_to_save_videos) / TIMESTAMPS_FOLDER_NAME / SYNCHRONIZATION_MAP_FILE_NAME
+    save_synchronization_map(
+        synchronized_frame_indices_dictionary=synchronized_frame_indices_dictionary,
+        video_file_names_dictionary=video_file_names_dictionary,
+        path_to_save_json=synchronization_map_path,
+    )
+
+    for camera_id in list(synchronized_frame_list_dictionary.keys()):
+        frame_list = synchronized_frame_list_dictionary.pop(camera_id)
+        logger.info(
+            f" Saving camera {camera_id} video with {len(frame_list)} frames..."
+        )
+        video_recorder = VideoRecorder(video_encoder_config=video_encoder_config)
+        video_recorder.save_frame_list_to_video_file(
+            frame_payload_list=frame_list,
+            video_file_save_path=Path(folder_to_save_videos) / video_file_names_dictionary[camera_id],
+        )
+        logger.info(f"Camera {camera_id} video encoded at {video_recorder.encode_frames_per_second:.1f} frames per second")
+
+        # let go of this camera's frames
+        number_of_bytes_released = get_number_of_bytes(frame_list)
+        number_of_bytes_held -= number_of_bytes_released
+        del frame_list
+        logger.info(
+            f"Released {number_of_bytes_released / 1e6:.1f} MB of frames from camera {camera_id} - "
+            f"{number_of_bytes_held / 1e6:.1f} MB still held for this recording"
+        )
+
+    test_synchronized_video_frame_counts(video_folder_path=folder_to_save_videos,
+                                         video_file_extension=video_encoder_config.file_extension,
+                                         synchronization_map=load_synchronization_map(synchronization_map_path))
+
+    if create_diagnostic_plots_bool:
+        # built from what's on disk now, in a separate low priority process - saving is done as far as we're concerned
+        if not platform.system() == "Windows":
+            logger.info("Non-Windows system detected, diagnostic plots for webcams will be saved but not displayed")
+        launch_recording_diagnostics_process(
+            synchronized_videos_folder_path=folder_to_save_videos,
+            video_file_extension=video_encoder_config.file_extension,
+            open_plots_after_saving=platform.system() == "Windows",
+        )
+
+    logger.info(f"Done!")
+
+
+def create_synchronized_frame_list_dictionary(
+        dictionary_of_video_recorders: Dict[str, VideoRecorder],
+) -> Tuple[Dict[str, List[FramePayload]], Dict[str, np.ndarray]]:
+    """
+    Takes ownership of the frames in each `VideoRecorder` - anything that doesn't end up in the synchronized frame
+    lists is released when this function returns.
+
+    Also returns, for each camera, the index of each synchronized frame in that camera's raw frame list
+    (i.e. the row of its raw timestamp log)
+    """
     each_cam_raw_frame_list = []
     first_frame_timestamps = []
     final_frame_timestamps = []
 
     for video_recoder in dictionary_of_video_recorders.values():
-        camera_frame_list = video_recoder.frame_payload_list
+        camera_frame_list = video_recoder.release_frame_payload_list()
         first_frame_timestamps.append(camera_frame_list[0].timestamp_ns)
         final_frame_timestamps.append(camera_frame_list[-1].timestamp_ns)
 
@@ -48,18 +147,18 @@ def save_synchronized_videos(
         f"Clipping each camera's frame list to latest first frame and earliest final frame"
     )
     each_cam_clipped_frame_list = []
-    each_cam_clipped_timestamp_list = []
+    each_cam_clipped_frame_indices = []
     for og_frame_list in each_cam_raw_frame_list:
         each_cam_clipped_frame_list.append([])
-        each_cam_clipped_timestamp_list.append([])
-        for frame in og_frame_list:
+        each_cam_clipped_frame_indices.append([])
+        for raw_frame_index, frame in enumerate(og_frame_list):
             if frame.timestamp_ns < latest_first_frame:
                 continue
             if frame.timestamp_ns > earliest_final_frame:
                 continue
 
             each_cam_clipped_frame_list[-1].append(frame)
-            each_cam_clipped_timestamp_list[-1].append(frame.timestamp_ns)
+            each_cam_clipped_frame_indices[-1].append(raw_frame_index)
 
     number_of_frames_per_camera_clipped = [len(f) for f in each_cam_clipped_frame_list]
     min_number_of_frames = np.min(number_of_frames_per_camera_clipped)
@@ -79,54 +178,44 @@ def save_synchronized_videos(
     logger.info(
         "TODO - Make a reference timestamp list based on the desired/measured framerate (while ensuring we won't throw away good frames...)"
     )
+    reference_timestamps = gather_timestamps(reference_frame_list)
     synchronized_frame_list_dictionary = {}
-    for camera_id, camera_frame_list in enumerate(each_cam_clipped_frame_list):
+    synchronized_frame_indices_dictionary = {}
+    # (keyed by the cameras' ids - not their position in the dictionary, which is only the same for cameras 0, 1, 2...)
+    for camera_index, camera_id in enumerate(dictionary_of_video_recorders.keys()):
+        camera_frame_list = each_cam_clipped_frame_list[camera_index]
         logger.info(f"Creating synchronized frame list for camera {camera_id}...")
-        cam_synchronized_frame_list = []
-        for reference_frame in reference_frame_list:
-            closest_frame = get_nearest_frame(camera_frame_list, reference_frame)
-            cam_synchronized_frame_list.append(closest_frame)
-        synchronized_frame_list_dictionary[str(camera_id)] = cam_synchronized_frame_list
-
-    test_frame_timestamp_synchronization(synchronized_frame_list_dictionary=synchronized_frame_list_dictionary)
-
-    Path(folder_to_save_videos).mkdir(parents=True, exist_ok=True)
-    for camera_id, frame_list in synchronized_frame_list_dictionary.items():
-        logger.info(
-            f" Saving camera {camera_id} video with {len(frame_list)} frames..."
+        closest_frame_indices = get_nearest_frame_indices(
+            timestamps=gather_timestamps(camera_frame_list),
+            reference_timestamps=reference_timestamps,
         )
-        VideoRecorder().save_frame_list_to_video_file(
-            frame_payload_list=frame_list,
-            video_file_save_path=Path(folder_to_save_videos)
-                                 / f"Camera_{str(camera_id).zfill(3)}_synchronized.mp4",
-        )
-
-    test_synchronized_video_frame_counts(video_folder_path=folder_to_save_videos)
+        synchronized_frame_list_dictionary[str(camera_id)] = [
+            camera_frame_list[frame_index] for frame_index in closest_frame_indices
+        ]
+        synchronized_frame_indices_dictionary[str(camera_id)] = np.asarray(
+            each_cam_clipped_frame_indices[camera_index], dtype=np.int64)[closest_frame_indices]
 
-    if not platform.system() == "Windows":
-        logger.info("Non-Windows system detected, diagnostic plots for webcams will not be displayed")
-        logger.info(f"Done!")
-        return
-        
-    if create_diagnostic_plots_bool:
-        create_diagnostic_plots(
-            video_recorder_dictionary=dictionary_of_video_recorders,
-            synchronized_frame_list_dictionary=synchronized_frame_list_dictionary,
-            folder_to_save_plots=folder_to_save_videos,
-            show_plots_bool=True,
-        )
+    return synchronized_frame_list_dictionary, synchronized_frame_indices_dictionary
 
-    logger.info(f"Done!")
 
+def get_nearest_frame_indices(timestamps: np.ndarray, reference_timestamps: np.ndarray) -> np.ndarray:
+    """
+    For each reference timestamp, the index of the closest timestamp in `timestamps` (which must be sorted,
+    ties go to the earlier frame)
+    """
+    if len(timestamps) == 1:
+        return np.zeros(len(reference_timestamps), dtype=np.int64)
 
-def get_nearest_frame(frame_list, reference_frame) -> FramePayload:
-    timestamps = gather_timestamps(frame_list)
+    later_indices = np.clip(np.searchsorted(timestamps, reference_timestamps), 1, len(timestamps) - 1)
+    earlier_indices = later_indices - 1
+    later_is_closer = (timestamps[later_indices] - reference_timestamps) < (
+            reference_timestamps - timestamps[earlier_indices])
+    return np.where(later_is_closer, later_indices, earlier_indices)
 
-    close_frame_index = np.argmin(np.abs(timestamps - reference_frame.timestamp_ns))
 
-    return frame_list[close_frame_index]
+def gather_timestamps(frame_list: List[FramePayload]) -> np.ndarray:
+    return np.fromiter((frame.timestamp_ns for frame in frame_list), dtype=np.int64, count=len(frame_list))
 
 
-def gather_timestamps(frame_list: List[FramePayload]) -> np.ndarray:
-    timestamps = [frame.timestamp_ns for frame in frame_list]
-    return np.array(timestamps)
+def get_number_of_bytes(frame_list: List[FramePayload]) -> int:
+    return sum(frame.image.nbytes for frame in frame_list if frame.image is not None)
@@ -0,0 +1,49 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SYNCHRONIZATION_MAP_FILE_NAME = "synchronization_map.json"
+
+
+def save_synchronization_map(
+        synchronized_frame_indices_dictionary: Dict[str, np.ndarray],
+        video_file_names_dictionary: Dict[str, str],
+        path_to_save_json: Union[str, Path],
+):
+    """
+    Record which raw frame (row of the camera's raw timestamp log) went into each frame of each synchronized video,
+    along with how many frames each video should have, so the saved videos can be checked against it later
+    """
+    synchronization_map = {
+        "cameras": {
+            camera_id: {
+                "video_file_name": video_file_names_dictionary[camera_id],
+                "number_of_frames": int(len(raw_frame_indices)),
+                "raw_frame_indices": np.asarray(raw_frame_indices).tolist(),
+            }
+            for camera_id, raw_frame_indices in synchronized_frame_indices_dictionary.items()
+        }
+    }
+
+    Path(path_to_save_json).parent.mkdir(parents=True, exist_ok=True)
+    with open(path_to_save_json, "w") as file:
+        json.dump(synchronization_map, file)
+    logger.info(f"Saved synchronization map to path: {str(path_to_save_json)}")
+
+
+def load_synchronization_map(path_to_json: Union[str, Path]) -> dict:
+    with open(path_to_json) as file:
+        return json.load(file)
+
+
+def get_expected_number_of_frames(synchronization_map: dict) -> Dict[str, int]:
+    """Video file name -> number of frames it was written with"""
+    return {
+        camera_entry["video_file_name"]: camera_entry["number_of_frames"]
+        for camera_entry in synchronization_map["cameras"].values()
+    }
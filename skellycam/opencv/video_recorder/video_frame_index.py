@@ -0,0 +1,87 @@
+import importlib.util
+import logging
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from skellycam.system.environment.default_paths import TIMESTAMPS_FOLDER_NAME
+
+logger = logging.getLogger(__name__)
+
+# one row per frame, in presentation (i.e. frame number) order
+VIDEO_FRAME_INDEX_DTYPE = np.dtype(
+    [
+        ("frame_number", np.int64),
+        ("timestamp_ns", np.int64),  # capture time of the frame (`time.perf_counter_ns()`)
+        ("pts", np.int64),  # presentation timestamp of the frame's packet, in units of the video stream's time base
+        ("byte_offset", np.int64),  # position of the frame's packet in the file, -1 if the container doesn't say
+        ("is_keyframe", np.bool_),
+    ]
+)
+
+VIDEO_FRAME_INDEX_FILE_SUFFIX = "_frame_index.npy"
+
+
+def get_video_frame_index_path(video_path: Union[str, Path]) -> Path:
+    video_path = Path(video_path)
+    return video_path.parent / TIMESTAMPS_FOLDER_NAME / f"{video_path.stem}{VIDEO_FRAME_INDEX_FILE_SUFFIX}"
+
+
+def can_create_video_frame_index() -> bool:
+    # opportunistic import - reading packet positions and keyframe flags needs PyAV
+    return importlib.util.find_spec("av") is not None
+
+
+def create_video_frame_index(video_path: Union[str, Path], timestamps_ns: np.ndarray = None) -> np.ndarray:
+    """
+    Demux (without decoding) the video's packets to find where each frame lives in the file and which frames are
+    keyframes - `timestamps_ns` are the capture times of the frames, in frame order (-1 if not given)
+    """
+    import av
+
+    with av.open(str(video_path)) as container:
+        video_stream = container.streams.video[0]
+        packet_rows = [
+            (packet.pts, packet.pos if packet.pos is not None else -1, packet.is_keyframe)
+            for packet in container.demux(video_stream)
+            if packet.size > 0 and packet.pts is not None
+        ]
+
+    # packets come out in decode order, frames are numbered in presentation order
+    packet_rows.sort(key=lambda packet_row: packet_row[0])
+
+    video_frame_index = np.empty(len(packet_rows), dtype=VIDEO_FRAME_INDEX_DTYPE)
+    video_frame_index["frame_number"] = np.arange(len(packet_rows))
+    video_frame_index["timestamp_ns"] = -1
+    if len(packet_rows) > 0:
+        video_frame_index["pts"], video_frame_index["byte_offset"], video_frame_index["is_keyframe"] = zip(*packet_rows)
+
+    if timestamps_ns is not None:
+        if len(timestamps_ns) != len(packet_rows):
+            logger.warning(f"{video_path} has {len(packet_rows)} frames but {len(timestamps_ns)} timestamps were "
+                           f"given - indexing the first {min(len(timestamps_ns), len(packet_rows))}")
+        number_of_timestamped_frames = min(len(timestamps_ns), len(packet_rows))
+        video_frame_index["timestamp_ns"][:number_of_timestamped_frames] = timestamps_ns[:number_of_timestamped_frames]
+
+    return video_frame_index
+
+
+def save_video_frame_index(video_path: Union[str, Path], timestamps_ns: np.ndarray = None) -> Union[Path, None]:
+    if not can_create_video_frame_index():
+        logger.info(f"PyAV (`pip install av`) is not installed - not creating a frame index for {video_path}")
+        return None
+
+    video_frame_index_path = get_video_frame_index_path(video_path)
+    video_frame_index_path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(str(video_frame_index_path), create_video_frame_index(video_path, timestamps_ns=timestamps_ns))
+    logger.info(f"Saved frame index to path: {str(video_frame_index_path)}")
+    return video_frame_index_path
+
+
+def load_video_frame_index(video_path: Union[str, Path]) -> Union[np.ndarray, None]:
+    """The frame index saved alongside this video, or None if there isn't one"""
+    video_frame_index_path = get_video_frame_index_path(video_path)
+    if not video_frame_index_path.exists():
+        return None
+    return np.load(str(video_frame_index_path))
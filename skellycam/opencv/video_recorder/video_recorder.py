@@ -3,69 +3,130 @@ import traceback
 from pathlib import Path
 from typing import List, Union
 
-import cv2
 import numpy as np
-import pandas as pd
 from tqdm import tqdm
 
 from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.opencv.video_recorder.camera_timestamp_log import CameraTimestampLog
+from skellycam.opencv.video_recorder.encoders.create_video_encoder import create_video_encoder
+from skellycam.opencv.video_recorder.encoders.video_encoder import VideoEncoder
+from skellycam.opencv.video_recorder.models.video_encoder_config import VideoEncoderConfig
+from skellycam.opencv.video_recorder.video_frame_index import save_video_frame_index
 
 logger = logging.getLogger(__name__)
 
 
 class VideoRecorder:
-    def __init__(self):
+    def __init__(self, video_encoder_config: VideoEncoderConfig = None):
 
-        self._cv2_video_writer = None
+        if video_encoder_config is None:
+            video_encoder_config = VideoEncoderConfig()
+        self._video_encoder_config = video_encoder_config
+        self._video_encoder: VideoEncoder = None
         self._path_to_save_video_file = None
         self._frame_payload_list: List[FramePayload] = []
-        self._timestamps_npy = np.empty(0)
+        self._number_of_bytes = 0
+        self._timestamp_log = CameraTimestampLog()
+        self._segment_index = 0
 
     @property
     def timestamps(self) -> np.ndarray:
-        return self._gather_timestamps(self._frame_payload_list)
+        return self._timestamp_log.timestamps
+
+    @property
+    def timestamp_log(self) -> CameraTimestampLog:
+        return self._timestamp_log
 
     @property
     def number_of_frames(self) -> int:
         return len(self._frame_payload_list)
 
+    @property
+    def segment_index(self) -> int:
+        """Which segment of the recording new frames go into (always 0 unless `start_new_segment` is used)"""
+        return self._segment_index
+
+    @property
+    def number_of_bytes(self) -> int:
+        """Approximate memory held by the images in the frame list"""
+        return self._number_of_bytes
+
     @property
     def frame_payload_list(self) -> List[FramePayload]:
         return self._frame_payload_list
 
+    @property
+    def video_encoder_config(self) -> VideoEncoderConfig:
+        return self._video_encoder_config
+
+    @property
+    def encode_frames_per_second(self) -> Union[float, None]:
+        """How fast the most recent video was encoded"""
+        if self._video_encoder is None:
+            return None
+        return self._video_encoder.encode_frames_per_second
+
     def close(self):
-        self._cv2_video_writer.release()
+        self._video_encoder.close()
 
     def append_frame_payload_to_list(self, frame_payload: FramePayload):
         self._frame_payload_list.append(frame_payload)
+        self._timestamp_log.append_frame_payload(frame_payload)
+        if frame_payload.image is not None:
+            self._number_of_bytes += frame_payload.image.nbytes
+
+    def release_frame_payload_list(self) -> List[FramePayload]:
+        """
+        Hand the frame list over to the caller (without copying it) and leave this recorder empty,
+        so the frames can be garbage collected as soon as the caller is done with them
+        """
+        frame_payload_list = self._frame_payload_list
+        self._frame_payload_list = []
+        self._number_of_bytes = 0
+        return frame_payload_list
+
+    def start_new_segment(self) -> "VideoRecorder":
+        """
+        Hand the frames of the current segment over to a new `VideoRecorder` (without copying them) and start the
+        next segment - the timestamp log of this recorder keeps covering the whole recording
+        """
+        segment_video_recorder = VideoRecorder(video_encoder_config=self._video_encoder_config)
+        for frame_payload in self.release_frame_payload_list():
+            segment_video_recorder.append_frame_payload_to_list(frame_payload)
+        self._segment_index += 1
+        return segment_video_recorder
 
     def save_frame_list_to_video_file(
             self,
             video_file_save_path: Union[str, Path],
             frame_payload_list: List[FramePayload],
             frames_per_second: float = None,
+            save_human_readable_timestamps: bool = False,
     ):
+        timestamp_log = CameraTimestampLog.from_frame_payload_list(frame_payload_list)
 
         if frames_per_second is None:
-            self._timestamps_npy = self._gather_timestamps(frame_payload_list)
             try:
                 frames_per_second = (
-                        np.nanmedian((np.diff(self._timestamps_npy) ** -1)) * 1e9
+                        np.nanmedian((np.diff(timestamp_log.timestamps).astype(np.float64) ** -1)) * 1e9
                 )
             except Exception as e:
                 logger.debug("Error calculating frames per second")
                 traceback.print_exc()
                 raise e
 
-        self._cv2_video_writer = self._initialize_video_writer(
+        self._video_encoder = self._initialize_video_writer(
             image_height=frame_payload_list[0].image.shape[0],
             image_width=frame_payload_list[0].image.shape[1],
             frames_per_second=frames_per_second,
             path_to_save_video_file=video_file_save_path,
         )
         self._write_frame_list_to_video_file(frame_payload_list=frame_payload_list)
-        self._save_timestamps(timestamps_npy=self._timestamps_npy, video_file_save_path=video_file_save_path)
-        self._cv2_video_writer.release()
+        self._save_timestamps(timestamp_log=timestamp_log,
+                              video_file_save_path=Path(video_file_save_path),
+                              save_human_readable_timestamps=save_human_readable_timestamps)
+        self._video_encoder.close()
+        save_video_frame_index(video_path=video_file_save_path, timestamps_ns=timestamp_log.timestamps)
 
     def save_image_list_to_disk(
             self,
@@ -78,7 +139,7 @@ class VideoRecorder:
             logging.error(f"No frames to save for : {path_to_save_video_file}")
             return
 
-        self._cv2_video_writer = self._initialize_video_writer(
+        self._video_encoder = self._initialize_video_writer(
             image_height=image_list[0].shape[0],
             image_width=image_list[0].shape[1],
             frames_per_second=frames_per_second,
@@ -92,25 +153,18 @@ class VideoRecorder:
             image_width: Union[int, float],
             path_to_save_video_file: Union[str, Path],
             frames_per_second: Union[int, float] = None,
-            fourcc: str = "mp4v",
             # calibration_videos: bool = False,
-    ) -> cv2.VideoWriter:
+    ) -> VideoEncoder:
+        self._path_to_save_video_file = path_to_save_video_file
 
-        video_writer_object = cv2.VideoWriter(
-            str(path_to_save_video_file),
-            cv2.VideoWriter_fourcc(*fourcc),
-            frames_per_second,
-            (int(image_width), int(image_height)),
+        return create_video_encoder(
+            config=self._video_encoder_config,
+            path_to_save_video_file=path_to_save_video_file,
+            image_width=image_width,
+            image_height=image_height,
+            frames_per_second=frames_per_second,
         )
 
-        if not video_writer_object.isOpened():
-            logger.error(
-                f"cv2.VideoWriter failed to initialize for: {str(path_to_save_video_file)}"
-            )
-            raise Exception("cv2.VideoWriter is not open")
-
-        return video_writer_object
-
     def _write_frame_list_to_video_file(self, frame_payload_list: List[FramePayload]):
 
         try:
@@ -122,7 +176,7 @@ class VideoRecorder:
                     unit="frames",
                     dynamic_ncols=True,
             ):
-                self._cv2_video_writer.write(frame.image)
+                self._video_encoder.write_image(frame.image)
 
         except Exception as e:
             logger.error(
@@ -132,12 +186,12 @@ class VideoRecorder:
             raise e
         finally:
             logger.info(f"Saved video to path: {self._path_to_save_video_file}")
-            self._cv2_video_writer.release()
+            self._video_encoder.close()
 
     def _write_image_list_to_video_file(self, image_list: List[np.ndarray]):
         try:
             for image in image_list:
-                self._cv2_video_writer.write(image)
+                self._video_encoder.write_image(image)
         except Exception as e:
             logger.error(
                 f"Failed during save in video writer for video {str(self._path_to_save_video_file)}"
@@ -145,20 +199,12 @@ class VideoRecorder:
             traceback.print_exc()
             raise e
         finally:
-            self._cv2_video_writer.release()
+            self._video_encoder.close()
 
-    def _gather_timestamps(self, frame_payload_list: List[FramePayload]) -> np.ndarray:
-        timestamps_npy = np.empty(0)
-        try:
-            for frame_payload in frame_payload_list:
-                timestamps_npy = np.append(timestamps_npy, frame_payload.timestamp_ns)
-        except Exception as e:
-            logger.error("Error gathering timestamps")
-            logger.error(e)
-
-        return timestamps_npy
-
-    def _save_timestamps(self, timestamps_npy: np.ndarray, video_file_save_path: Union[str, Path]):
+    def _save_timestamps(self,
+                         timestamp_log: CameraTimestampLog,
+                         video_file_save_path: Path,
+                         save_human_readable_timestamps: bool = False):
         timestamp_folder_path = video_file_save_path.parent / "timestamps"
         timestamp_folder_path.mkdir(parents=True, exist_ok=True)
 
@@ -166,15 +212,15 @@ class VideoRecorder:
             timestamp_folder_path / video_file_save_path.stem
         )
 
-        # save timestamps to npy (binary) file (via numpy.ndarray)
+        # save timestamps to npy (binary) file (int64 nanoseconds, one per frame)
         path_to_save_timestamps_npy = base_timestamp_path_str + "_binary.npy"
-        np.save(str(path_to_save_timestamps_npy), timestamps_npy)
+        np.save(str(path_to_save_timestamps_npy), timestamp_log.timestamps)
         logger.info(f"Saved timestamps to path: {str(path_to_save_timestamps_npy)}")
 
-        # save timestamps to human readable (csv/text) file (via pandas.DataFrame)
-        path_to_save_timestamps_csv = (
-                base_timestamp_path_str + "_timestamps_human_readable.csv"
-        )
-        timestamp_dataframe = pd.DataFrame(timestamps_npy)
-        timestamp_dataframe.to_csv(str(path_to_save_timestamps_csv))
-        logger.info(f"Saved timestamps to path: {str(path_to_save_timestamps_csv)}")
+        # save the full timestamp log (frame numbers and all capture-time fields) to a structured npy file
+        timestamp_log.save(base_timestamp_path_str + "_timestamp_log.npy")
+
+        # (the CSV/JSON versions are only made when asked for - from the saved log, with `load_camera_timestamp_log`
+        # and `save_timestamp_log_array_to_csv`/`_json`)
+        if save_human_readable_timestamps:
+            timestamp_log.to_csv(base_timestamp_path_str + "_timestamps_human_readable.csv")
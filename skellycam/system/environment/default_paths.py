@@ -14,6 +14,7 @@ SYNCHRONIZED_VIDEOS_FOLDER_NAME = "synchronized_videos"
 LOGS_INFO_AND_SETTINGS_FOLDER_NAME = "logs_info_and_settings"
 LOG_FILE_FOLDER_NAME = "logs"
 TIMESTAMPS_FOLDER_NAME = "timestamps"
+RAW_TIMESTAMPS_FOLDER_NAME = "raw"
 
 #Emoji strings
 RED_X_EMOJI_STRING = "\U0000274C"
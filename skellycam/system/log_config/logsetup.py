@@ -1,11 +1,43 @@
+import atexit
 import logging
 import logging.handlers
+import multiprocessing
+import multiprocessing.util
+import os
+import queue
 import sys
 from logging.config import dictConfig
-from typing import Optional
+from typing import Optional, Union
+
+from skellycam.system.log_config.rate_limit_filter import RateLimitFilter
 
 DEFAULT_LOGGING = {"version": 1, "disable_existing_loggers": False}
 
+_queue_listener: Union[logging.handlers.QueueListener, None] = None
+_rate_limit_filter: Union[RateLimitFilter, None] = None
+
+
+class _ThreadQueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts the record in the queue for the listener thread to format (the stock `QueueHandler` formats all of it right
+    away, so the record can be pickled - not needed with a queue that never leaves the process).
+
+    Only the message and the traceback are resolved here, in the thread that logged them - the arguments may change
+    (or be gone) by the time the listener gets to them
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None  # (the traceback would keep every frame's locals alive until it's written)
+        return record
+
 
 def get_logging_handlers(log_file_path: Optional[str] = ""):
     dictConfig(DEFAULT_LOGGING)
@@ -29,14 +61,90 @@ def get_logging_handlers(log_file_path: Optional[str] = ""):
     return handlers
 
 
-def configure_logging(log_file_path: Optional[str] = ""):
+def configure_logging(log_file_path: Optional[str] = "", asynchronous: bool = True):
+    """
+    Log to the console (and `log_file_path`, if given).
+
+    If `asynchronous`, logging calls just put the record in a queue - formatting and writing happen on a background
+    thread - and each line of code gets a limited number of messages per second (see `RateLimitFilter`), so logging
+    from a frame loop costs the loop next to nothing.
+    """
     print(f"Setting up skellycam logging {__file__}")
     if len(logging.getLogger().handlers) == 0:
         handlers = get_logging_handlers(log_file_path)
-        logging.getLogger("").handlers.extend(handlers)
+        if asynchronous:
+            logging.getLogger("").handlers.append(_start_queue_listener(handlers))
+        else:
+            logging.getLogger("").handlers.extend(handlers)
         logging.root.setLevel(logging.DEBUG)
         logger = logging.getLogger(__name__)
         logger.info(f"Added logging handlers: {handlers}")
     else:
         logger = logging.getLogger(__name__)
         logger.info("Logging already configured!")
+
+
+def configure_process_logging():
+    """
+    For the entry point of a child process (camera processes, diagnostics, detection workers...). A forked one
+    inherits the parent's logging, but a spawned one (the default on Windows and macOS) starts with none - it gets
+    its own, like every process did back when importing `skellycam` configured logging - asynchronous, so a camera
+    frame loop that logs on every pass goes through the queue and the rate limit in a spawned process too
+    """
+    if len(logging.getLogger().handlers) > 0:
+        return
+    from skellycam.system.environment.default_paths import get_log_file_path
+
+    configure_logging(log_file_path=get_log_file_path(), asynchronous=True)
+
+
+def get_number_of_log_messages_suppressed() -> dict:
+    """Messages dropped by the rate limit so far, by call site (`path/to/file.py:line`) - empty unless asynchronous"""
+    if _rate_limit_filter is None:
+        return {}
+    return _rate_limit_filter.number_of_messages_suppressed
+
+
+def _start_queue_listener(handlers: list) -> logging.Handler:
+    global _queue_listener, _rate_limit_filter
+
+    log_record_queue = queue.SimpleQueue()
+    _rate_limit_filter = RateLimitFilter()
+    queue_handler = _ThreadQueueHandler(log_record_queue)
+    queue_handler.addFilter(_rate_limit_filter)
+
+    _queue_listener = logging.handlers.QueueListener(log_record_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+    atexit.register(_stop_queue_listener)
+    if multiprocessing.parent_process() is not None:
+        # set up in a child process (see `configure_process_logging`) - a forked one ends with `os._exit`, which
+        # skips `atexit`
+        _stop_queue_listener_when_process_exits(queue_handler)
+    if hasattr(os, "register_at_fork"):
+        # forked camera processes inherit the queue handler, but not the thread that empties the queue
+        os.register_at_fork(after_in_child=_restart_queue_listener_after_fork)
+        # `multiprocessing` child processes end with `os._exit`, which skips `atexit` (and they clear the
+        # finalizers they inherit, hence registering one after every fork)
+        multiprocessing.util.register_after_fork(queue_handler, _stop_queue_listener_when_process_exits)
+    return queue_handler
+
+
+def _stop_queue_listener():
+    """Write out whatever is still in the queue"""
+    if _queue_listener is not None and _queue_listener._thread is not None:
+        _queue_listener.stop()
+
+
+def _stop_queue_listener_when_process_exits(queue_handler: logging.Handler):
+    multiprocessing.util.Finalize(queue_handler, _stop_queue_listener, exitpriority=0)
+
+
+def _restart_queue_listener_after_fork():
+    global _queue_listener
+    if _queue_listener is None:
+        return
+    _rate_limit_filter.reset_after_fork()
+    _queue_listener = logging.handlers.QueueListener(_queue_listener.queue,
+                                                     *_queue_listener.handlers,
+                                                     respect_handler_level=True)
+    _queue_listener.start()
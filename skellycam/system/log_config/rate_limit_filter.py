@@ -0,0 +1,66 @@
+import logging
+import threading
+import time
+from typing import Dict, Tuple
+
+# each line of code that logs gets this many messages per interval, the rest are counted and dropped
+DEFAULT_MAX_MESSAGES_PER_INTERVAL = 10
+DEFAULT_RATE_LIMIT_INTERVAL_SECONDS = 1.0
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops messages from a line of code that logs more than `max_messages_per_interval` times per interval (e.g. an
+    error logged on every pass of a frame loop), and counts the ones it drops.
+
+    The next message from that line that gets through says how many were dropped since the last one.
+    """
+
+    def __init__(self,
+                 max_messages_per_interval: int = DEFAULT_MAX_MESSAGES_PER_INTERVAL,
+                 interval_seconds: float = DEFAULT_RATE_LIMIT_INTERVAL_SECONDS):
+        super().__init__()
+        self._max_messages_per_interval = max_messages_per_interval
+        self._interval_ns = int(interval_seconds * 1e9)
+        self._lock = threading.Lock()
+
+        # by call site (file, line): [start of the current interval, messages let through in it, dropped since the
+        # last message that got through]
+        self._call_sites: Dict[Tuple[str, int], list] = {}
+        self._number_of_messages_suppressed: Dict[Tuple[str, int], int] = {}
+
+    @property
+    def number_of_messages_suppressed(self) -> Dict[str, int]:
+        """Messages dropped so far, by call site (`path/to/file.py:line`)"""
+        with self._lock:
+            return {f"{path}:{line_number}": count
+                    for (path, line_number), count in self._number_of_messages_suppressed.items()}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        call_site = (record.pathname, record.lineno)
+        now_ns = time.perf_counter_ns()
+        with self._lock:
+            call_site_state = self._call_sites.get(call_site)
+            if call_site_state is None:
+                call_site_state = self._call_sites[call_site] = [now_ns, 0, 0]
+
+            if now_ns - call_site_state[0] >= self._interval_ns:
+                call_site_state[0] = now_ns
+                call_site_state[1] = 0
+
+            if call_site_state[1] >= self._max_messages_per_interval:
+                call_site_state[2] += 1
+                number_suppressed = self._number_of_messages_suppressed.get(call_site, 0)
+                self._number_of_messages_suppressed[call_site] = number_suppressed + 1
+                return False
+
+            call_site_state[1] += 1
+            number_suppressed_since_last_message = call_site_state[2]
+            call_site_state[2] = 0
+
+        if number_suppressed_since_last_message > 0:
+            record.msg = f"{record.msg} [{number_suppressed_since_last_message} more like this suppressed]"
+        return True
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
@@ -0,0 +1,109 @@
+from typing import List
+
+import cv2
+
+import skellycam.opencv.group.strategies.grouped_process_strategy as grouped_process_strategy_module
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.config.apply_config import CAPTURE_PROPERTIES, apply_configuration
+from skellycam.opencv.group.strategies.grouped_process_strategy import GroupedProcessStrategy
+
+PROPERTY_NAMES = {property_id: field_name for field_name, property_id in CAPTURE_PROPERTIES.items()}
+
+
+class _FakeVideoCapture:
+    """Records what is set on it, and reads back what was set (or `refused_properties`' old values)"""
+
+    def __init__(self, refused_properties: List[int] = ()):
+        self.set_calls = []
+        self._properties = {}
+        self._refused_properties = refused_properties
+
+    def isOpened(self) -> bool:
+        return True
+
+    def set(self, property_id: int, value) -> bool:
+        self.set_calls.append(PROPERTY_NAMES[property_id])
+        if property_id in self._refused_properties:
+            return False
+        self._properties[property_id] = value
+        return True
+
+    def get(self, property_id: int):
+        return self._properties.get(property_id, 0)
+
+
+def test_previous_config_none_sets_everything_in_order():
+    fake_video_capture = _FakeVideoCapture()
+    config = CameraConfig(camera_id="0")
+    property_updates = apply_configuration(fake_video_capture, config)
+
+    # pixel format, then resolution, then frame rate, then exposure
+    assert fake_video_capture.set_calls == ["fourcc", "resolution_width", "resolution_height", "framerate", "exposure"]
+    assert [property_update.name for property_update in property_updates] == fake_video_capture.set_calls
+    assert all(property_update.was_applied for property_update in property_updates)
+    assert property_updates[0].read_back_value == config.fourcc
+
+
+def test_only_changed_fields_are_set_in_order():
+    previous_config = CameraConfig(camera_id="0")
+    config = CameraConfig(camera_id="0",
+                          exposure=previous_config.exposure + 1,
+                          resolution_width=previous_config.resolution_width * 2,
+                          fourcc="YUYV")
+    fake_video_capture = _FakeVideoCapture()
+    apply_configuration(fake_video_capture, config, previous_config=previous_config)
+
+    assert fake_video_capture.set_calls == ["fourcc", "resolution_width", "exposure"]
+
+
+def test_nothing_is_set_for_software_only_changes():
+    previous_config = CameraConfig(camera_id="0")
+    config = CameraConfig(camera_id="0", rotate_video_cv2_code=cv2.ROTATE_90_CLOCKWISE)
+    fake_video_capture = _FakeVideoCapture()
+
+    assert apply_configuration(fake_video_capture, config, previous_config=previous_config) == []
+    assert fake_video_capture.set_calls == []
+
+
+def test_read_back_shows_what_the_camera_refused():
+    previous_config = CameraConfig(camera_id="0")
+    config = CameraConfig(camera_id="0", framerate=60)
+    fake_video_capture = _FakeVideoCapture(refused_properties=[cv2.CAP_PROP_FPS])
+    property_updates = apply_configuration(fake_video_capture, config, previous_config=previous_config)
+
+    assert len(property_updates) == 1
+    assert property_updates[0].requested_value == 60
+    assert not property_updates[0].was_applied
+
+
+class _FakeCamGroupQueueProcess:
+    def __init__(self, camera_ids: List[str]):
+        self.camera_ids = camera_ids
+        self.camera_config_updates = []
+
+    def start_capture(self, event_dictionary, camera_config_dict):
+        pass
+
+    def update_camera_configs(self, camera_config_dictionary):
+        self.camera_config_updates.append(camera_config_dictionary)
+
+
+def test_grouped_process_strategy_only_sends_changed_configs(monkeypatch):
+    monkeypatch.setattr(grouped_process_strategy_module, "CamGroupQueueProcess", _FakeCamGroupQueueProcess)
+    camera_ids = ["0", "1", "2"]  # (two cameras per process - "0" and "1" share one)
+    camera_config_dictionary = {camera_id: CameraConfig(camera_id=camera_id) for camera_id in camera_ids}
+    grouped_process_strategy = GroupedProcessStrategy(camera_ids)
+    grouped_process_strategy.start_capture(event_dictionary={}, camera_config_dict=camera_config_dictionary)
+    first_process, second_process = grouped_process_strategy.processes
+
+    grouped_process_strategy.update_camera_configs(dict(camera_config_dictionary))
+    assert first_process.camera_config_updates == second_process.camera_config_updates == []
+
+    changed_config = CameraConfig(camera_id="1", exposure=-3)
+    grouped_process_strategy.update_camera_configs({**camera_config_dictionary, "1": changed_config})
+    assert first_process.camera_config_updates == [{"1": changed_config}]
+    assert second_process.camera_config_updates == []
+
+    # (and the same change again is nothing new)
+    grouped_process_strategy.update_camera_configs({**camera_config_dictionary, "1": changed_config})
+    assert len(first_process.camera_config_updates) == 1
@@ -0,0 +1,117 @@
+import csv
+
+import numpy as np
+
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.opencv.video_recorder.camera_timestamp_log import CameraTimestampLog, TIMESTAMP_LOG_DTYPE, \
+    load_camera_timestamp_log
+
+CHUNK_SIZE = 4
+NUMBER_OF_FRAMES = 10  # (two full chunks and a partial one)
+FIRST_TIMESTAMP_NS = 2 ** 62  # (more than a float64 holds exactly - so it has to stay int64 all the way through)
+
+
+def _frame_payload(frame_number: int) -> FramePayload:
+    return FramePayload(
+        success=frame_number != 3,
+        image=np.zeros((2, 2, 3), dtype=np.uint8),
+        timestamp_ns=FIRST_TIMESTAMP_NS + frame_number * 33_333_333 + 1,
+        number_of_frames_received=frame_number + 1,
+        camera_id="0",
+        queue_size=frame_number % 3 if frame_number != 5 else None,
+        mean_frames_per_second=30.0 if frame_number else None,
+        number_of_frames_missed=1 if frame_number == 7 else 0,
+    )
+
+
+def _expected_array(number_of_frames: int) -> np.ndarray:
+    return np.array([
+        (frame_number,
+         FIRST_TIMESTAMP_NS + frame_number * 33_333_333 + 1,
+         frame_number + 1,
+         frame_number != 3,
+         frame_number % 3 if frame_number != 5 else -1,
+         30.0 if frame_number else np.nan,
+         1 if frame_number == 7 else 0)
+        for frame_number in range(number_of_frames)
+    ], dtype=TIMESTAMP_LOG_DTYPE)
+
+
+def _assert_arrays_equal(array: np.ndarray, expected_array: np.ndarray):
+    assert array.dtype == TIMESTAMP_LOG_DTYPE
+    assert len(array) == len(expected_array)
+    for column_name in TIMESTAMP_LOG_DTYPE.names:
+        np.testing.assert_array_equal(array[column_name], expected_array[column_name])
+
+
+def test_append_across_chunk_boundaries():
+    timestamp_log = CameraTimestampLog(chunk_size=CHUNK_SIZE)
+    for frame_number in range(NUMBER_OF_FRAMES):
+        timestamp_log.append_frame_payload(_frame_payload(frame_number))
+        assert timestamp_log.number_of_rows == len(timestamp_log) == frame_number + 1
+        _assert_arrays_equal(timestamp_log.to_array(), _expected_array(frame_number + 1))
+
+    assert timestamp_log.timestamps.dtype == np.int64
+    assert timestamp_log.timestamps[-1] == FIRST_TIMESTAMP_NS + (NUMBER_OF_FRAMES - 1) * 33_333_333 + 1
+
+
+def test_full_chunks_are_flushed_as_they_fill_up(tmp_path):
+    flush_file_path = tmp_path / "timestamps" / "camera_0_timestamps.bin"
+    timestamp_log = CameraTimestampLog(flush_file_path=flush_file_path, chunk_size=CHUNK_SIZE)
+    for frame_number in range(NUMBER_OF_FRAMES):
+        timestamp_log.append_frame_payload(_frame_payload(frame_number))
+        # (only the full chunks are on disk until `flush`)
+        number_of_rows_flushed = (frame_number + 1) // CHUNK_SIZE * CHUNK_SIZE
+        _assert_arrays_equal(load_camera_timestamp_log(flush_file_path), _expected_array(number_of_rows_flushed))
+
+    timestamp_log.flush()
+    _assert_arrays_equal(load_camera_timestamp_log(flush_file_path), _expected_array(NUMBER_OF_FRAMES))
+
+    # flushing again, or after more frames, only writes the rows that aren't on disk yet
+    timestamp_log.flush()
+    timestamp_log.append_frame_payload(_frame_payload(NUMBER_OF_FRAMES))
+    timestamp_log.flush()
+    _assert_arrays_equal(load_camera_timestamp_log(flush_file_path), _expected_array(NUMBER_OF_FRAMES + 1))
+
+
+def test_setting_the_flush_file_later_writes_what_is_already_full(tmp_path):
+    timestamp_log = CameraTimestampLog(chunk_size=CHUNK_SIZE)
+    for frame_number in range(NUMBER_OF_FRAMES):
+        timestamp_log.append_frame_payload(_frame_payload(frame_number))
+
+    flush_file_path = tmp_path / "camera_0_timestamps.bin"
+    timestamp_log.set_flush_file_path(flush_file_path)
+    _assert_arrays_equal(load_camera_timestamp_log(flush_file_path), _expected_array(8))
+    timestamp_log.flush()
+    _assert_arrays_equal(load_camera_timestamp_log(flush_file_path), timestamp_log.to_array())
+
+
+def test_save_and_to_csv_round_trip(tmp_path):
+    timestamp_log = CameraTimestampLog(chunk_size=CHUNK_SIZE)
+    for frame_number in range(NUMBER_OF_FRAMES):
+        timestamp_log.append_frame_payload(_frame_payload(frame_number))
+
+    npy_path = tmp_path / "camera_0_timestamps.npy"
+    timestamp_log.save(npy_path)
+    _assert_arrays_equal(load_camera_timestamp_log(npy_path), _expected_array(NUMBER_OF_FRAMES))
+
+    csv_path = tmp_path / "camera_0_timestamps.csv"
+    timestamp_log.to_csv(csv_path)
+    with open(csv_path, newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == list(TIMESTAMP_LOG_DTYPE.names)
+    assert len(rows) == NUMBER_OF_FRAMES + 1
+    csv_array = np.array([
+        (int(frame_number), int(timestamp_ns), int(number_of_frames_received), success == "True",
+         int(queue_size), float(mean_frames_per_second), int(number_of_frames_missed))
+        for frame_number, timestamp_ns, number_of_frames_received, success, queue_size, mean_frames_per_second,
+        number_of_frames_missed in rows[1:]
+    ], dtype=TIMESTAMP_LOG_DTYPE)
+    _assert_arrays_equal(csv_array, _expected_array(NUMBER_OF_FRAMES))
+
+
+def test_from_frame_payload_list():
+    timestamp_log = CameraTimestampLog.from_frame_payload_list(
+        [_frame_payload(frame_number) for frame_number in range(NUMBER_OF_FRAMES)])
+    _assert_arrays_equal(timestamp_log.to_array(), _expected_array(NUMBER_OF_FRAMES))
+    assert len(CameraTimestampLog.from_frame_payload_list([]).to_array()) == 0
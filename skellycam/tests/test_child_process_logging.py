@@ -0,0 +1,80 @@
+import logging
+import multiprocessing
+from pathlib import Path
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.strategies.cam_group_queue_process import CamGroupQueueProcess
+from skellycam.system.environment.default_paths import DEFAULT_SKELLYCAM_BASE_FOLDER_NAME, LOG_FILE_FOLDER_NAME, \
+    LOGS_INFO_AND_SETTINGS_FOLDER_NAME
+from skellycam.system.log_config.logsetup import configure_process_logging, get_number_of_log_messages_suppressed
+from skellycam.system.log_config.rate_limit_filter import DEFAULT_MAX_MESSAGES_PER_INTERVAL, RateLimitFilter
+
+CAMERA_ID = "99"  # (no such camera - the process just has to start, log, and exit)
+NUMBER_OF_ERRORS_LOGGED = 100
+
+
+def _read_log_files(home_folder_path: Path) -> str:
+    log_folder_path = home_folder_path / DEFAULT_SKELLYCAM_BASE_FOLDER_NAME / LOGS_INFO_AND_SETTINGS_FOLDER_NAME / \
+                      LOG_FILE_FOLDER_NAME
+    return "".join(log_file_path.read_text() for log_file_path in log_folder_path.glob("*.log"))
+
+
+def _log_like_a_failing_frame_loop(result_queue: multiprocessing.Queue):
+    configure_process_logging()
+    root_handlers = logging.getLogger().handlers
+    result_queue.put([(type(handler).__name__, [type(log_filter).__name__ for log_filter in handler.filters])
+                      for handler in root_handlers])
+    logger = logging.getLogger(__name__)
+    for error_number in range(NUMBER_OF_ERRORS_LOGGED):
+        logger.error(f"frame loop error {error_number}")
+    result_queue.put(sum(get_number_of_log_messages_suppressed().values()))
+    logger.info("last message before the process exits")
+
+
+def test_spawned_camera_process_configures_its_own_logging(tmp_path, monkeypatch):
+    # a spawned process doesn't inherit the parent's logging - it writes a log file of its own, in the home folder
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    # (the default on Windows and macOS - everything, events included, has to be created with it)
+    original_start_method = multiprocessing.get_start_method()
+    multiprocessing.set_start_method("spawn", force=True)
+    try:
+        event_dictionary = {
+            "start": multiprocessing.Event(),
+            "exit": multiprocessing.Event(),
+            "frames_available": multiprocessing.Event(),
+            "full_resolution_subscribed": multiprocessing.Event(),
+            "preview_subscribed": multiprocessing.Event(),
+        }
+        event_dictionary["exit"].set()  # (so the process closes the camera right after opening it)
+
+        cam_group_queue_process = CamGroupQueueProcess([CAMERA_ID])
+        cam_group_queue_process.start_capture(event_dictionary=event_dictionary,
+                                              camera_config_dict={CAMERA_ID: CameraConfig(camera_id=CAMERA_ID)})
+        cam_group_queue_process._process.join(timeout=60)
+        assert not cam_group_queue_process.is_capturing
+    finally:
+        multiprocessing.set_start_method(original_start_method, force=True)
+
+    log_text = _read_log_files(tmp_path)
+    assert f"Starting frame loop capture in CamGroupProcess for cameras: ['{CAMERA_ID}']" in log_text
+    assert f"Closing camera {CAMERA_ID}" in log_text
+
+
+def test_spawned_process_logs_through_the_queue_with_a_rate_limit(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    spawn_context = multiprocessing.get_context("spawn")
+    result_queue = spawn_context.Queue()
+    process = spawn_context.Process(target=_log_like_a_failing_frame_loop, args=(result_queue,))
+    process.start()
+    root_handlers = result_queue.get(timeout=60)
+    number_of_messages_suppressed = result_queue.get(timeout=60)
+    process.join(timeout=60)
+
+    assert root_handlers == [("_ThreadQueueHandler", [RateLimitFilter.__name__])]
+    assert number_of_messages_suppressed == NUMBER_OF_ERRORS_LOGGED - DEFAULT_MAX_MESSAGES_PER_INTERVAL
+    log_text = _read_log_files(tmp_path)
+    assert log_text.count("frame loop error") == DEFAULT_MAX_MESSAGES_PER_INTERVAL
+    # (the queue is emptied before the process exits)
+    assert "last message before the process exits" in log_text
@@ -0,0 +1,83 @@
+from skellycam.opencv.camera.dropped_frame_detector import DroppedFrameDetector
+
+FRAMES_PER_SECOND = 30
+FRAME_INTERVAL_NS = int(1e9 / FRAMES_PER_SECOND)
+
+
+def _update_with_intervals(dropped_frame_detector: DroppedFrameDetector, interval_multiples, timestamp_ns: int = 0):
+    """Frames `interval_multiples` frame intervals apart - returns the frames missed before each one, and the time"""
+    numbers_of_frames_missed = [dropped_frame_detector.update(timestamp_ns)]
+    for interval_multiple in interval_multiples:
+        timestamp_ns += int(interval_multiple * FRAME_INTERVAL_NS)
+        numbers_of_frames_missed.append(dropped_frame_detector.update(timestamp_ns))
+    return numbers_of_frames_missed, timestamp_ns
+
+
+def test_steady_frames_drop_nothing():
+    dropped_frame_detector = DroppedFrameDetector(configured_frames_per_second=FRAMES_PER_SECOND)
+    numbers_of_frames_missed, _ = _update_with_intervals(dropped_frame_detector, [1] * 100)
+
+    assert sum(numbers_of_frames_missed) == 0
+    assert dropped_frame_detector.number_of_frames_dropped == 0
+    assert dropped_frame_detector.number_of_drop_events == 0
+
+
+def test_gaps_count_the_frames_that_fit_in_them():
+    dropped_frame_detector = DroppedFrameDetector(configured_frames_per_second=FRAMES_PER_SECOND)
+    # (half an interval late is still on time - a bit more than that is a dropped frame)
+    numbers_of_frames_missed, _ = _update_with_intervals(dropped_frame_detector, [1, 1, 3, 1, 1.4, 1, 1.6, 1])
+
+    assert numbers_of_frames_missed == [0, 0, 0, 2, 0, 0, 0, 1, 0]
+    assert dropped_frame_detector.number_of_frames_dropped == 3
+    assert dropped_frame_detector.number_of_drop_events == 2
+
+
+def test_device_frame_counter_gaps_count_when_they_say_more():
+    dropped_frame_detector = DroppedFrameDetector(configured_frames_per_second=FRAMES_PER_SECOND)
+    assert dropped_frame_detector.update(0, device_frame_number=10) == 0
+    assert dropped_frame_detector.update(FRAME_INTERVAL_NS, device_frame_number=11) == 0
+    # (on time, but the device says it made 4 frames in between)
+    assert dropped_frame_detector.update(2 * FRAME_INTERVAL_NS, device_frame_number=16) == 4
+    # (late by 3 frames, the device says 1 - the larger wins)
+    assert dropped_frame_detector.update(6 * FRAME_INTERVAL_NS, device_frame_number=18) == 3
+    # (backends without a counter report 0 or nothing - only the timing counts then)
+    assert dropped_frame_detector.update(7 * FRAME_INTERVAL_NS, device_frame_number=0) == 0
+    assert dropped_frame_detector.update(8 * FRAME_INTERVAL_NS, device_frame_number=None) == 0
+
+    assert dropped_frame_detector.number_of_frames_dropped == 7
+    assert dropped_frame_detector.number_of_drop_events == 2
+
+
+def test_skip_gap_forgets_the_previous_frame():
+    dropped_frame_detector = DroppedFrameDetector(configured_frames_per_second=FRAMES_PER_SECOND)
+    dropped_frame_detector.update(0, device_frame_number=1)
+    dropped_frame_detector.update(FRAME_INTERVAL_NS, device_frame_number=2)
+
+    dropped_frame_detector.skip_gap()  # (e.g. paused for a second)
+    assert dropped_frame_detector.update(31 * FRAME_INTERVAL_NS, device_frame_number=32) == 0
+    assert dropped_frame_detector.update(32 * FRAME_INTERVAL_NS, device_frame_number=33) == 0
+    assert dropped_frame_detector.number_of_frames_dropped == 0
+
+
+def test_a_camera_running_slower_than_configured_is_compared_against_its_own_rate():
+    dropped_frame_detector = DroppedFrameDetector(configured_frames_per_second=FRAMES_PER_SECOND)
+    numbers_of_frames_missed, timestamp_ns = _update_with_intervals(dropped_frame_detector, [2] * 3)
+    number_of_frames_dropped_while_adapting = dropped_frame_detector.number_of_frames_dropped
+    assert dropped_frame_detector.reference_interval_ns > 1.5 * FRAME_INTERVAL_NS
+
+    # (once it has seen the camera run at half the configured rate, steady frames at that rate drop nothing)
+    numbers_of_frames_missed, timestamp_ns = _update_with_intervals(dropped_frame_detector, [2] * 100, timestamp_ns)
+    assert sum(numbers_of_frames_missed) == 0
+    assert dropped_frame_detector.number_of_frames_dropped == number_of_frames_dropped_while_adapting
+
+    # (and a gap is counted in frames at that rate)
+    assert dropped_frame_detector.update(timestamp_ns + 6 * FRAME_INTERVAL_NS) == 2
+
+
+def test_changing_the_configured_frame_rate():
+    dropped_frame_detector = DroppedFrameDetector(configured_frames_per_second=FRAMES_PER_SECOND)
+    dropped_frame_detector.configured_frames_per_second = 2 * FRAMES_PER_SECOND
+
+    assert dropped_frame_detector.configured_frames_per_second == 2 * FRAMES_PER_SECOND
+    numbers_of_frames_missed, _ = _update_with_intervals(dropped_frame_detector, [0.5, 0.5, 1.5])
+    assert numbers_of_frames_missed == [0, 0, 0, 2]
@@ -0,0 +1,41 @@
+import cv2
+import numpy as np
+
+import skellycam.tests.utilities.get_number_of_frames_of_videos_in_a_folder as frame_count_module
+from skellycam.tests.utilities.get_number_of_frames_of_videos_in_a_folder import get_number_of_frames_in_video, \
+    get_number_of_frames_of_videos, get_number_of_frames_of_videos_in_a_folder
+
+NUMBER_OF_FRAMES = 12
+
+
+def _write_video(video_path, number_of_frames: int = NUMBER_OF_FRAMES):
+    video_writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+    for frame_number in range(number_of_frames):
+        video_writer.write(np.full((48, 64, 3), frame_number * 10, dtype=np.uint8))
+    video_writer.release()
+
+
+def test_no_videos():
+    assert get_number_of_frames_of_videos([]) == {}
+
+
+def test_folder_without_videos(tmp_path):
+    assert get_number_of_frames_of_videos_in_a_folder(tmp_path) is None
+
+
+def test_frame_counts_with_and_without_container_metadata(tmp_path):
+    for camera_number in range(3):
+        _write_video(tmp_path / f"Camera_00{camera_number}_synchronized.mp4")
+
+    assert get_number_of_frames_of_videos_in_a_folder(tmp_path) == [NUMBER_OF_FRAMES] * 3
+    assert set(get_number_of_frames_of_videos(sorted(tmp_path.glob("*.mp4")),
+                                              trust_container_metadata=False).values()) == {NUMBER_OF_FRAMES}
+
+
+def test_opencv_fallback_without_pyav(tmp_path, monkeypatch):
+    video_path = tmp_path / "Camera_000_synchronized.mp4"
+    _write_video(video_path)
+    monkeypatch.setattr(frame_count_module.importlib.util, "find_spec", lambda name: None)
+
+    assert get_number_of_frames_in_video(video_path) == NUMBER_OF_FRAMES
+    assert get_number_of_frames_in_video(video_path, trust_container_metadata=False) == NUMBER_OF_FRAMES
@@ -0,0 +1,45 @@
+import json
+import logging
+import subprocess
+import sys
+
+logger = logging.getLogger(__name__)
+
+# generous, so a slow CI machine doesn't fail it - importing the GUI along with the cameras took over a second
+MAX_CAMERA_IMPORT_SECONDS = 1.0
+HEAVY_MODULES = ["PySide6", "matplotlib", "pandas", "pyqtgraph", "scipy"]
+
+IMPORT_SCRIPT = f"""
+import json, logging, sys, time
+
+import cv2, numpy, pydantic  # (dependencies the cameras can't do without - not what this is timing)
+
+start_time = time.perf_counter()
+from skellycam import Camera, CameraConfig
+import skellycam.opencv.group.camera_group
+import skellycam.opencv.video_recorder.recording_session
+import_seconds = time.perf_counter() - start_time
+
+print(json.dumps({{
+    "import_seconds": import_seconds,
+    "heavy_modules_imported": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+    "number_of_root_logging_handlers": len(logging.getLogger().handlers),
+}}))
+"""
+
+
+def test_import_time():
+    """Importing the cameras (and recording) in a fresh interpreter is quick and doesn't drag in the GUI"""
+    completed_process = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT],
+                                       capture_output=True,
+                                       text=True,
+                                       check=True)
+    assert completed_process.stdout.count("\n") == 1, f"Importing skellycam printed: {completed_process.stdout}"
+    import_results = json.loads(completed_process.stdout)
+    logger.info(f"Import results: {import_results}")
+
+    assert import_results["heavy_modules_imported"] == []
+    assert import_results["number_of_root_logging_handlers"] == 0, "Importing skellycam configured logging"
+    assert import_results["import_seconds"] < MAX_CAMERA_IMPORT_SECONDS, (
+        f"Importing the cameras took {import_results['import_seconds']:.2f} seconds"
+    )
@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+
+import skellycam.opencv.video_recorder.recording_session as recording_session_module
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.opencv.video_recorder.models.segment_config import SegmentConfig
+from skellycam.opencv.video_recorder.recording_session import RECORDING_MANIFEST_FILE_NAME, RecordingSession
+from skellycam.opencv.video_recorder.synchronization_map import SYNCHRONIZATION_MAP_FILE_NAME, \
+    load_synchronization_map
+from skellycam.system.environment.default_paths import TIMESTAMPS_FOLDER_NAME
+
+CAMERA_IDS = ["2", "5"]  # (not 0, 1 - so anything keyed by position instead of id shows up)
+FRAME_INTERVAL_NS = int(1e9 / 30)
+
+
+def _record_frames(recording_session: RecordingSession, number_of_frames: int):
+    for frame_number in range(number_of_frames):
+        for camera_offset_ns, camera_id in enumerate(CAMERA_IDS):
+            recording_session.append_frame_payload(camera_id, FramePayload(
+                success=True,
+                image=np.full((48, 64, 3), frame_number % 256, dtype=np.uint8),
+                timestamp_ns=frame_number * FRAME_INTERVAL_NS + camera_offset_ns * 1000,
+                number_of_frames_received=frame_number + 1,
+                camera_id=camera_id,
+            ))
+
+
+def _load_manifest(folder_path) -> dict:
+    with open(folder_path / RECORDING_MANIFEST_FILE_NAME) as file:
+        return json.load(file)
+
+
+def test_segments_rotate_by_number_of_frames(tmp_path):
+    recording_session = RecordingSession(camera_ids=CAMERA_IDS,
+                                         segment_config=SegmentConfig(segment_number_of_frames=10))
+    recording_session.set_folder_to_save_videos(tmp_path)
+    _record_frames(recording_session, number_of_frames=25)
+    recording_session.save(create_diagnostic_plots_bool=False)
+
+    manifest = _load_manifest(tmp_path)
+    assert manifest["recording_finished"]
+    assert manifest["camera_ids"] == CAMERA_IDS
+    assert sorted(manifest["segments"].keys(), key=int) == ["0", "1", "2"]
+
+    segment_frame_counts = []
+    for segment_index, segment_entry in sorted(manifest["segments"].items(), key=lambda item: int(item[0])):
+        assert segment_entry["saved"]
+        assert segment_entry["folder_name"] == f"segment_{segment_index.zfill(3)}"
+        assert segment_entry["camera_ids"] == CAMERA_IDS
+        assert segment_entry["first_timestamp_ns"] <= segment_entry["last_timestamp_ns"]
+        segment_frame_counts.append(segment_entry["number_of_raw_frames"])
+
+        synchronization_map = load_synchronization_map(
+            tmp_path / segment_entry["folder_name"] / TIMESTAMPS_FOLDER_NAME / SYNCHRONIZATION_MAP_FILE_NAME)
+        for camera_id in CAMERA_IDS:
+            assert (tmp_path / segment_entry["folder_name"] /
+                    synchronization_map["cameras"][camera_id]["video_file_name"]).exists()
+
+    # every camera's frames end up in exactly one segment - 10, 10 and the last 5
+    assert segment_frame_counts == [{camera_id: 10 for camera_id in CAMERA_IDS},
+                                    {camera_id: 10 for camera_id in CAMERA_IDS},
+                                    {camera_id: 5 for camera_id in CAMERA_IDS}]
+    assert recording_session.saved_video_folders == [tmp_path / f"segment_{index:03d}" for index in range(3)]
+
+
+def test_segments_rotate_by_duration(tmp_path):
+    recording_session = RecordingSession(camera_ids=CAMERA_IDS,
+                                         segment_config=SegmentConfig(segment_duration_seconds=0.5))
+    recording_session.set_folder_to_save_videos(tmp_path)
+    _record_frames(recording_session, number_of_frames=40)  # 1.3 seconds at 30 fps
+    recording_session.save(create_diagnostic_plots_bool=False)
+
+    manifest = _load_manifest(tmp_path)
+    assert len(manifest["segments"]) == 3
+    segment_entries = [manifest["segments"][str(segment_index)] for segment_index in range(3)]
+    # (segments share their boundaries across cameras, every 0.5 s from the first frame)
+    for segment_index, segment_entry in enumerate(segment_entries):
+        assert segment_entry["first_timestamp_ns"] >= segment_index * 0.5e9
+        assert segment_entry["last_timestamp_ns"] < (segment_index + 1) * 0.5e9
+    assert sum(segment_entry["number_of_raw_frames"]["2"] for segment_entry in segment_entries) == 40
+
+
+def test_segmented_recording_creates_diagnostics_for_every_segment(tmp_path, monkeypatch):
+    launched_diagnostics = []
+    monkeypatch.setattr(recording_session_module, "launch_recording_diagnostics_process",
+                        lambda **kwargs: launched_diagnostics.append(kwargs))
+
+    recording_session = RecordingSession(camera_ids=CAMERA_IDS,
+                                         segment_config=SegmentConfig(segment_number_of_frames=10))
+    recording_session.set_folder_to_save_videos(tmp_path)
+    _record_frames(recording_session, number_of_frames=15)
+    recording_session.save(create_diagnostic_plots_bool=True)
+
+    assert len(launched_diagnostics) == 1
+    assert launched_diagnostics[0]["synchronized_videos_folder_path"] == [tmp_path / "segment_000",
+                                                                           tmp_path / "segment_001"]
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from skellycam.detection.models.frame_rate_statistics import FrameRateStatistics
+from skellycam.opencv.camera.rolling_frame_rate_statistics import RollingFrameRateStatistics
+
+FRAME_INTERVAL_NS = int(1e9 / 30)
+
+
+def _update_with_intervals(rolling_frame_rate_statistics: RollingFrameRateStatistics, intervals_ns,
+                           timestamp_ns: int = 0) -> int:
+    rolling_frame_rate_statistics.update(timestamp_ns)
+    for interval_ns in intervals_ns:
+        timestamp_ns += interval_ns
+        rolling_frame_rate_statistics.update(timestamp_ns)
+    return timestamp_ns
+
+
+def test_no_statistics_before_the_first_interval():
+    rolling_frame_rate_statistics = RollingFrameRateStatistics()
+    assert rolling_frame_rate_statistics.statistics == FrameRateStatistics()
+    assert rolling_frame_rate_statistics.update(0) == FrameRateStatistics()
+
+
+def test_steady_frames():
+    rolling_frame_rate_statistics = RollingFrameRateStatistics()
+    _update_with_intervals(rolling_frame_rate_statistics, [FRAME_INTERVAL_NS] * 100)
+    statistics = rolling_frame_rate_statistics.statistics
+
+    assert statistics.frames_per_second == pytest.approx(30, rel=1e-6)
+    assert statistics.frame_interval_jitter_ms == pytest.approx(0)
+    assert statistics.min_frame_interval_ms == statistics.max_frame_interval_ms == FRAME_INTERVAL_NS / 1e6
+    assert statistics.number_of_frames_dropped == 0
+
+
+def test_jitter_follows_the_spread_of_the_intervals():
+    # (alternating 3 ms either side of 33 ms - a standard deviation of 3 ms)
+    rolling_frame_rate_statistics = RollingFrameRateStatistics()
+    _update_with_intervals(rolling_frame_rate_statistics, [30_000_000, 36_000_000] * 200)
+    statistics = rolling_frame_rate_statistics.statistics
+
+    assert statistics.frames_per_second == pytest.approx(1e9 / 33_000_000, rel=0.01)
+    assert statistics.frame_interval_jitter_ms == pytest.approx(3, rel=0.05)
+
+
+def test_min_max_window_matches_a_brute_force_window():
+    window_size = 5
+    rolling_frame_rate_statistics = RollingFrameRateStatistics(window_size=window_size)
+    random_number_generator = random.Random(0)
+    intervals_ns = []
+    timestamp_ns = 0
+    rolling_frame_rate_statistics.update(timestamp_ns)
+    for _ in range(200):
+        interval_ns = random_number_generator.randint(20_000_000, 50_000_000)
+        intervals_ns.append(interval_ns)
+        timestamp_ns += interval_ns
+        statistics = rolling_frame_rate_statistics.update(timestamp_ns)
+
+        assert statistics.min_frame_interval_ms == min(intervals_ns[-window_size:]) / 1e6
+        assert statistics.max_frame_interval_ms == max(intervals_ns[-window_size:]) / 1e6
+
+
+def test_old_extremes_leave_the_window():
+    rolling_frame_rate_statistics = RollingFrameRateStatistics(window_size=5)
+    _update_with_intervals(rolling_frame_rate_statistics, [FRAME_INTERVAL_NS // 2, 3 * FRAME_INTERVAL_NS] +
+                           [FRAME_INTERVAL_NS] * 5)
+    statistics = rolling_frame_rate_statistics.statistics
+
+    assert statistics.min_frame_interval_ms == statistics.max_frame_interval_ms == FRAME_INTERVAL_NS / 1e6
+
+
+def test_dropped_frames_are_estimated_from_the_typical_interval():
+    rolling_frame_rate_statistics = RollingFrameRateStatistics()
+    timestamp_ns = _update_with_intervals(rolling_frame_rate_statistics, [FRAME_INTERVAL_NS] * 10)
+    statistics = rolling_frame_rate_statistics.update(timestamp_ns + 3 * FRAME_INTERVAL_NS)
+
+    assert statistics.number_of_frames_dropped == 2
+
+
+def test_dropped_frame_counts_passed_in_are_used_instead():
+    rolling_frame_rate_statistics = RollingFrameRateStatistics()
+    timestamp_ns = _update_with_intervals(rolling_frame_rate_statistics, [FRAME_INTERVAL_NS] * 10)
+    timestamp_ns += 3 * FRAME_INTERVAL_NS
+    rolling_frame_rate_statistics.update(timestamp_ns, number_of_frames_missed=1)
+    statistics = rolling_frame_rate_statistics.update(timestamp_ns + FRAME_INTERVAL_NS, number_of_frames_missed=4)
+
+    assert statistics.number_of_frames_dropped == 5
+
+
+def test_skip_gap_leaves_the_gap_out():
+    rolling_frame_rate_statistics = RollingFrameRateStatistics()
+    timestamp_ns = _update_with_intervals(rolling_frame_rate_statistics, [FRAME_INTERVAL_NS] * 10)
+
+    rolling_frame_rate_statistics.skip_gap()  # (e.g. paused for a second)
+    _update_with_intervals(rolling_frame_rate_statistics, [FRAME_INTERVAL_NS] * 10,
+                           timestamp_ns=timestamp_ns + 30 * FRAME_INTERVAL_NS)
+    statistics = rolling_frame_rate_statistics.statistics
+
+    assert statistics.max_frame_interval_ms == FRAME_INTERVAL_NS / 1e6
+    assert statistics.frames_per_second == pytest.approx(30, rel=1e-6)
+    assert statistics.number_of_frames_dropped == 0
@@ -1,22 +1,56 @@
+import logging
 from pathlib import Path
 from typing import Union
 
-from skellycam.tests.utilities.get_number_of_frames_of_videos_in_a_folder import \
-    get_number_of_frames_of_videos_in_a_folder
+from skellycam.opencv.video_recorder.synchronization_map import get_expected_number_of_frames
+from skellycam.tests.utilities.get_number_of_frames_of_videos_in_a_folder import get_number_of_frames_of_videos
 
+logger = logging.getLogger(__name__)
 
-def test_synchronized_video_frame_counts(video_folder_path: Union[Path, str]):
+
+def test_synchronized_video_frame_counts(video_folder_path: Union[Path, str],
+                                         video_file_extension: str = ".mp4",
+                                         synchronization_map: dict = None):
     """
-    Test if all the videos in this folder have precisely the same number of frames
+    Test if all the videos in this folder have precisely the same number of frames (and, if given the
+    `synchronization_map` written when they were saved, the number of frames they were written with).
+
+    Frames are counted from the container metadata, and any video that doesn't match is re-counted packet by packet
+    before failing, since the metadata can be an estimate for some containers
     """
-    list_of_video_paths = list(Path(video_folder_path).glob("*.mp4"))
+    list_of_video_paths = list(Path(video_folder_path).glob(f"*{video_file_extension}"))
 
     assert len(list_of_video_paths) > 0, f"No videos found in {video_folder_path}"
 
-    frame_count = get_number_of_frames_of_videos_in_a_folder(video_folder_path)
+    frame_count_dictionary = get_number_of_frames_of_videos(list_of_video_paths)
+
+    if synchronization_map is not None:
+        expected_frame_count_dictionary = get_expected_number_of_frames(synchronization_map)
+    else:
+        expected_frame_count = max(frame_count_dictionary.values())
+        expected_frame_count_dictionary = {video_file_name: expected_frame_count
+                                           for video_file_name in frame_count_dictionary.keys()}
+
+    mismatched_video_paths = [
+        video_path for video_path in list_of_video_paths
+        if frame_count_dictionary[video_path.name] != expected_frame_count_dictionary.get(video_path.name)
+    ]
+    if len(mismatched_video_paths) > 0:
+        logger.debug(f"Re-counting the packets of {[video_path.name for video_path in mismatched_video_paths]}")
+        frame_count_dictionary.update(
+            get_number_of_frames_of_videos(mismatched_video_paths, trust_container_metadata=False)
+        )
+
+    logger.info(f"Number of frames is - {frame_count_dictionary} - for videos in {video_folder_path}")
 
     assert (
-            len(set(frame_count)) == 1
-    ), f"Videos in {video_folder_path} have different frame counts: {frame_count}"
+            len(set(frame_count_dictionary.values())) == 1
+    ), f"Videos in {video_folder_path} have different frame counts: {frame_count_dictionary}"
+
+    if synchronization_map is not None:
+        assert (
+                frame_count_dictionary == expected_frame_count_dictionary
+        ), (f"Videos in {video_folder_path} don't match the synchronization map - "
+            f"counted: {frame_count_dictionary}, expected: {expected_frame_count_dictionary}")
 
     return True
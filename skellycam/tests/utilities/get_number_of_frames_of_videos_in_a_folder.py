@@ -1,37 +1,92 @@
+import importlib.util
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Union
+from typing import Dict, List, Union
 
 import cv2
 
 logger = logging.getLogger(__name__)
 
 
-def get_number_of_frames_of_videos_in_a_folder(folder_path: Union[str, Path]):
+def get_number_of_frames_of_videos_in_a_folder(folder_path: Union[str, Path],
+                                               video_file_extension: str = ".mp4") -> Union[List[int], None]:
     """
-    Get the number of frames in the first video in a folder
+    Get the number of frames in each video in a folder
     """
+    number_of_frames_dictionary = get_number_of_frames_of_videos(
+        list(Path(folder_path).glob(f"*{video_file_extension}")))
 
-    list_of_video_paths = list(Path(folder_path).glob("*.mp4"))
-
-    if len(list_of_video_paths) == 0:
+    if len(number_of_frames_dictionary) == 0:
         logger.error(f"No videos found in {folder_path}")
         return None
 
-    frame_count = []
-
-    for video_path in list_of_video_paths:
-        cap = cv2.VideoCapture(str(video_path))
-        # Note: cap.get(cv2.CAP_PROP_FRAME_COUNT) may not always be accurate - https://stackoverflow.com/a/47796468/14662833
-        success = True
-        count = 0
-        while success:
-            success, frame = cap.read()
-            if not success:
-                break
-            count += 1
-        cap.release()
-        frame_count.append(count)
-
+    frame_count = list(number_of_frames_dictionary.values())
     logger.info(f"Number of frames is - {frame_count} - for videos in {folder_path}")
     return frame_count
+
+
+def get_number_of_frames_of_videos(list_of_video_paths: List[Union[str, Path]],
+                                   trust_container_metadata: bool = True) -> Dict[str, int]:
+    """
+    Count the frames of all the videos concurrently (one thread per video - the demuxing happens outside the GIL)
+    """
+    if len(list_of_video_paths) == 0:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(list_of_video_paths)) as executor:
+        frame_counts = executor.map(
+            lambda video_path: get_number_of_frames_in_video(video_path,
+                                                             trust_container_metadata=trust_container_metadata),
+            list_of_video_paths,
+        )
+        return {Path(video_path).name: frame_count
+                for video_path, frame_count in zip(list_of_video_paths, frame_counts)}
+
+
+def get_number_of_frames_in_video(video_path: Union[str, Path], trust_container_metadata: bool = True) -> int:
+    """
+    Count the frames in a video without decoding it.
+
+    With `trust_container_metadata`, the frame count stored in the container header is used when there is one (the
+    `.mp4`s we write have it, `.mkv`s don't). Otherwise (or when there isn't one) the packets are counted, which
+    reads the whole file but skips decoding.
+
+    Without PyAV, only the header count skips decoding - OpenCV can't count packets, so the fallback decodes every
+    frame (see `_get_number_of_frames_with_opencv`)
+    """
+    # opportunistic import - PyAV is an optional dependency, fall back on OpenCV without it
+    if importlib.util.find_spec("av") is not None:
+        return _get_number_of_frames_with_pyav(video_path, trust_container_metadata=trust_container_metadata)
+    return _get_number_of_frames_with_opencv(video_path, trust_container_metadata=trust_container_metadata)
+
+
+def _get_number_of_frames_with_pyav(video_path: Union[str, Path], trust_container_metadata: bool) -> int:
+    import av
+
+    with av.open(str(video_path)) as container:
+        video_stream = container.streams.video[0]
+        if trust_container_metadata and video_stream.frames > 0:
+            return video_stream.frames
+
+        # packets with no data are the demuxer's end-of-stream flush packets, not frames
+        return sum(1 for packet in container.demux(video_stream) if packet.size > 0)
+
+
+def _get_number_of_frames_with_opencv(video_path: Union[str, Path], trust_container_metadata: bool) -> int:
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if trust_container_metadata:
+            # Note: this may be estimated from the duration for some containers - https://stackoverflow.com/a/47796468/14662833
+            number_of_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if number_of_frames > 0:
+                return number_of_frames
+
+        # (this decodes every frame - `grab` without `retrieve` only skips the conversion to a BGR image - so it is
+        # no faster than reading the video, just a last resort for when there is no header count and no PyAV)
+        number_of_frames = 0
+        while cap.grab():
+            number_of_frames += 1
+        return number_of_frames
+    finally:
+        cap.release()